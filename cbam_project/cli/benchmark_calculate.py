@@ -0,0 +1,88 @@
+"""
+CLI - Toplu Hesaplama Benchmark'ı
+Satır satır hesaplama, vektörel calculate_batch ve /api/v1/calculate
+uç noktası (JSON ve NDJSON) için satır/saniye ölçer
+
+Kullanım:
+    python benchmark_calculate.py
+    python benchmark_calculate.py --lines 50000 --repeat 5
+"""
+
+import sys
+import os
+import time
+import json
+import random
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+os.environ.setdefault('WARMUP_ON_BOOT', '0')
+
+from src.cbam_calculator import CBAMCalculator
+from src.cn_code_database import CN_CODE_DATABASE
+
+
+def make_lines(count, seed=42):
+    """Rastgele ithalat satırları (%1 bilinmeyen CN kodu)"""
+    rng = random.Random(seed)
+    codes = list(CN_CODE_DATABASE.keys())
+    return [{
+        'cn_code': rng.choice(codes) if rng.random() > 0.01 else '0000',
+        'quantity': round(rng.uniform(1, 5000), 2),
+        'foreign_carbon_price': rng.choice([0, 0, 0, 12.5])
+    } for _ in range(count)]
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CBAM toplu hesaplama benchmark'ı")
+    parser.add_argument('--lines', type=int, default=10000, help='Satır sayısı')
+    parser.add_argument('--repeat', type=int, default=3, help='Tekrar sayısı (en iyi süre alınır)')
+    parser.add_argument('--ets-price', type=float, default=85.0)
+    args = parser.parse_args()
+
+    lines = make_lines(args.lines)
+    calc = CBAMCalculator(args.ets_price)
+
+    def scalar():
+        for line in lines:
+            data = calc.get_data_by_cn(line['cn_code'])
+            if data:
+                calc.calculate(line['quantity'], data['direct_ei'], data['indirect_ei'],
+                               line['foreign_carbon_price'])
+
+    def vectorized():
+        calc.calculate_batch([l['cn_code'] for l in lines], [l['quantity'] for l in lines],
+                             [l['foreign_carbon_price'] for l in lines])
+
+    from web.app import app
+    client = app.test_client()
+    body = json.dumps({'ets_price': args.ets_price, 'lines': lines})
+
+    def api(fmt):
+        url = '/api/v1/calculate' + ('?format=ndjson' if fmt == 'ndjson' else '')
+        def call():
+            response = client.post(url, data=body, content_type='application/json')
+            assert response.status_code == 200, response.data[:200]
+            response.get_data()
+        return call
+
+    print(f"\n⏱️  {args.lines} satır, en iyi {args.repeat} tekrar\n")
+    for name, func in [('Satır satır (calculate)', scalar),
+                       ('Vektörel (calculate_batch)', vectorized),
+                       ('API JSON', api('json')),
+                       ('API NDJSON', api('ndjson'))]:
+        elapsed = best_of(args.repeat, func)
+        print(f"   {name:<28} {elapsed * 1000:9.1f} ms  {args.lines / elapsed:>12,.0f} satır/sn")
+
+
+if __name__ == "__main__":
+    main()
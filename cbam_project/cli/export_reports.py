@@ -0,0 +1,63 @@
+"""
+CLI - Rapor Dışa Aktarma / Backfill
+DynamoDB'deki tüm raporları paralel scan ile JSONL/Parquet'e aktarır
+
+Kullanım:
+    python export_reports.py exports/2026-01 --segments 8
+    python export_reports.py exports/backfill --ets-price 120 --format parquet
+
+Aynı çıktı dizini ile tekrar çalıştırıldığında kalan segmentlerden devam eder.
+"""
+
+import sys
+import os
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from dotenv import load_dotenv
+
+from src.report_exporter import ReportExporter, recompute_cbam_cost
+
+
+def get_db_table():
+    import boto3
+    session = boto3.Session(
+        aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
+        aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
+        region_name=os.getenv('AWS_DEFAULT_REGION')
+    )
+    return session.resource('dynamodb').Table('GrefinsReports')
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CBAM raporlarını DynamoDB'den dışa aktar")
+    parser.add_argument('output_dir', help='Çıktı dizini (checkpoint dahil)')
+    parser.add_argument('--format', choices=['jsonl', 'parquet'], default='jsonl')
+    parser.add_argument('--segments', type=int, default=4, help='Paralel scan segment sayısı')
+    parser.add_argument('--workers', type=int, default=None, help='Worker sayısı')
+    parser.add_argument('--page-size', type=int, default=200, help='Scan sayfa boyutu')
+    parser.add_argument('--ets-price', type=float, default=None,
+                        help='Verilirse CBAM maliyetleri bu ETS fiyatıyla yeniden hesaplanır')
+    args = parser.parse_args()
+
+    load_dotenv()
+
+    exporter = ReportExporter(get_db_table, total_segments=args.segments, page_size=args.page_size)
+    transform = recompute_cbam_cost(args.ets_price) if args.ets_price else None
+
+    def progress(segment, checkpoint):
+        status = "✅" if checkpoint['done'] else "⏳"
+        print(f"{status} Segment {segment}: {checkpoint['items']} rapor, {checkpoint['pages']} sayfa")
+
+    try:
+        result = exporter.export(args.output_dir, fmt=args.format, transform=transform,
+                                 max_workers=args.workers, progress=progress)
+        print(f"\n✅ Toplam {result['total_items']} rapor dışa aktarıldı: {args.output_dir}")
+    except KeyboardInterrupt:
+        print("\n\nİptal edildi. Aynı komutla kaldığı yerden devam edebilirsiniz.")
+    except Exception as e:
+        print(f"\n❌ Hata: {e}")
+
+
+if __name__ == "__main__":
+    main()
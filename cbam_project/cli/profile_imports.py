@@ -0,0 +1,110 @@
+"""
+CLI - Import Süresi Profili
+Bir modülü temiz bir Python process'inde '-X importtime' ile import eder ve
+modül başına import maliyetini raporlar (soğuk başlangıç analizi için)
+
+Kullanım:
+    python profile_imports.py                 # web.app
+    python profile_imports.py src.pdf_generator --top 30
+    python profile_imports.py web.app --budget 2.0
+"""
+
+import sys
+import os
+import argparse
+import subprocess
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Web uygulamasının açılışta yüklememesi gereken ağır paketler
+HEAVY_PACKAGES = ('pandas', 'numpy', 'matplotlib', 'reportlab', 'google.genai', 'boto3')
+
+
+def profile_imports(module, env=None):
+    """
+    Modülü yeni bir process'te import et ve import sürelerini topla
+
+    Args:
+        module (str): Import edilecek modül (ör. 'web.app')
+        env (dict): Process ortamına eklenecek değişkenler
+
+    Returns:
+        dict: {'total_seconds', 'modules': [(isim, self_us, cumulative_us, derinlik)], 'heavy': [...]}
+    """
+    code = (
+        "import sys, time\n"
+        "t = time.perf_counter()\n"
+        f"import {module}\n"
+        "print('__total__', time.perf_counter() - t)\n"
+        f"print('__heavy__', ','.join(m for m in {HEAVY_PACKAGES!r} if m in sys.modules))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=PROJECT_DIR, capture_output=True, text=True,
+        env={**os.environ, **(env or {})}
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"{module} import edilemedi:\n{result.stderr[-2000:]}")
+
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_part, cumulative_part, name = line[len('import time:'):].split('|', 2)
+        self_us = int(self_part.strip())
+        cumulative_us = int(cumulative_part.strip())
+        # İç içe importlar iki boşluk girintiyle gösterilir
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append((name.strip(), self_us, cumulative_us, depth))
+
+    total, heavy = 0.0, []
+    for line in result.stdout.splitlines():
+        if line.startswith('__total__'):
+            total = float(line.split()[1])
+        elif line.startswith('__heavy__'):
+            heavy = [m for m in line.split(' ', 1)[1].split(',') if m]
+
+    return {'total_seconds': total, 'modules': modules, 'heavy': heavy}
+
+
+def package_totals(modules):
+    """Kök paket başına toplam (self) import süresi, mikrosaniye"""
+    totals = {}
+    for name, self_us, _, _ in modules:
+        root = name.split('.')[0]
+        totals[root] = totals.get(root, 0) + self_us
+    return sorted(totals.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Modül başına import süresi raporu")
+    parser.add_argument('module', nargs='?', default='web.app', help='Profil çıkarılacak modül')
+    parser.add_argument('--top', type=int, default=20, help='Gösterilecek satır sayısı')
+    parser.add_argument('--budget', type=float, default=None,
+                        help='Saniye cinsinden bütçe; aşılırsa çıkış kodu 1')
+    args = parser.parse_args()
+
+    # Arka plan ısınması import ölçümünü etkilemesin
+    profile = profile_imports(args.module, env={'WARMUP_ON_BOOT': '0'})
+    modules = profile['modules']
+
+    print(f"\n⏱️  {args.module}: {profile['total_seconds']:.3f} sn ({len(modules)} modül)\n")
+
+    print("En pahalı modüller (kümülatif):")
+    for name, self_us, cumulative_us, depth in sorted(modules, key=lambda m: m[2], reverse=True)[:args.top]:
+        print(f"   {cumulative_us / 1000:8.1f} ms  (self {self_us / 1000:6.1f} ms)  {'  ' * depth}{name}")
+
+    print("\nPaket bazında (self toplamı):")
+    for root, total_us in package_totals(modules)[:args.top]:
+        print(f"   {total_us / 1000:8.1f} ms  {root}")
+
+    if profile['heavy']:
+        print(f"\n⚠️ Açılışta yüklenen ağır paketler: {', '.join(profile['heavy'])}")
+
+    if args.budget is not None and profile['total_seconds'] > args.budget:
+        print(f"\n❌ Bütçe aşıldı: {profile['total_seconds']:.3f} sn > {args.budget:.3f} sn")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+CLI - Toplu PDF Üretimi
+export_reports.py çıktısındaki raporları paralel olarak PDF'e çevirir
+
+Kullanım:
+    python render_reports.py exports/2026-01 board_pack_2026-01.zip
+    python render_reports.py exports/2026-01 pdfs/ --workers 8
+"""
+
+import sys
+import os
+import time
+import argparse
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.pdf_batch import render_batch, iter_jsonl_reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kayıtlı CBAM raporlarından toplu PDF üret")
+    parser.add_argument('source', help='JSONL dosyası veya export dizini')
+    parser.add_argument('output', help="Çıktı dizini veya '.zip' dosyası")
+    parser.add_argument('--workers', type=int, default=None, help='Process sayısı (varsayılan: CPU sayısı)')
+    parser.add_argument('--charts', choices=['vector', 'matplotlib'], default='vector')
+    parser.add_argument('--dpi', type=int, default=150, help='Raster görseller için hedef DPI')
+    parser.add_argument('--image-format', choices=['flate', 'jpeg'], default='flate')
+    parser.add_argument('--max-kb', type=int, default=None, help='PDF başına boyut bütçesi (KB)')
+    args = parser.parse_args()
+
+    def progress(done, filename):
+        print(f"   ✅ {done}: {filename}")
+
+    start = time.time()
+    try:
+        result = render_batch(iter_jsonl_reports(args.source), args.output,
+                               workers=args.workers, chart_backend=args.charts, progress=progress,
+                               image_dpi=args.dpi, image_format=args.image_format,
+                               max_bytes=args.max_kb * 1024 if args.max_kb else None)
+        elapsed = time.time() - start
+        written = result['written']
+        print(f"\n✅ {len(written)} PDF üretildi ({elapsed:.1f} sn, {len(written) / max(elapsed, 1e-9):.1f} PDF/sn): {args.output}")
+        if result['skipped']:
+            print(f"   ⏭️  {result['skipped']} kayıt tam analiz değil, atlandı")
+        for filename, error in result['failed']:
+            print(f"   ❌ {filename}: {error}")
+        if result['failed']:
+            sys.exit(1)
+    except KeyboardInterrupt:
+        print("\n\nİptal edildi.")
+    except Exception as e:
+        print(f"\n❌ Hata: {e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,14 @@
 import streamlit as st
-import json
-import os
+
+from src.form_schema import load_form_schema, FormValidationError
 
 def load_config():
-    config_path = os.path.join(os.path.dirname(__file__), 'cbam_form_config.json')
-    with open(config_path, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    # Config her rerun'da yeniden okunmaz; derlenmiş şema process başına bir kez yüklenir
+    return load_form_schema().config
 
 def run_app():
-    config = load_config()
+    schema = load_form_schema()
+    config = schema.config
     app_cfg = config.get('app_config', {})
     
     st.set_page_config(
@@ -124,11 +124,27 @@ def run_app():
 
     st.divider()
     if st.button("HESAPLA VE ANALİZ ET", type="primary", use_container_width=True):
-        st.success("Veriler başarıyla toplandı. Analiz modülüne gönderiliyor...")
-        st.json(user_data)
-        # Burada analiz fonksiyonu çağrılabilir:
-        # result = analyze_cbam(user_data)
-        # st.write(result)
+        try:
+            record = schema.decode_sector(selected_sector_key, selected_route_key, user_data["inputs"])
+        except FormValidationError as e:
+            for message in e.errors.values():
+                st.error(message)
+            return
+        
+        # Girdiler hesaplama birimine çevrilmiş halde (ör. kg/ton -> t/t)
+        user_data["inputs"] = record.values
+        user_data["units"] = record.units
+        
+        # Sektör/rota planı: girdi vektörü x faktör matrisi (tek dot product)
+        from src.emission_plan import get_plan
+        result = get_plan(selected_sector_key, selected_route_key).evaluate(record.values)
+        
+        st.success("Veriler başarıyla toplandı.")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Scope 1 (tCO2)", f"{result['scope1']:,.1f}")
+        col2.metric("Scope 2 (tCO2)", f"{result['scope2']:,.1f}")
+        col3.metric("Yoğunluk (tCO2/ton)", f"{result['intensity']:.3f}")
+        st.json({**user_data, "emissions": result})
 
 if __name__ == "__main__":
     run_app()
@@ -0,0 +1,182 @@
+"""
+Abatement Optimizer Module
+Azaltım önlemleri kataloğundan marjinal azaltım maliyeti (MAC) eğrisi ve
+yatırım bütçesi altında en iyi önlem portföyü (grup knapsack DP, vektörel)
+"""
+
+import numpy as np
+
+
+DEFAULT_DISCOUNT_RATE = 0.08
+DEFAULT_LIFETIME_YEARS = 10
+
+# Bütçe ekseninin en fazla hücre sayısı (DP çözünürlüğü)
+DEFAULT_RESOLUTION = 10_000
+
+
+def capital_recovery_factor(rate, years):
+    """
+    Yatırımı yıllık eşdeğere çeviren çarpan: r(1+r)^n / ((1+r)^n - 1)
+
+    Args:
+        rate (float or ndarray): İskonto oranı
+        years (float or ndarray): Ekonomik ömür
+    """
+    rate = np.asarray(rate, dtype=float)
+    years = np.asarray(years, dtype=float)
+    growth = (1 + rate) ** years
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crf = np.where(rate > 0, rate * growth / (growth - 1), 1 / years)
+    return crf
+
+
+class AbatementOptimizer:
+    """
+    Önlem kataloğu üzerinde MAC eğrisi ve bütçe kısıtlı seçim
+
+    Her önlem bir sözlüktür:
+        id (str), name (str), investment_eur, abatement_tco2 (yıllık),
+        annual_opex_eur (ops.), annual_savings_eur (enerji tasarrufu, ops.),
+        lifetime_years (ops.), group (ops.; aynı gruptan en fazla bir önlem seçilir)
+    """
+
+    def __init__(self, measures, ets_price, discount_rate=DEFAULT_DISCOUNT_RATE):
+        """
+        Args:
+            measures (list): Önlem sözlükleri
+            ets_price (float): Karbon fiyatı (€/tCO2), kaçınılan CBAM/ETS maliyeti için
+            discount_rate (float): Yatırım yıllıklandırma iskonto oranı
+        """
+        self.measures = list(measures)
+        self.ets_price = float(ets_price)
+        self.discount_rate = discount_rate
+
+        ids = [m['id'] for m in self.measures]
+        if len(set(ids)) != len(ids):
+            raise ValueError("Önlem id'leri tekil olmalı")
+        self.ids = np.array(ids, dtype=object)
+
+        def column(key, default=0.0):
+            return np.array([float(m.get(key, default) or 0.0) for m in self.measures])
+
+        self.investment = np.maximum(column('investment_eur'), 0.0)
+        self.abatement = column('abatement_tco2')
+        lifetime = column('lifetime_years', DEFAULT_LIFETIME_YEARS)
+        lifetime[lifetime <= 0] = DEFAULT_LIFETIME_YEARS
+
+        # Yıllık net maliyet: yıllıklandırılmış yatırım + işletme - enerji tasarrufu
+        self.annual_cost = (self.investment * capital_recovery_factor(discount_rate, lifetime)
+                            + column('annual_opex_eur') - column('annual_savings_eur'))
+        # Yıllık net fayda: kaçınılan karbon maliyeti - yıllık net maliyet
+        self.net_benefit = self.abatement * self.ets_price - self.annual_cost
+
+        # Grupsuz önlem kendi başına bir gruptur
+        groups = [m.get('group') or f"__{m['id']}" for m in self.measures]
+        _, self.group_codes = np.unique(np.array(groups, dtype=object), return_inverse=True)
+
+    def mac_curve(self):
+        """
+        Marjinal azaltım maliyeti eğrisi (ucuzdan pahalıya)
+
+        Returns:
+            dict: ids, mac_eur_per_tco2, abatement_tco2, cumulative_tco2 (numpy dizileri);
+                  azaltımı sıfır olan önlemler hariç
+        """
+        valid = self.abatement > 0
+        mac = np.full(len(self.measures), np.inf)
+        mac[valid] = self.annual_cost[valid] / self.abatement[valid]
+        order = np.argsort(mac, kind='stable')
+        order = order[valid[order]]
+        return {
+            'ids': self.ids[order],
+            'mac_eur_per_tco2': mac[order],
+            'abatement_tco2': self.abatement[order],
+            'cumulative_tco2': np.cumsum(self.abatement[order])
+        }
+
+    def optimize(self, budget_eur, objective='net_benefit', resolution=DEFAULT_RESOLUTION):
+        """
+        Yatırım bütçesi altında en iyi portföy (grup başına en fazla bir önlem)
+
+        Bütçe en fazla `resolution` hücreye bölünür; yatırımlar hücreye yukarı
+        yuvarlanır (seçim bütçeyi asla aşmaz). Her grup için DP dizisi tek
+        numpy işlemiyle güncellenir: O(önlem x hücre).
+
+        Args:
+            budget_eur (float): Toplam yatırım bütçesi
+            objective (str): 'net_benefit' (yıllık net €) veya 'abatement' (yıllık tCO2)
+            resolution (int): Bütçe hücre sayısı
+
+        Returns:
+            dict: selected (id listesi), investment_eur, abatement_tco2,
+                  annual_net_benefit_eur, budget_eur, objective
+        """
+        if objective == 'net_benefit':
+            value = self.net_benefit
+        elif objective == 'abatement':
+            value = self.abatement
+        else:
+            raise ValueError(f"Bilinmeyen hedef: {objective}")
+
+        budget_eur = max(float(budget_eur), 0.0)
+        step = max(budget_eur / resolution, 1.0)
+        cells = int(budget_eur // step)
+        weights = np.ceil(self.investment / step - 1e-9).astype(np.intp)
+
+        # Değeri pozitif ve bütçeye sığan önlemler aday
+        candidates = np.flatnonzero((value > 0) & (weights <= cells))
+        groups = {}
+        for i in candidates:
+            groups.setdefault(self.group_codes[i], []).append(i)
+
+        best = np.zeros(cells + 1)
+        choices = []
+        for members in groups.values():
+            updated = best.copy()
+            choice = np.full(cells + 1, -1, dtype=np.intp)
+            for i in members:
+                w = weights[i]
+                shifted = np.full(cells + 1, -np.inf)
+                shifted[w:] = best[:cells + 1 - w] + value[i]
+                better = shifted > updated
+                updated[better] = shifted[better]
+                choice[better] = i
+            choices.append(choice)
+            best = updated
+
+        # Geri izleme: son gruptan başa
+        selected, cell = [], int(np.argmax(best))
+        for choice in reversed(choices):
+            i = choice[cell]
+            if i >= 0:
+                selected.append(i)
+                cell -= weights[i]
+        selected = sorted(selected)
+
+        return {
+            'selected': [self.ids[i] for i in selected],
+            'investment_eur': float(self.investment[selected].sum()),
+            'abatement_tco2': float(self.abatement[selected].sum()),
+            'annual_net_benefit_eur': float(self.net_benefit[selected].sum()),
+            'budget_eur': budget_eur,
+            'objective': objective
+        }
+
+
+def measures_from_scenarios(scenarios):
+    """
+    EmissionAnalyzer.get_optimization_scenarios çıktısını önlem kataloğuna çevir
+
+    Args:
+        scenarios (dict): Senaryo anahtarı -> senaryo ('combined' yok sayılır)
+
+    Returns:
+        list: Önlem sözlükleri
+    """
+    return [{
+        'id': key,
+        'name': scenario['name'],
+        'investment_eur': scenario['investment_needed_eur'],
+        'abatement_tco2': scenario['emission_saving_tco2'],
+        'group': scenario.get('group')
+    } for key, scenario in scenarios.items() if key != 'combined']
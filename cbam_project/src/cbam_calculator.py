@@ -6,6 +6,24 @@ Core calculation logic for CBAM costs and emissions
 from .cn_code_database import CN_CODE_DATABASE
 
 
+_batch_index = None
+
+
+def _get_batch_index():
+    """CN kodu -> satır indeksi ve emisyon yoğunluğu dizileri (bir kez kurulur)"""
+    global _batch_index
+    if _batch_index is None:
+        import numpy as np
+        codes = list(CN_CODE_DATABASE.keys())
+        _batch_index = {
+            'position': {code: i for i, code in enumerate(codes)},
+            # Son satır bilinmeyen kodlar içindir (0 yoğunluk)
+            'direct': np.array([CN_CODE_DATABASE[c]['direct'] for c in codes] + [0.0]),
+            'indirect': np.array([CN_CODE_DATABASE[c]['indirect'] for c in codes] + [0.0])
+        }
+    return _batch_index
+
+
 class CBAMCalculator:
     """
     CBAM Calculator for calculating carbon costs and emissions
@@ -115,3 +133,49 @@ class CBAMCalculator:
             "cbam_cost": result["cbam_cost"],
             "cbam_cost_adjusted": result["cbam_cost_adjusted"]
         }
+
+    def calculate_batch(self, cn_codes, quantities, foreign_carbon_prices=None):
+        """
+        Çok sayıda ithalat satırını vektörel olarak hesapla
+        
+        Args:
+            cn_codes (list): CN kodları
+            quantities (array-like): Miktarlar (ton)
+            foreign_carbon_prices (array-like): Satır başına yabancı karbon fiyatı (€/tCO2), opsiyonel
+            
+        Returns:
+            dict: Satır başına numpy dizileri; 'found' False olan satırlarda CN kodu bilinmiyor
+        """
+        import numpy as np
+        
+        index = _get_batch_index()
+        unknown = len(index['direct']) - 1
+        position = index['position']
+        rows = np.fromiter(
+            (position.get(self.normalize_code(str(code)), unknown) for code in cn_codes),
+            dtype=np.intp, count=len(cn_codes)
+        )
+        found = rows != unknown
+        
+        quantity = np.asarray(quantities, dtype=float)
+        direct_ei = index['direct'][rows]
+        indirect_ei = index['indirect'][rows]
+        total_ei = direct_ei + indirect_ei
+        total_emission = quantity * total_ei
+        cost = total_emission * self.ets_price
+        
+        if foreign_carbon_prices is None:
+            adjusted_cost = cost
+        else:
+            adjusted_cost = cost - total_emission * np.asarray(foreign_carbon_prices, dtype=float)
+        
+        return {
+            "found": found,
+            "direct_ei": direct_ei,
+            "indirect_ei": indirect_ei,
+            "total_ei": total_ei,
+            "total_emission": total_emission,
+            "certificates": total_emission,
+            "cbam_cost": cost,
+            "cbam_cost_adjusted": adjusted_cost
+        }
@@ -0,0 +1,257 @@
+"""
+Certificate Purchase Module
+CBAM sertifikası alım zamanlaması: çeyreklik yükümlülükler ve fiyat yolları
+üzerinde elde tutma / teslim kısıtlı, yollar boyunca vektörel dinamik program
+"""
+
+import time
+
+import numpy as np
+
+
+# Çeyrek sonu: yıl başından beri gömülü emisyonun bu oranı kadar sertifika hesapta olmalı
+DEFAULT_HOLDING_RATIO = 0.5
+
+# Yıllık teslim: bir sonraki yılın bu çeyreğinin sonunda (0 tabanlı; 1 = 31 Mayıs, 2 = 30 Eylül)
+DEFAULT_SURRENDER_QUARTER = 2
+
+DEFAULT_DISCOUNT_RATE = 0.08
+
+# Toplam yükümlülüğün bölündüğü hücre sayısı (DP çözünürlüğü)
+DEFAULT_RESOLUTION = 240
+
+# Parça başına (çeyrek x yol x hücre) politika elemanı sınırı
+CHUNK_ELEMENTS = 8_000_000
+
+QUARTERS_PER_YEAR = 4
+
+
+def obligations_from_calculator(cn_codes, quantities):
+    """
+    Ürün bazlı çeyreklik miktarlardan çeyreklik sertifika yükümlülüğü
+
+    Args:
+        cn_codes (list): Ürün CN kodları
+        quantities (array-like): (ürün, çeyrek) ton
+
+    Returns:
+        ndarray: Çeyrek başına gömülü emisyon (tCO2 = sertifika)
+    """
+    from .cbam_calculator import CBAMCalculator
+
+    quantities = np.asarray(quantities, dtype=float)
+    batch = CBAMCalculator(0).calculate_batch(list(cn_codes), np.ones(len(quantities)))
+    return batch['total_ei'] @ quantities
+
+
+def _first_min(values, width):
+    """
+    Pencere minimumu: her c için [c, c + width) aralığında en küçük değer ve ilk indeksi
+
+    Aralık ikiye katlanarak genişletilir (log2(width) adım); eşitlikte küçük indeks kalır.
+    """
+    rows, n = values.shape
+    best = values.copy()
+    index = np.broadcast_to(np.arange(n), (rows, n)).copy()
+    span = 1
+    while span < width:
+        shift = min(span, width - span)
+        candidate = best[:, shift:]
+        better = candidate < best[:, :n - shift]
+        best[:, :n - shift] = np.where(better, candidate, best[:, :n - shift])
+        index[:, :n - shift] = np.where(better, index[:, shift:], index[:, :n - shift])
+        span += shift
+    return best, index
+
+
+class CertificatePurchaseOptimizer:
+    """
+    Çeyreklik alım planı: beklenen (bugünkü değer) maliyeti en aza indirir
+
+    Durum, o ana kadar alınan kümülatif sertifika miktarıdır (hücrelere
+    bölünmüş). Her çeyrekte kümülatif alım [alt, üst] bandında kalmalıdır:
+        alt = teslim edilen + elde tutma oranı x yıl başından beri yükümlülük
+              (teslim çeyreğinde önceki yılın tamamı dahil; ufkun son çeyreğinde
+              kalan tüm yükümlülük karşılanır ve teslim edilmiş sayılır)
+        üst = teslim edilen + max_holding (verilmişse)
+    Alım maliyeti fiyat doğrusal olduğundan, beklenen maliyeti en aza indiren
+    açık döngü plan ortalama fiyat yolundaki DP çözümüdür; aynı DP her yol için
+    (tam öngörü) çalıştırılarak bilginin değeri için alt sınır elde edilir.
+    """
+
+    def __init__(self, obligations, holding_ratio=DEFAULT_HOLDING_RATIO,
+                 surrender_quarter=DEFAULT_SURRENDER_QUARTER, start_quarter=0,
+                 discount_rate=DEFAULT_DISCOUNT_RATE, holding_cost=0.0,
+                 max_holding=None, max_purchase=None, resolution=DEFAULT_RESOLUTION):
+        """
+        Args:
+            obligations (array-like): Çeyrek başına ithalattaki gömülü emisyon (tCO2)
+            holding_ratio (float): Çeyrek sonu elde tutma oranı
+            surrender_quarter (int): Teslimin yapıldığı, bir sonraki yılın çeyreği (0 tabanlı)
+            start_quarter (int): İlk sütunun yıl içindeki çeyreği (0 = Q1)
+            discount_rate (float): Yıllık iskonto oranı (sermaye maliyeti)
+            holding_cost (float): Hesapta tutulan sertifika başına çeyreklik maliyet (€)
+            max_holding (float): Hesapta tutulabilecek en fazla sertifika (teslim sonrası)
+            max_purchase (float): Çeyrek başına en fazla alım
+            resolution (int): Toplam yükümlülüğün bölündüğü hücre sayısı
+        """
+        self.obligations = np.asarray(obligations, dtype=float)
+        if self.obligations.ndim != 1 or (self.obligations < 0).any():
+            raise ValueError("obligations negatif olmayan tek boyutlu bir dizi olmalı")
+        quarters = len(self.obligations)
+        self.total = float(self.obligations.sum())
+        if self.total <= 0:
+            raise ValueError("Toplam yükümlülük pozitif olmalı")
+
+        year = (start_quarter + np.arange(quarters)) // QUARTERS_PER_YEAR
+        position = (start_quarter + np.arange(quarters)) % QUARTERS_PER_YEAR
+
+        # Yıl başından beri yükümlülük ve yıl toplamları
+        ytd = np.zeros(quarters)
+        annual = np.bincount(year, weights=self.obligations)
+        for y in np.unique(year):
+            in_year = year == y
+            ytd[in_year] = np.cumsum(self.obligations[in_year])
+
+        # Teslim: y yılının toplamı, y+1 yılının surrender_quarter çeyreğinde
+        surrendered = np.where((position == surrender_quarter) & (year > year[0]),
+                               annual[np.maximum(year - 1, 0)], 0.0)
+        self.surrendered = np.cumsum(surrendered)
+        # Ufuk sonu: kalan tüm yükümlülük karşılanmış ve teslim edilmiş sayılır
+        self.surrendered[-1] = self.total
+
+        self.lower = self.surrendered + holding_ratio * ytd
+        self.lower[-1] = self.total
+        self.upper = np.full(quarters, self.total) if max_holding is None else \
+            np.minimum(self.surrendered + float(max_holding), self.total)
+        if (self.upper < self.lower - 1e-9).any():
+            raise ValueError("max_holding elde tutma/teslim yükümlülüğünden küçük")
+
+        self.discount = (1 + discount_rate) ** (-np.arange(quarters) / QUARTERS_PER_YEAR)
+        self.holding_cost = float(holding_cost)
+        self.max_purchase = max_purchase
+
+        self.cells = int(resolution)
+        self.step = self.total / self.cells
+        self._lo = np.ceil(self.lower / self.step - 1e-9).astype(np.intp)
+        self._hi = np.floor(self.upper / self.step + 1e-9).astype(np.intp)
+        self._window = self.cells + 1 if max_purchase is None else \
+            int(np.floor(float(max_purchase) / self.step + 1e-9)) + 1
+
+    @property
+    def quarters(self):
+        return len(self.obligations)
+
+    def _solve_cells(self, prices):
+        """
+        Geriye doğru DP (her satır bir fiyat yolu)
+
+        Args:
+            prices (ndarray): (yol, çeyrek) fiyatlar
+
+        Returns:
+            ndarray: (yol, çeyrek) kümülatif alım (hücre)
+        """
+        rows, quarters = prices.shape
+        grid = np.arange(self.cells + 1)
+        unit = prices * self.discount * self.step
+        hold = self.discount * self.holding_cost * self.step
+
+        value = np.zeros((rows, self.cells + 1))
+        policy = np.empty((quarters, rows, self.cells + 1), dtype=np.int32)
+        for q in range(quarters - 1, -1, -1):
+            # c' hedef kümülatif alım: bugün c' x birim maliyet + elde tutma + gelecek değer
+            target = (unit[:, q, None] + hold[q]) * grid + value
+            target[:, :self._lo[q]] = np.inf
+            target[:, self._hi[q] + 1:] = np.inf
+
+            if self._window > self.cells:
+                # Sınırsız alım: sonek minimumu; ilk "rekor" konumu argmin'dir
+                best = np.minimum.accumulate(target[:, ::-1], axis=1)[:, ::-1]
+                record = np.where(target <= best, grid, self.cells + 1)
+                policy[q] = np.minimum.accumulate(record[:, ::-1], axis=1)[:, ::-1]
+            else:
+                best, policy[q] = _first_min(target, self._window)
+            value = best - unit[:, q, None] * grid
+
+        if not np.isfinite(value[:, 0]).all():
+            raise ValueError("Kısıtlar altında uygun bir alım planı yok (max_purchase çok düşük olabilir)")
+
+        path = np.empty((rows, quarters), dtype=np.intp)
+        state = np.zeros(rows, dtype=np.intp)
+        for q in range(quarters):
+            state = policy[q][np.arange(rows), state]
+            path[:, q] = state
+        return path
+
+    def costs(self, schedule, prices):
+        """
+        Alım planlarının yol başına bugünkü değer maliyeti
+
+        Args:
+            schedule (ndarray): (çeyrek,) veya (yol, çeyrek) alım miktarları
+            prices (ndarray): (yol, çeyrek) fiyatlar
+
+        Returns:
+            ndarray: (yol,) maliyet
+        """
+        holdings = np.cumsum(schedule, axis=-1) - self.surrendered
+        purchase = (prices * schedule * self.discount).sum(axis=-1)
+        return purchase + (holdings * self.discount).sum(axis=-1) * self.holding_cost
+
+    def optimize(self, prices, chunk_elements=CHUNK_ELEMENTS):
+        """
+        Açık döngü optimum plan, tam zamanında alım ve tam öngörü karşılaştırması
+
+        Args:
+            prices (array-like or DataFrame): (yol, çeyrek) veya (çeyrek,) sertifika fiyatları
+                (çeyrek ortalaması ETS fiyatı); DataFrame sütunları çeyrek etiketi olur
+            chunk_elements (int): Tam öngörü DP'sinde parça başına politika eleman sınırı
+
+        Returns:
+            dict: schedule, cumulative, holdings, surrendered, expected_cost,
+                cost_percentiles, just_in_time, savings_vs_just_in_time,
+                perfect_foresight, value_of_information, quarters, paths, seconds
+                (maliyetler bugünkü değer, €)
+        """
+        start = time.perf_counter()
+        labels = [str(c) for c in prices.columns] if hasattr(prices, 'columns') else None
+        prices = np.atleast_2d(np.asarray(prices, dtype=float))
+        if prices.shape[1] != self.quarters:
+            raise ValueError(f"Fiyat matrisi {prices.shape[1]} çeyrek, yükümlülük {self.quarters} çeyrek")
+        paths = len(prices)
+
+        # Açık döngü: ortalama fiyat yolunda DP (beklenen maliyet fiyatta doğrusal)
+        cumulative = self._solve_cells(prices.mean(axis=0, keepdims=True))[0] * self.step
+        schedule = np.diff(cumulative, prepend=0.0)
+        cost = self.costs(schedule, prices)
+
+        # Tam zamanında: her çeyrek yalnızca gereken kadar
+        just_in_time = np.diff(np.maximum.accumulate(self.lower), prepend=0.0)
+        jit_cost = self.costs(just_in_time, prices)
+
+        # Tam öngörü: her yol kendi DP'si, yollar parça parça
+        rows = max(1, chunk_elements // (self.quarters * (self.cells + 1)))
+        foresight = np.empty((paths, self.quarters))
+        for offset in range(0, paths, rows):
+            chunk = prices[offset:offset + rows]
+            foresight[offset:offset + len(chunk)] = np.diff(self._solve_cells(chunk) * self.step,
+                                                            prepend=0.0, axis=1)
+        foresight_cost = self.costs(foresight, prices)
+
+        expected = float(cost.mean())
+        return {
+            'quarters': labels or list(range(1, self.quarters + 1)),
+            'paths': paths,
+            'schedule': schedule,
+            'cumulative': cumulative,
+            'holdings': cumulative - self.surrendered,
+            'surrendered': np.diff(self.surrendered, prepend=0.0),
+            'expected_cost': expected,
+            'cost_percentiles': dict(zip((5, 50, 95), np.percentile(cost, (5, 50, 95)).tolist())),
+            'just_in_time': {'schedule': just_in_time, 'expected_cost': float(jit_cost.mean())},
+            'savings_vs_just_in_time': float(jit_cost.mean()) - expected,
+            'perfect_foresight': {'schedules': foresight, 'expected_cost': float(foresight_cost.mean())},
+            'value_of_information': expected - float(foresight_cost.mean()),
+            'seconds': round(time.perf_counter() - start, 3)
+        }
@@ -3,6 +3,8 @@ CN Code Database Module
 Contains emission intensity data for all CBAM-covered products
 """
 
+from functools import lru_cache
+
 CN_CODE_DATABASE = {
     # ÇELIK VE DEMİR
     "2601 12 00": {"description": "Agglomerated iron ores", "category": "Iron and Steel", "direct": 0.31, "indirect": 0.05, "total": 0.36},
@@ -63,10 +65,11 @@ CN_CODE_DATABASE = {
     "2804 10 00": {"description": "Hydrogen", "category": "Hydrogen", "direct": 10.40, "indirect": 0.00, "total": 10.40}
 }
 
+# Eski kategori bazlı varsayılanlar; CN karşılığı olanlar veritabanından okunur (tek kaynak)
 LEGACY_CATEGORIES = {
-    "cement": {"direct": 0.83, "indirect": 0.04},
+    "cement": {k: CN_CODE_DATABASE["2523 10 00"][k] for k in ("direct", "indirect")},
     "steel": {"direct": 2.30, "indirect": 0.25},
-    "aluminium": {"direct": 2.36, "indirect": 8.14}
+    "aluminium": {k: CN_CODE_DATABASE["7601"][k] for k in ("direct", "indirect")}
 }
 
 
@@ -88,3 +91,32 @@ def search_by_description(search_term):
         if search_term in data["description"].lower():
             results.append({"cn_code": code, **data})
     return results
+
+
+_digit_index = None
+
+
+@lru_cache(maxsize=4096)
+def match_cn_code(code):
+    """
+    Gümrük beyannamesindeki (8-10 haneli) kodu veritabanı anahtarına eşle
+
+    Veritabanı anahtarları farklı uzunlukta öneklerdir ("7201", "7202 1",
+    "2601 12 00"); en uzun eşleşen önek seçilir.
+
+    Args:
+        code (str): CN kodu ("72021120", "7202 11 20", "7202.11.20" ...)
+
+    Returns:
+        str or None: CN_CODE_DATABASE anahtarı
+    """
+    global _digit_index
+    if _digit_index is None:
+        _digit_index = {key.replace(' ', ''): key for key in CN_CODE_DATABASE}
+
+    digits = ''.join(c for c in str(code) if c.isdigit())
+    for length in range(len(digits), 3, -1):
+        key = _digit_index.get(digits[:length])
+        if key is not None:
+            return key
+    return None
@@ -0,0 +1,211 @@
+"""
+Cost at Risk Module
+Fiyat senaryo matrisi (yol x çeyrek) ve ürün portföyü üzerinden çeyreklik ve
+kümülatif CBAM maliyeti dağılımı, VaR/CVaR, aşılma olasılıkları ve ürün katkıları
+"""
+
+import time
+
+import numpy as np
+
+
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_PERCENTILES = (5, 50, 95)
+
+# Parça başına (yol x fiyat grubu x çeyrek) eleman sınırı; ara bellek ~ 8 x bu değer bayt
+CHUNK_ELEMENTS = 4_000_000
+
+QUARTERS_PER_YEAR = 4
+
+
+def simulate_price_paths(forecast, paths=10_000, volatility=0.35, seed=None):
+    """
+    Çeyreklik tahmin etrafında log-normal fiyat senaryoları
+
+    Her yol, ortalaması tahmine eşit olacak şekilde (drift düzeltmeli) geometrik
+    Brown hareketiyle tahmin eğrisinin çevresinde dalgalanır.
+
+    Args:
+        forecast (array-like): Çeyrek başına beklenen ETS fiyatı (€/tCO2)
+        paths (int): Senaryo (yol) sayısı
+        volatility (float): Yıllık volatilite
+        seed (int): Rastgele sayı tohumu
+
+    Returns:
+        ndarray: (paths, len(forecast)) fiyat matrisi
+    """
+    forecast = np.asarray(forecast, dtype=float)
+    dt = 1.0 / QUARTERS_PER_YEAR
+    t = dt * np.arange(1, len(forecast) + 1)
+    rng = np.random.default_rng(seed)
+    shocks = rng.standard_normal((paths, len(forecast)))
+    np.cumsum(shocks, axis=1, out=shocks)
+    shocks *= volatility * np.sqrt(dt)
+    shocks -= 0.5 * volatility ** 2 * t
+    np.exp(shocks, out=shocks)
+    shocks *= forecast
+    return shocks
+
+
+def _tail_mean(values, threshold):
+    """Sütun başına eşik ve üzerindeki değerlerin ortalaması (CVaR)"""
+    tail = values >= threshold
+    return np.where(tail, values, 0.0).sum(axis=0) / np.maximum(tail.sum(axis=0), 1)
+
+
+def _distribution(values, confidence, percentiles):
+    """(yol, ...) dizisinin yol ekseni boyunca özet istatistikleri"""
+    quantiles = np.quantile(values, [p / 100 for p in percentiles] + [confidence], axis=0)
+    var = quantiles[-1]
+    return {
+        'mean': values.mean(axis=0),
+        'std': values.std(axis=0),
+        'percentiles': dict(zip(percentiles, quantiles[:-1])),
+        'var': var,
+        'cvar': _tail_mean(values, var)
+    }
+
+
+def _exceedance(values, thresholds):
+    """Sütun başına P(değer > eşik); (..., len(thresholds))"""
+    ordered = np.sort(values, axis=0)
+    n = len(ordered)
+    if ordered.ndim == 1:
+        return 1 - np.searchsorted(ordered, thresholds, side='right') / n
+    return np.stack([1 - np.searchsorted(ordered[:, j], thresholds, side='right') / n
+                     for j in range(ordered.shape[1])])
+
+
+class PortfolioCostAtRisk:
+    """
+    Ürün portföyü için senaryo bazlı CBAM maliyet riski
+
+    Ürünler yabancı karbon fiyatına göre gruplanır (çoğu portföyde birkaç grup);
+    çeyreklik maliyet her grup için max(fiyat - yabancı fiyat, 0) x grup emisyonu
+    toplamıdır. Böylece (yol x ürün x çeyrek) tensörü hiç oluşmaz; yollar
+    CHUNK_ELEMENTS sınırında parça parça işlenir.
+    """
+
+    def __init__(self, cn_codes, quantities, foreign_carbon_prices=None):
+        """
+        Args:
+            cn_codes (list): Ürün CN kodları
+            quantities (array-like): Çeyrek başına ton; (ürün,) tüm çeyreklerde aynı
+                veya (ürün, çeyrek)
+            foreign_carbon_prices (array-like): Ürün başına menşe ülke karbon fiyatı (€/tCO2)
+        """
+        from .cbam_calculator import CBAMCalculator
+
+        self.cn_codes = list(cn_codes)
+        quantities = np.asarray(quantities, dtype=float)
+        if quantities.ndim not in (1, 2) or len(quantities) != len(self.cn_codes):
+            raise ValueError("quantities (ürün,) veya (ürün, çeyrek) şeklinde olmalı")
+
+        batch = CBAMCalculator(0).calculate_batch(self.cn_codes, np.ones(len(self.cn_codes)))
+        self.found = batch['found']
+        self.intensity = batch['total_ei']
+        self.quantities = quantities
+
+        foreign = np.zeros(len(self.cn_codes)) if foreign_carbon_prices is None else \
+            np.broadcast_to(np.asarray(foreign_carbon_prices, dtype=float), (len(self.cn_codes),))
+        self.group_prices, self.groups = np.unique(foreign, return_inverse=True)
+
+    def emissions(self, quarters):
+        """
+        Ürün x çeyrek gömülü emisyon (tCO2)
+
+        Returns:
+            ndarray: (ürün, çeyrek)
+        """
+        quantities = self.quantities if self.quantities.ndim == 2 else self.quantities[:, None]
+        if quantities.shape[1] not in (1, quarters):
+            raise ValueError(f"quantities {quantities.shape[1]} çeyrek, fiyat matrisi {quarters} çeyrek")
+        return np.broadcast_to(quantities * self.intensity[:, None], (len(self.cn_codes), quarters))
+
+    def _chunks(self, prices, chunk_elements):
+        rows = max(1, chunk_elements // (len(self.group_prices) * prices.shape[1]))
+        for start in range(0, len(prices), rows):
+            chunk = prices[start:start + rows]
+            # (parça, grup, çeyrek): yabancı fiyat düşülmüş, sıfırda kesilmiş net fiyat
+            yield start, np.maximum(chunk[:, None, :] - self.group_prices[None, :, None], 0.0)
+
+    def evaluate(self, prices, confidence=DEFAULT_CONFIDENCE, thresholds=None,
+                 percentiles=DEFAULT_PERCENTILES, chunk_elements=CHUNK_ELEMENTS):
+        """
+        Senaryo matrisi üzerinde maliyet dağılımları
+
+        Args:
+            prices (array-like or DataFrame): (yol, çeyrek) ETS fiyatları; DataFrame
+                sütunları çeyrek etiketi olarak kullanılır
+            confidence (float): VaR/CVaR güven düzeyi (ör. 0.95)
+            thresholds (array-like): Aşılma olasılığı için toplam maliyet eşikleri (€)
+            percentiles (tuple): Raporlanacak yüzdelikler
+            chunk_elements (int): Parça başına ara dizi eleman sınırı
+
+        Returns:
+            dict: quarterly / cumulative (çeyrek başına diziler: mean, std, percentiles,
+                var, cvar), total (kümülatif son çeyrek, skaler), exceedance,
+                contributions (ürün başına beklenen maliyet ve CVaR katkısı),
+                paths, quarters, products, not_found, seconds
+        """
+        start = time.perf_counter()
+        labels = [str(c) for c in prices.columns] if hasattr(prices, 'columns') else None
+        prices = np.asarray(prices, dtype=float)
+        if prices.ndim != 2:
+            raise ValueError("prices (yol, çeyrek) şeklinde olmalı")
+        if not 0 < confidence < 1:
+            raise ValueError("confidence 0 ile 1 arasında olmalı")
+        paths, quarters = prices.shape
+
+        emissions = self.emissions(quarters)
+        group_emissions = np.zeros((len(self.group_prices), quarters))
+        np.add.at(group_emissions, self.groups, emissions)
+
+        # 1. geçiş: yol x çeyrek maliyet ve ortalama net fiyat
+        costs = np.empty((paths, quarters))
+        net_sum = np.zeros_like(group_emissions)
+        for offset, net in self._chunks(prices, chunk_elements):
+            costs[offset:offset + len(net)] = np.einsum('cgq,gq->cq', net, group_emissions)
+            net_sum += net.sum(axis=0)
+
+        cumulative = np.cumsum(costs, axis=1)
+        total = cumulative[:, -1]
+        total_stats = _distribution(total, confidence, percentiles)
+
+        # 2. geçiş: kuyruk yollarında (toplam >= VaR) ortalama net fiyat -> ürün CVaR katkısı
+        tail = total >= total_stats['var']
+        tail_sum = np.zeros_like(group_emissions)
+        for offset, net in self._chunks(prices, chunk_elements):
+            tail_sum += net[tail[offset:offset + len(net)]].sum(axis=0)
+
+        expected = (emissions * (net_sum / paths)[self.groups]).sum(axis=1)
+        tail_contribution = (emissions * (tail_sum / max(int(tail.sum()), 1))[self.groups]).sum(axis=1)
+
+        thresholds = np.atleast_1d(np.asarray([] if thresholds is None else thresholds, dtype=float))
+        return {
+            'paths': paths,
+            'quarters': labels or list(range(1, quarters + 1)),
+            'products': len(self.cn_codes),
+            'not_found': int((~self.found).sum()),
+            'confidence': confidence,
+            'quarterly': _distribution(costs, confidence, percentiles),
+            'cumulative': _distribution(cumulative, confidence, percentiles),
+            'total': {
+                'mean': float(total_stats['mean']),
+                'std': float(total_stats['std']),
+                'percentiles': {p: float(v) for p, v in total_stats['percentiles'].items()},
+                'var': float(total_stats['var']),
+                'cvar': float(total_stats['cvar'])
+            },
+            'exceedance': {
+                'thresholds': thresholds,
+                'total': _exceedance(total, thresholds),
+                'quarterly': _exceedance(costs, thresholds)
+            },
+            'contributions': {
+                'cn_codes': self.cn_codes,
+                'expected': expected,
+                'cvar': tail_contribution
+            },
+            'seconds': round(time.perf_counter() - start, 3)
+        }
@@ -0,0 +1,458 @@
+"""
+Customs Import Module
+Streaming CSV/XLSX parsing of customs declarations and chunked CBAM calculation
+"""
+
+import os
+import io
+import csv
+import json
+import gzip
+import hashlib
+import time
+import uuid
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .cbam_calculator import CBAMCalculator
+from .cn_code_database import match_cn_code
+from .form_schema import load_form_schema
+
+
+# Başlık eşleştirme: normalize edilmiş sütun adı -> alan
+COLUMN_ALIASES = {
+    'cn_code': ('cn_code', 'cn', 'cn_kodu', 'cn_kod', 'commodity_code', 'hs_code', 'gtip', 'tarife', 'taric'),
+    'quantity': ('quantity', 'quantity_t', 'quantity_tonnes', 'miktar', 'miktar_ton', 'net_mass_t', 'tonnes', 'ton'),
+    'quantity_kg': ('net_mass', 'net_mass_kg', 'net_mass_(kg)', 'kg', 'net_agirlik', 'net_ağırlık', 'net_weight_kg'),
+    'country': ('country', 'origin', 'origin_country', 'country_of_origin', 'mense', 'menşe', 'ulke', 'ülke'),
+    'foreign_carbon_price': ('foreign_carbon_price', 'carbon_price_paid'),
+}
+
+CHUNK_SIZE = 5000
+MAX_REPORTED_ERRORS = 20
+STATUS_FILE = 'status.json'
+
+# İndirilebilir çıktılar
+RESULT_FILES = {
+    'summary': ('summary.csv', 'text/csv'),
+    'lines': ('lines.csv.gz', 'application/gzip'),
+}
+
+
+def _normalize_header(name):
+    # 'GTİP'.lower() birleşik nokta üretir
+    text = str(name or '').strip().replace('İ', 'i').lower()
+    return '_'.join(text.replace('-', ' ').split())
+
+
+def resolve_columns(header):
+    """
+    Başlık satırından alan -> sütun indeksi eşlemesi
+
+    Args:
+        header (list): Başlık hücreleri
+
+    Returns:
+        dict: {'cn_code': i, 'quantity' veya 'quantity_kg': j, ...}
+
+    Raises:
+        ValueError: CN kodu veya miktar sütunu yoksa
+    """
+    normalized = [_normalize_header(h) for h in header]
+    columns = {}
+    for field, aliases in COLUMN_ALIASES.items():
+        for i, name in enumerate(normalized):
+            if name in aliases:
+                columns[field] = i
+                break
+
+    if 'cn_code' not in columns or not ({'quantity', 'quantity_kg'} & columns.keys()):
+        raise ValueError(f"CN kodu ve miktar sütunları bulunamadı. Mevcut sütunlar: {list(header)}")
+    return columns
+
+
+def parse_number(value):
+    """
+    Sayı hücresini float'a çevir ('1.234,5', '1,234.5', '12,5', 12.5)
+
+    Hem nokta hem virgül varsa sondaki ondalık ayırıcıdır; sadece virgül
+    varsa (AB gümrük dışa aktarımları) ondalık virgül kabul edilir.
+    """
+    if value is None or value == '':
+        return 0.0
+    if isinstance(value, (int, float)):
+        return float(value)
+
+    text = str(value).strip().replace(' ', '').replace(' ', '')
+    if ',' in text and '.' in text:
+        if text.rfind(',') > text.rfind('.'):
+            text = text.replace('.', '').replace(',', '.')
+        else:
+            text = text.replace(',', '')
+    elif ',' in text:
+        text = text.replace(',', '.')
+    return float(text)
+
+
+def _sniff_csv(path, sample_size=64 * 1024):
+    """Kodlama ve ayırıcıyı dosyanın başından tahmin et"""
+    with open(path, 'rb') as f:
+        sample = f.read(sample_size)
+
+    encoding = 'utf-8-sig'
+    try:
+        # Örnek çok baytlı bir karakterin ortasında bitebilir
+        sample.decode('utf-8', errors='strict')
+    except UnicodeDecodeError as e:
+        if e.start < len(sample) - 4:
+            encoding = 'cp1254'
+
+    text = sample.decode(encoding, errors='ignore')
+    try:
+        delimiter = csv.Sniffer().sniff(text.split('\n', 20)[0], delimiters=',;\t|').delimiter
+    except csv.Error:
+        delimiter = ','
+    return encoding, delimiter
+
+
+def iter_csv_rows(path):
+    """
+    CSV satırlarını akış halinde oku (dosya belleğe alınmaz)
+
+    Yields:
+        tuple: (satır hücreleri, ilerleme 0-1)
+    """
+    encoding, delimiter = _sniff_csv(path)
+    size = os.path.getsize(path) or 1
+    with open(path, 'rb') as raw:
+        text = io.TextIOWrapper(raw, encoding=encoding, errors='replace', newline='')
+        for row in csv.reader(text, delimiter=delimiter):
+            yield row, min(raw.tell() / size, 1.0)
+
+
+def iter_xlsx_rows(path):
+    """
+    XLSX satırlarını read-only modda akış halinde oku (openpyxl gerekir)
+
+    Yields:
+        tuple: (satır hücreleri, ilerleme 0-1 veya None)
+    """
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportError("XLSX yüklemesi için 'openpyxl' gerekli: pip install openpyxl")
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.active
+        total = sheet.max_row
+        for i, row in enumerate(sheet.iter_rows(values_only=True), start=1):
+            yield list(row), (i / total if total else None)
+    finally:
+        workbook.close()
+
+
+def iter_rows(path):
+    """Dosya uzantısına göre CSV veya XLSX okuyucu"""
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        return iter_xlsx_rows(path)
+    return iter_csv_rows(path)
+
+
+class CustomsImportJob:
+    """
+    Tek bir gümrük dosyasının işlenmesi
+
+    Satırlar CHUNK_SIZE'lık parçalar halinde CBAMCalculator.calculate_batch
+    ile hesaplanır. Satır sonuçları gzip'li CSV'ye yazılır, CN kodu ve menşe
+    ülke bazında toplamlar tutulur. Durum her parçadan sonra status.json'a
+    yazılır, böylece diğer worker process'leri de ilerlemeyi okuyabilir.
+    """
+
+    def __init__(self, job_dir, source_path, ets_price, chunk_size=CHUNK_SIZE):
+        self.job_dir = job_dir
+        self.source_path = source_path
+        self.chunk_size = chunk_size
+        self.calculator = CBAMCalculator(ets_price)
+        self.status = read_status(job_dir) or {}
+        self.status.update({'ets_price': ets_price})
+        self._groups = {}
+        # Miktar ve yabancı karbon fiyatı /api/v1/calculate ile aynı alan tanımlarıyla doğrulanır
+        self._specs = load_form_schema().web_form.by_id
+
+    def _parse_field(self, field_id, raw):
+        """
+        Hücreyi yerel sayı biçiminden çevir ve form alanı tanımıyla doğrula (sonlu, aralık)
+
+        Returns:
+            tuple: (değer, hata mesajı veya None)
+        """
+        try:
+            number = parse_number(raw)
+        except (TypeError, ValueError):
+            return None, f"'{field_id}' sayısal olmalı"
+        return self._specs[field_id].parse(number)
+
+    def _write_status(self, **updates):
+        self.status.update(updates)
+        write_status(self.job_dir, self.status)
+
+    def run(self):
+        """Dosyayı baştan sona işle; hatalar durum dosyasına yazılır"""
+        started = time.time()
+        self._write_status(state='running', started_at=started, progress=0.0,
+                           rows=0, calculated=0, unmatched=0, invalid=0, errors=[])
+        try:
+            lines_path = os.path.join(self.job_dir, RESULT_FILES['lines'][0])
+            with gzip.open(lines_path, 'wt', compresslevel=1, newline='', encoding='utf-8') as out:
+                writer = csv.writer(out)
+                writer.writerow(['line', 'cn_code', 'matched_cn_code', 'country', 'quantity_t',
+                                 'total_ei', 'total_emission', 'cbam_cost', 'cbam_cost_adjusted', 'error'])
+                self._process(writer)
+
+            self._write_summary()
+            self._write_status(state='done', progress=1.0, finished_at=time.time(),
+                               seconds=round(time.time() - started, 2), totals=self._totals())
+        except Exception as e:
+            self._write_status(state='failed', error=str(e), finished_at=time.time())
+            print(f"❌ Gümrük dosyası işlenemedi ({os.path.basename(self.job_dir)}): {e}")
+        finally:
+            # Yüklenen ham dosya artık gerekmiyor (yüzlerce MB olabilir)
+            try:
+                os.remove(self.source_path)
+            except FileNotFoundError:
+                pass
+
+    def _process(self, writer):
+        rows = iter_rows(self.source_path)
+        columns = None
+        chunk = []
+        line_no = 0
+        progress = 0.0
+
+        for cells, progress in rows:
+            if columns is None:
+                if not any(c not in (None, '') for c in cells):
+                    continue
+                columns = resolve_columns(cells)
+                continue
+            line_no += 1
+            if not any(c not in (None, '') for c in cells):
+                continue
+            chunk.append((line_no, cells))
+            if len(chunk) >= self.chunk_size:
+                self._calculate_chunk(chunk, columns, writer)
+                chunk = []
+                self._write_status(progress=round(progress or 0.0, 4))
+
+        if columns is None:
+            raise ValueError("Dosyada başlık satırı bulunamadı")
+        if chunk:
+            self._calculate_chunk(chunk, columns, writer)
+
+    def _calculate_chunk(self, chunk, columns, writer):
+        import numpy as np
+
+        def cell(cells, field):
+            index = columns.get(field)
+            if index is None or index >= len(cells):
+                return None
+            return cells[index]
+
+        # kg sütunu ton alanının aralığıyla (>= 0) doğrulanıp tona çevrilir
+        in_kg = 'quantity' not in columns
+        valid = []
+        keys, countries, quantities, foreign = [], [], [], []
+        for line_no, cells in chunk:
+            raw_code = cell(cells, 'cn_code')
+            quantity, error = self._parse_field('quantity', cell(cells, 'quantity_kg' if in_kg else 'quantity'))
+            if error is None:
+                if in_kg:
+                    quantity /= 1000.0
+                foreign_price, error = self._parse_field('foreign_carbon_price',
+                                                         cell(cells, 'foreign_carbon_price'))
+            if error is not None:
+                self._invalid(writer, line_no, raw_code, error)
+                continue
+
+            valid.append((line_no, raw_code))
+            keys.append(match_cn_code(raw_code) or '')
+            countries.append(str(cell(cells, 'country') or '').strip().upper())
+            quantities.append(quantity)
+            foreign.append(foreign_price)
+
+        self.status['rows'] += len(chunk)
+        if not valid:
+            return
+
+        with np.errstate(over='ignore', invalid='ignore'):
+            result = self.calculator.calculate_batch(keys, quantities, foreign)
+        # Çok büyük miktarlar taşabilir: sonlu olmayan sonuç toplamlara girmez
+        finite = np.isfinite(result['total_emission']) & np.isfinite(result['cbam_cost']) \
+            & np.isfinite(result['cbam_cost_adjusted'])
+        overflow = result['found'] & ~finite
+        found = result['found'] & finite
+        self.status['calculated'] += int(found.sum())
+        self.status['unmatched'] += int((~result['found']).sum())
+
+        columns_out = zip(found.tolist(), result['total_ei'].tolist(), result['total_emission'].tolist(),
+                          result['cbam_cost'].tolist(), result['cbam_cost_adjusted'].tolist())
+        for (line_no, raw_code), key, country, quantity, too_large, (ok, total_ei, emission, cost, adjusted) \
+                in zip(valid, keys, countries, quantities, overflow.tolist(), columns_out):
+            if ok:
+                writer.writerow([line_no, raw_code, key, country, quantity, total_ei, emission, cost, adjusted, ''])
+            elif too_large:
+                self._invalid(writer, line_no, raw_code, 'Sonuç sayısal aralığı aşıyor')
+            else:
+                writer.writerow([line_no, raw_code, '', country, quantity, '', '', '', '',
+                                 'CN kodu CBAM kapsamında değil'])
+
+        # (CN, ülke) grubu başına toplamlar: bincount ile tek geçişte
+        group_keys = [f'{k}\t{c}' for k, c in zip(keys, countries)]
+        unique, inverse = np.unique(np.array(group_keys, dtype=object)[found], return_inverse=True)
+        if not len(unique):
+            return
+        sums = {
+            'quantity_t': np.bincount(inverse, weights=np.asarray(quantities)[found]),
+            'total_emission': np.bincount(inverse, weights=result['total_emission'][found]),
+            'cbam_cost': np.bincount(inverse, weights=result['cbam_cost'][found]),
+            'cbam_cost_adjusted': np.bincount(inverse, weights=result['cbam_cost_adjusted'][found]),
+        }
+        counts = np.bincount(inverse)
+        for i, group in enumerate(unique.tolist()):
+            totals = self._groups.setdefault(group, {'lines': 0, 'quantity_t': 0.0, 'total_emission': 0.0,
+                                                     'cbam_cost': 0.0, 'cbam_cost_adjusted': 0.0})
+            totals['lines'] += int(counts[i])
+            for name, values in sums.items():
+                totals[name] += float(values[i])
+
+    def _invalid(self, writer, line_no, raw_code, error):
+        self.status['invalid'] += 1
+        if len(self.status['errors']) < MAX_REPORTED_ERRORS:
+            self.status['errors'].append(f"Satır {line_no}: {error}")
+        writer.writerow([line_no, raw_code, '', '', '', '', '', '', '', error])
+
+    def _totals(self):
+        fields = ('quantity_t', 'total_emission', 'cbam_cost', 'cbam_cost_adjusted')
+        return {name: sum(g[name] for g in self._groups.values()) for name in fields}
+
+    def _write_summary(self):
+        from .cn_code_database import CN_CODE_DATABASE
+
+        path = os.path.join(self.job_dir, RESULT_FILES['summary'][0])
+        with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(['cn_code', 'description', 'country', 'lines', 'quantity_t',
+                             'total_emission', 'cbam_cost', 'cbam_cost_adjusted'])
+            for group in sorted(self._groups, key=lambda g: -self._groups[g]['cbam_cost']):
+                key, country = group.split('\t')
+                totals = self._groups[group]
+                writer.writerow([key, CN_CODE_DATABASE[key]['description'], country, totals['lines'],
+                                 round(totals['quantity_t'], 3), round(totals['total_emission'], 3),
+                                 round(totals['cbam_cost'], 2), round(totals['cbam_cost_adjusted'], 2)])
+
+
+def read_status(job_dir):
+    try:
+        with open(os.path.join(job_dir, STATUS_FILE), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def write_status(job_dir, status):
+    path = os.path.join(job_dir, STATUS_FILE)
+    tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(status, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+class CustomsImportManager:
+    """
+    Yükleme işlerini arka plan thread havuzunda çalıştırır. İş durumu ve
+    çıktılar work_dir altında tutulur; tüm gunicorn worker'ları okuyabilir.
+    """
+
+    def __init__(self, work_dir, max_workers=2, retention_seconds=24 * 3600):
+        """
+        Initialize manager
+
+        Args:
+            work_dir (str): İş dizinlerinin kökü
+            max_workers (int): Aynı anda işlenecek en fazla dosya
+            retention_seconds (float): Bu süreden eski işler silinir
+        """
+        self.work_dir = work_dir
+        self.retention_seconds = retention_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='customs-import')
+        os.makedirs(self.work_dir, exist_ok=True)
+
+    def _job_dir(self, job_id):
+        # job_id dışarıdan (URL) gelir; hash'lenmiş ad yol enjeksiyonunu engeller
+        # ve farklı id'ler aynı dizine düşmez ('../j1' ile 'j1' ayrı)
+        digest = hashlib.sha256(str(job_id).encode('utf-8')).hexdigest()
+        return os.path.join(self.work_dir, digest)
+
+    def create_job(self, filename, owner=None):
+        """
+        Yeni iş dizini oluştur
+
+        Returns:
+            tuple: (job_id, yüklenen dosyanın kaydedileceği yol)
+        """
+        self.prune()
+        job_id = str(uuid.uuid4())
+        job_dir = self._job_dir(job_id)
+        os.makedirs(job_dir)
+
+        extension = '.xlsx' if filename.lower().endswith(('.xlsx', '.xlsm')) else '.csv'
+        write_status(job_dir, {'job_id': job_id, 'owner': owner, 'filename': filename,
+                               'state': 'uploading', 'created_at': time.time()})
+        return job_id, os.path.join(job_dir, f'upload{extension}')
+
+    def start(self, job_id, source_path, ets_price, chunk_size=CHUNK_SIZE):
+        """Yüklenen dosyanın işlenmesini arka planda başlat"""
+        job_dir = self._job_dir(job_id)
+        status = read_status(job_dir)
+        status.update(state='queued', bytes=os.path.getsize(source_path))
+        write_status(job_dir, status)
+        job = CustomsImportJob(job_dir, source_path, ets_price, chunk_size=chunk_size)
+        return self._executor.submit(job.run)
+
+    def status(self, job_id, owner=None):
+        """
+        İş durumu (başka oturuma aitse None)
+        """
+        status = read_status(self._job_dir(job_id))
+        if status is None or (status.get('owner') is not None and status['owner'] != owner):
+            return None
+        return {k: v for k, v in status.items() if k != 'owner'}
+
+    def result_path(self, job_id, kind, owner=None):
+        """
+        Tamamlanmış işin çıktı dosyası
+
+        Args:
+            kind (str): 'summary' veya 'lines'
+
+        Returns:
+            str or None: Dosya yolu
+        """
+        status = self.status(job_id, owner)
+        if status is None or status.get('state') != 'done' or kind not in RESULT_FILES:
+            return None
+        path = os.path.join(self._job_dir(job_id), RESULT_FILES[kind][0])
+        return path if os.path.exists(path) else None
+
+    def prune(self):
+        """Saklama süresi dolan iş dizinlerini sil"""
+        cutoff = time.time() - self.retention_seconds
+        for name in os.listdir(self.work_dir):
+            path = os.path.join(self.work_dir, name)
+            try:
+                if os.path.isdir(path) and os.stat(path).st_mtime < cutoff:
+                    shutil.rmtree(path, ignore_errors=True)
+            except FileNotFoundError:
+                continue
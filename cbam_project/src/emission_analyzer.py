@@ -3,26 +3,52 @@ Emission Analyzer Module
 Scope 1 and Scope 2 emissions calculation and analysis
 """
 
+from .emission_factors import default_registry
+
+# Toplu hesaplama: (aktivite sütunu, emisyon faktörü adı, Scope 1 kategorisi)
+SCOPE1_ACTIVITIES = (
+    ('coking_coal_ton', 'coking_coal', 'fuel'),
+    ('natural_gas_nm3', 'natural_gas', 'fuel'),
+    ('fuel_oil_ton', 'fuel_oil', 'fuel'),
+    ('diesel_liter', 'diesel', 'mobile'),
+    ('limestone_ton', 'limestone', 'process'),
+    ('electrode_ton', 'electrode', 'process'),
+    ('anode_ton', 'anode', 'process'),
+    ('reductants_ton', 'coke_injection', 'process'),
+    ('pfc_emissions_ton', 'pfc_emissions', 'process'),
+    ('ammonia_ton', 'ammonia', 'process'),
+    ('nitric_acid_ton', 'nitric_acid', 'process'),
+    ('alloy_elements_ton', 'alloy_elements', 'process'),
+    ('reheating_fuel_nm3', 'natural_gas', 'thermal'),
+    ('purchased_heat_mwh', 'purchased_heat', 'thermal'),
+)
+SCOPE1_CATEGORIES = ('fuel', 'mobile', 'process', 'thermal')
+
+# Dizi girdisinde sütun sırası: Scope 1 aktiviteleri + elektrik + çıktı
+BATCH_COLUMNS = tuple(column for column, _, _ in SCOPE1_ACTIVITIES) + (
+    'electricity_consumption_mwh', 'grid_emission_factor_kgco2_kwh', 'steel_output_ton'
+)
+
+# Market-based yaklaşımda sıfır emisyonlu elektrik kaynakları
+GREEN_SOURCES = ('irec', 'ppa', 'solar')
+
+
+def _category_indicator():
+    """(aktivite, kategori) 0/1 matrisi: aktivitenin hangi Scope 1 kategorisine düştüğü"""
+    import numpy as np
+    
+    matrix = np.zeros((len(SCOPE1_ACTIVITIES), len(SCOPE1_CATEGORIES)))
+    for row, (_, _, category) in enumerate(SCOPE1_ACTIVITIES):
+        matrix[row, SCOPE1_CATEGORIES.index(category)] = 1.0
+    return matrix
+
+
 class EmissionAnalyzer:
     """Scope 1 ve Scope 2 emisyon analizi ve hesaplaması"""
     
-    # Emisyon faktörleri (tCO2/birim)
-    EMISSION_FACTORS = {
-        'coking_coal': 1.6,          # tCO2/ton
-        'natural_gas': 0.000494,     # tCO2/Nm³
-        'fuel_oil': 3.1,             # tCO2/ton
-        'diesel': 0.0027,            # tCO2/Litre
-        'limestone': 0.44,           # tCO2/ton (CaCO3 -> CaO + CO2)
-        'electrode': 2.8,            # tCO2/ton (Graphite Elektrot)
-        'anode': 3.6,                # tCO2/ton (Karbon Anot)
-        'coke_injection': 3.1,       # tCO2/ton (Reductants)
-        'pfc_emissions': 1.0,        # tCO2e (tCO2e/ton Alüminyum * Al_ton)
-        'purchased_heat': 0.18,      # tCO2/MWh (Standard Steam/Heat factor)
-        'ammonia': 2.1,              # tCO2/ton (Amonyak Üretimi)
-        'nitric_acid': 0.3,          # tCO2/ton (Nitrik Asit - N2O emisyonu dahil)
-        'magnesium': 12.0,           # tCO2/ton (Aluminum Alloy Precursor)
-        'silicon': 5.0,              # tCO2/ton (Aluminum Alloy Precursor)
-    }
+    # Emisyon faktörleri (tCO2/birim): kayıttaki en güncel genel (GLOBAL) sürüm.
+    # Yıl/ülke bazlı değerler için src/emission_factors.py
+    EMISSION_FACTORS = default_registry().as_dict()
     
     def __init__(self):
         self.scope1_emissions = {}
@@ -65,7 +91,7 @@ class EmissionAnalyzer:
             'pfc': process.get('pfc_emissions_ton', 0) * self.EMISSION_FACTORS['pfc_emissions'],      # Aluminum
             'ammonia': process.get('ammonia_ton', 0) * self.EMISSION_FACTORS['ammonia'],             # Fertilizer
             'nitric_acid': process.get('nitric_acid_ton', 0) * self.EMISSION_FACTORS['nitric_acid'], # Fertilizer
-            'alloy_elements': process.get('alloy_elements_ton', 0) * 8.0                            # Aluminum Precursors
+            'alloy_elements': process.get('alloy_elements_ton', 0) * self.EMISSION_FACTORS['alloy_elements'] # Aluminum Precursors
         }
         
         # Termal sistem emisyonları (Dışarıdan satın alınan ısı dahil)
@@ -124,7 +150,7 @@ class EmissionAnalyzer:
         source_type = electricity.get('source_type', 'grid').lower() # grid, irec, ppa, solar
         
         # Yenilenebilir Kontrolü (Yeşil Enerji)
-        is_green = source_type in ['irec', 'ppa', 'solar']
+        is_green = source_type in GREEN_SOURCES
         
         if is_green:
             # Yeşil enerji -> 0 Emisyon (Market-based yaklaşım)
@@ -154,9 +180,195 @@ class EmissionAnalyzer:
         
         return self.scope2_emissions
     
-    def get_optimization_scenarios(self, scope1_data, scope2_data, ets_price):
+    def calculate_scope2_timeseries(self, meter_paths, grid_factor_csv, green_meters=(), residual_mix_factor=None):
+        """
+        Scope 2'yi saatlik sayaç verisi ve saatlik şebeke faktörüyle hesapla
+        
+        Args:
+            meter_paths (list): 15 dk / saatlik sayaç CSV'leri
+            grid_factor_csv (str): Saatlik şebeke faktörü CSV'si (tCO2/MWh)
+            green_meters (iterable): PPA / I-REC kapsamındaki sayaçlar
+            residual_mix_factor (float): Sertifikasız tüketim için residual mix (opsiyonel)
+            
+        Returns:
+            dict: calculate_scope2 ile aynı anahtarlar + location/market-based ve aylık/sayaç kırılımı
+        """
+        from .scope2_timeseries import GridFactorSeries, calculate_scope2_timeseries
+        
+        result = calculate_scope2_timeseries(
+            meter_paths, GridFactorSeries.from_csv(grid_factor_csv),
+            green_meters=green_meters, residual_mix_factor=residual_mix_factor
+        )
+        consumption_mwh = result['consumption_mwh']
+        
+        self.scope2_emissions = {
+            'consumption_mwh': consumption_mwh,
+            'grid_emission_factor': result['weighted_factor'],
+            'source_type': 'hourly',
+            'is_green_energy': bool(result['meters']) and all(m['green'] for m in result['meters'].values()),
+            'description': "Hourly Grid Factor (Location & Market-based)",
+            'total_grid_emissions': result['location_based_tco2'],
+            # calculate_scope2 ile tutarlı: sertifikalı tüketim sıfır (market-based)
+            'total_scope2': result['market_based_tco2'],
+            'location_based_tco2': result['location_based_tco2'],
+            'market_based_tco2': result['market_based_tco2'],
+            'flat_factor_tco2': result['flat_factor_tco2'],
+            'monthly': result['monthly'],
+            'meters': result['meters'],
+            'breakdown': {
+                'grid_kwh': consumption_mwh * 1000,
+                'emissions_tco2': result['market_based_tco2']
+            }
+        }
+        
+        return self.scope2_emissions
+    
+    @classmethod
+    def factor_matrix(cls, factors=None, year=None, country=None):
+        """
+        SCOPE1_ACTIVITIES x SCOPE1_CATEGORIES faktör matrisi
+        
+        Args:
+            factors (dict): Faktör değerlerinin üzerine yazılacaklar (opsiyonel)
+            year (int): Faktör sürüm yılı (None ve country None ise EMISSION_FACTORS)
+            country (str): Ülke kodu
+            
+        Returns:
+            ndarray: (len(SCOPE1_ACTIVITIES), len(SCOPE1_CATEGORIES)), tCO2/birim
+        """
+        if year is None and country is None:
+            base = cls.EMISSION_FACTORS
+        else:
+            base = default_registry().as_dict(year, country)
+        merged = {**base, **(factors or {})}
+        matrix = _category_indicator()
+        for row, (_, factor, _) in enumerate(SCOPE1_ACTIVITIES):
+            matrix[row] *= merged[factor]
+        return matrix
+    
+    @classmethod
+    def calculate_batch(cls, activity, factor_matrix=None, source_types=None, years=None, countries=None):
+        """
+        Çok tesis / çok dönem Scope 1 & 2 hesabı (tek vektörel geçiş)
+        
+        Instance durumu kullanmaz; aynı anda birden çok thread'den çağrılabilir.
+        
+        Args:
+            activity: Satır başına tesis-dönem verisi. DataFrame veya sütun adı ->
+                dizi sözlüğü (BATCH_COLUMNS adları; eksik sütun 0, steel_output_ton
+                eksikse 1, isteğe bağlı 'source_type') ya da BATCH_COLUMNS
+                sırasında (n, len(BATCH_COLUMNS)) dizi
+            factor_matrix (ndarray): factor_matrix() çıktısı (None ise EMISSION_FACTORS)
+            source_types (array-like): Dizi girdisinde satır başına elektrik kaynağı
+            years (array-like or int): Satır başına veya tüm satırlar için faktör yılı
+                ('year' sütunu da kullanılabilir)
+            countries (array-like or str): Satır başına veya tüm satırlar için ülke kodu
+                ('country' sütunu da kullanılabilir)
+            
+        Yıl/ülke verildiğinde her satırın faktörleri kayıttan toplu çözülür
+        (geçmiş yılın yeniden hesabı güncel yılla aynı maliyettedir). Şebeke
+        faktörü sütunu yoksa 'grid_electricity' kaydı kullanılır.
+            
+        Returns:
+            dict: Satır başına numpy dizileri (DataFrame girdisinde aynı index'li DataFrame):
+                fuel/mobile/process/thermal, scope1, scope2, total, scope1_intensity,
+                intensity, pct_<kategori> (Scope 1 içi %), pct_scope1, pct_scope2
+        """
+        import numpy as np
+        
+        registry = default_registry()
+        n_scope1 = len(SCOPE1_ACTIVITIES)
+        
+        is_frame = hasattr(activity, 'columns')
+        if hasattr(activity, 'keys'):
+            n = len(activity) if is_frame else len(next(iter(activity.values()), ()))
+            
+            def column(name, default=0.0):
+                if name in activity:
+                    return np.asarray(activity[name], dtype=float)
+                return np.full(n, default)
+            
+            X = np.column_stack([column(name) for name in BATCH_COLUMNS[:n_scope1]]).reshape(n, n_scope1)
+            electricity = column('electricity_consumption_mwh')
+            output = column('steel_output_ton', 1.0)
+            if source_types is None and 'source_type' in activity:
+                source_types = activity['source_type']
+            if years is None and 'year' in activity:
+                years = activity['year']
+            if countries is None and 'country' in activity:
+                countries = activity['country']
+            
+            if 'grid_emission_factor_kgco2_kwh' in activity:
+                grid_factor = column('grid_emission_factor_kgco2_kwh')
+            else:
+                grid_factor = np.broadcast_to(registry.resolve(
+                    'grid_electricity',
+                    None if years is None else np.asarray(years),
+                    None if countries is None else np.asarray(countries)
+                ), (n,))
+        else:
+            data = np.asarray(activity, dtype=float)
+            X = data[:, :n_scope1]
+            electricity, grid_factor, output = data[:, n_scope1], data[:, n_scope1 + 1], data[:, n_scope1 + 2]
+        
+        # Skaler yıl/ülke (ör. tüm partiyi 2023 faktörleriyle yeniden hesapla) her satıra yayılır
+        if years is not None:
+            years = np.broadcast_to(np.asarray(years), (len(X),))
+        if countries is not None:
+            countries = np.broadcast_to(np.asarray(countries), (len(X),))
+        
+        # Scope 1: (n, aktivite) @ (aktivite, kategori)
+        if factor_matrix is None and (years is not None or countries is not None):
+            # Satır başına faktörler: (1, aktivite) adlar x (n, 1) yıl/ülke
+            names = np.array([factor for _, factor, _ in SCOPE1_ACTIVITIES])[None, :]
+            factors = registry.resolve(
+                names,
+                None if years is None else np.asarray(years)[:, None],
+                None if countries is None else np.asarray(countries)[:, None]
+            )
+            by_category = (X * factors) @ _category_indicator()
+        else:
+            matrix = cls.factor_matrix() if factor_matrix is None else factor_matrix
+            by_category = X @ matrix
+        scope1 = by_category.sum(axis=1)
+        
+        # Scope 2: kgCO2/kWh == tCO2/MWh; yeşil kaynaklar sıfır
+        scope2 = electricity * grid_factor
+        if source_types is not None:
+            sources = np.char.lower(np.asarray(source_types, dtype=str))
+            scope2 = np.where(np.isin(sources, GREEN_SOURCES), 0.0, scope2)
+        total = scope1 + scope2
+        
+        def ratio(numerator, denominator):
+            return np.divide(numerator, denominator, out=np.zeros_like(numerator, dtype=float),
+                             where=denominator > 0)
+        
+        result = {category: by_category[:, i] for i, category in enumerate(SCOPE1_CATEGORIES)}
+        result.update({
+            'scope1': scope1,
+            'scope2': scope2,
+            'total': total,
+            'scope1_intensity': ratio(scope1, output),
+            'intensity': ratio(total, output)
+        })
+        shares = ratio(by_category, scope1[:, None]) * 100
+        for i, category in enumerate(SCOPE1_CATEGORIES):
+            result[f'pct_{category}'] = shares[:, i]
+        result['pct_scope1'] = ratio(scope1, total) * 100
+        result['pct_scope2'] = ratio(scope2, total) * 100
+        
+        if is_frame:
+            import pandas as pd
+            return pd.DataFrame(result, index=activity.index)
+        return result
+    
+    def get_optimization_scenarios(self, scope1_data, scope2_data, ets_price, investment_budget=None):
         """
         Optimizasyon senaryoları üret
+        
+        Args:
+            investment_budget (float): Verilirse 'combined' tüm senaryoların toplamı yerine
+                bu bütçe altında en yüksek yıllık net faydalı portföydür (AbatementOptimizer)
         """
         scenarios = {}
         
@@ -216,14 +428,21 @@ class EmissionAnalyzer:
         # Eğer process inputlarında hurda/rate bilgisi varsa buraya eklenebilir
         
         # Kombine senaryo
-        if len(scenarios) > 1:
-            total_emission_saving = sum(s['emission_saving_tco2'] for s in scenarios.values())
-            total_cost_saving = sum(s['annual_cbam_saving_eur'] for s in scenarios.values())
-            total_investment = sum(s['investment_needed_eur'] for s in scenarios.values())
+        included = list(scenarios.keys())
+        if investment_budget is not None and len(scenarios) > 1:
+            from .abatement_optimizer import AbatementOptimizer, measures_from_scenarios
+            
+            optimizer = AbatementOptimizer(measures_from_scenarios(scenarios), ets_price)
+            included = optimizer.optimize(investment_budget)['selected']
+        
+        if len(scenarios) > 1 and included:
+            total_emission_saving = sum(scenarios[k]['emission_saving_tco2'] for k in included)
+            total_cost_saving = sum(scenarios[k]['annual_cbam_saving_eur'] for k in included)
+            total_investment = sum(scenarios[k]['investment_needed_eur'] for k in included)
             
             scenarios['combined'] = {
                 'name': 'Kombine Dönüşüm Stratejisi',
-                'included_scenarios': list(scenarios.keys()),
+                'included_scenarios': included,
                 'total_emission_saving_tco2': total_emission_saving,
                 'total_annual_cbam_saving_eur': total_cost_saving,
                 'total_investment_needed_eur': total_investment,
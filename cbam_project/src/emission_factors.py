@@ -0,0 +1,238 @@
+"""
+Emission Factors Module
+Yıl ve ülke bazlı sürümlenmiş emisyon faktörü kaydı (dizi tabanlı, O(1) erişim)
+"""
+
+import warnings
+from datetime import date
+from functools import lru_cache
+
+import numpy as np
+
+
+# Ülkeye özel değeri olmayan faktörler için genel sütun
+GLOBAL = '*'
+
+# (faktör, geçerlilik başlangıç yılı, ülke, değer, birim, kaynak)
+# Bir sürüm, aynı faktör/ülke için daha yeni bir yıl eklenene kadar geçerlidir.
+FACTOR_VERSIONS = [
+    ('coking_coal', 2023, GLOBAL, 1.6, 'tCO2/t', 'IPCC 2006'),
+    ('natural_gas', 2023, GLOBAL, 0.000494, 'tCO2/Nm3', 'IPCC 2006'),
+    ('fuel_oil', 2023, GLOBAL, 3.1, 'tCO2/t', 'IPCC 2006'),
+    ('diesel', 2023, GLOBAL, 0.0027, 'tCO2/L', 'IPCC 2006'),
+    ('limestone', 2023, GLOBAL, 0.44, 'tCO2/t', 'IPCC 2006 (CaCO3 -> CaO + CO2)'),
+    ('electrode', 2023, GLOBAL, 2.8, 'tCO2/t', 'IPCC 2006 (grafit elektrot)'),
+    ('anode', 2023, GLOBAL, 3.6, 'tCO2/t', 'IPCC 2006 (karbon anot)'),
+    ('coke_injection', 2023, GLOBAL, 3.1, 'tCO2/t', 'IPCC 2006'),
+    ('pfc_emissions', 2023, GLOBAL, 1.0, 'tCO2e/tCO2e', 'Doğrudan tCO2e girdisi'),
+    ('purchased_heat', 2023, GLOBAL, 0.18, 'tCO2/MWh', 'Standart buhar/ısı faktörü'),
+    ('ammonia', 2023, GLOBAL, 2.1, 'tCO2/t', 'IPCC 2006'),
+    ('nitric_acid', 2023, GLOBAL, 0.3, 'tCO2/t', 'IPCC 2006 (N2O dahil)'),
+    ('magnesium', 2023, GLOBAL, 12.0, 'tCO2/t', 'Alüminyum alaşım öncülü'),
+    ('silicon', 2023, GLOBAL, 5.0, 'tCO2/t', 'Alüminyum alaşım öncülü'),
+    ('alloy_elements', 2023, GLOBAL, 8.0, 'tCO2/t', 'Mg/Si karışık alaşım öncülü (ortalama)'),
+    ('grid_electricity', 2023, GLOBAL, 0.44, 'tCO2/MWh', 'GreFins varsayılanı (web formu)'),
+    ('grid_electricity', 2023, 'TR', 0.44, 'tCO2/MWh', 'IEA 2023 (yaklaşık)'),
+    ('grid_electricity', 2023, 'CN', 0.58, 'tCO2/MWh', 'IEA 2023 (yaklaşık)'),
+    ('grid_electricity', 2023, 'IN', 0.71, 'tCO2/MWh', 'IEA 2023 (yaklaşık)'),
+    ('grid_electricity', 2023, 'AE', 0.40, 'tCO2/MWh', 'IEA 2023 (yaklaşık)'),
+    ('grid_electricity', 2023, 'US', 0.37, 'tCO2/MWh', 'IEA 2023 (yaklaşık)'),
+]
+
+
+class UnknownCountryWarning(UserWarning):
+    """Kayıtta olmayan ülke kodu GLOBAL faktörle çözüldü"""
+
+
+def _codes(values, index):
+    """Metin dizisini indeks dizisine çevir (tekil değer başına bir sözlük araması; yoksa -1)"""
+    values = np.asarray(values)
+    uniques, inverse = np.unique(values, return_inverse=True)
+    codes = np.array([index.get(u, -1) for u in uniques.tolist()], dtype=np.intp)
+    return codes[inverse].reshape(values.shape)
+
+
+class FactorRegistry:
+    """
+    Sürümlenmiş faktör tablosu
+
+    Değerler (faktör, yıl, ülke) boyutlu bir numpy dizisinde tutulur. Kurulumda
+    her hücre çözülür: yıl ekseninde son geçerli sürüm ileri taşınır, ülkeye
+    özel değer yoksa GLOBAL sütunu kullanılır. Böylece geçmiş bir yılın
+    faktörleriyle yeniden hesaplama da tek bir dizi indekslemesidir.
+    """
+
+    def __init__(self, versions=FACTOR_VERSIONS, last_year=None):
+        """
+        Args:
+            versions (list): (faktör, yıl, ülke, değer, birim, kaynak) kayıtları
+            last_year (int): Tablonun son yılı (varsayılan: bu yıl veya en yeni sürüm)
+        """
+        self.versions = list(versions)
+        self.factors = tuple(sorted({v[0] for v in self.versions}))
+        self.countries = (GLOBAL,) + tuple(sorted({v[2] for v in self.versions} - {GLOBAL}))
+        self.first_year = min(v[1] for v in self.versions)
+        self.last_year = max([v[1] for v in self.versions] + [last_year or date.today().year])
+        self.years = tuple(range(self.first_year, self.last_year + 1))
+        self.sources = tuple(sorted({v[5] for v in self.versions}))
+        self.units = {}
+
+        self._factor_index = {name: i for i, name in enumerate(self.factors)}
+        self._country_index = {code: i for i, code in enumerate(self.countries)}
+        source_index = {source: i for i, source in enumerate(self.sources)}
+
+        shape = (len(self.factors), len(self.years), len(self.countries))
+        raw = np.full(shape, np.nan)
+        raw_source = np.full(shape, -1, dtype=np.intp)
+        for name, year, country, value, unit, source in self.versions:
+            if self.units.setdefault(name, unit) != unit:
+                raise ValueError(f"'{name}' için farklı birimler: {self.units[name]} / {unit}")
+            cell = (self._factor_index[name], year - self.first_year, self._country_index[country])
+            raw[cell] = value
+            raw_source[cell] = source_index[source]
+
+        # Yıl ekseninde ileri doldurma: her hücre için son tanımlı yılın indeksi
+        defined = ~np.isnan(raw)
+        last = np.where(defined, np.arange(len(self.years))[None, :, None], 0)
+        np.maximum.accumulate(last, axis=1, out=last)
+        values = np.take_along_axis(raw, last, axis=1)
+        source_ids = np.take_along_axis(raw_source, last, axis=1)
+
+        # Ülke değeri yoksa GLOBAL
+        missing = np.isnan(values)
+        values = np.where(missing, values[:, :, :1], values)
+        source_ids = np.where(missing, source_ids[:, :, :1], source_ids)
+
+        self.values = values
+        self.source_ids = source_ids
+        self.values.flags.writeable = False
+
+    def _year_positions(self, years):
+        """
+        Yılları yıl ekseni indeksine çevir (son yıldan sonrası son yıla kırpılır)
+
+        Raises:
+            ValueError: Sonlu bir tam sayı olmayan yıl varsa (NaN tam sayıya çevrilince
+                INT64_MIN olur ve sessizce yanlış yıla düşerdi)
+            KeyError: İlk sürüm yılından önceki yıl varsa
+        """
+        years = np.asarray(years)
+        if years.dtype.kind not in 'iu':
+            try:
+                numeric = years.astype(float)
+            except (TypeError, ValueError):
+                raise ValueError(f"Geçersiz yıl: {years.ravel()[:5].tolist()}") from None
+            invalid = ~np.isfinite(numeric) | (numeric != np.floor(numeric))
+            if invalid.any():
+                raise ValueError(f"Yıl sonlu bir tam sayı olmalı: {numeric[invalid].ravel()[0]}")
+            years = numeric
+        if (years < self.first_year).any():
+            raise KeyError(f"{years[years < self.first_year].ravel()[0]:.0f} yılı için sürüm yok "
+                           f"(ilk yıl {self.first_year})")
+        return (np.minimum(years, self.last_year) - self.first_year).astype(np.intp)
+
+    def _country_positions(self, countries):
+        """
+        Ülke kodlarını ülke ekseni indeksine çevir
+
+        Kodlar büyük harfe çevrilir ('tr' -> 'TR'). Boş/eksik kod GLOBAL'dir;
+        kayıtta olmayan kodlar da GLOBAL'e düşer ve UnknownCountryWarning ile bildirilir.
+        """
+        uniques, inverse = np.unique(np.asarray(countries, dtype=str), return_inverse=True)
+        codes = np.zeros(len(uniques), dtype=np.intp)
+        unknown = []
+        for i, raw in enumerate(uniques.tolist()):
+            code = raw.strip().upper()
+            # None / NaN str'ye çevrilince 'None' / 'nan' olur: eksik değer
+            if code in ('', 'NONE', 'NAN', GLOBAL):
+                continue
+            if code in self._country_index:
+                codes[i] = self._country_index[code]
+            else:
+                unknown.append(raw)
+        if unknown:
+            warnings.warn(f"Kayıtta olmayan ülke kodları GLOBAL faktörle çözüldü: {', '.join(unknown)}",
+                          UnknownCountryWarning, stacklevel=3)
+        return codes[inverse].reshape(np.shape(countries))
+
+    def _cell(self, factor, year, country):
+        try:
+            f = self._factor_index[factor]
+        except KeyError:
+            raise KeyError(f"Tanımsız emisyon faktörü: {factor}") from None
+        y = len(self.years) - 1 if year is None else int(self._year_positions(year))
+        c = 0 if country is None else int(self._country_positions(country))
+        return f, y, c
+
+    def get(self, factor, year=None, country=None):
+        """
+        Tek faktör değeri (O(1))
+
+        Args:
+            factor (str): Faktör adı (ör. 'natural_gas')
+            year (int): Raporlama yılı (None ise en güncel)
+            country (str): ISO ülke kodu, büyük/küçük harf duyarsız (None veya
+                tanımsızsa GLOBAL; tanımsız kod UnknownCountryWarning ile bildirilir)
+
+        Returns:
+            float: Faktör değeri
+
+        Raises:
+            KeyError: Faktör tanımsızsa veya yıl ilk sürümden önceyse
+            ValueError: Yıl sonlu bir tam sayı değilse
+        """
+        value = self.values[self._cell(factor, year, country)]
+        if np.isnan(value):
+            raise KeyError(f"{factor}: {year} / {country} için değer yok")
+        return float(value)
+
+    def source(self, factor, year=None, country=None):
+        """Değerin kaynağı (denetim izi için)"""
+        return self.sources[self.source_ids[self._cell(factor, year, country)]]
+
+    def as_dict(self, year=None, country=None):
+        """
+        Bir yıl/ülke için tüm faktörler
+
+        Returns:
+            dict: Faktör adı -> değer (o yılda tanımsız olanlar hariç)
+        """
+        _, y, c = self._cell(self.factors[0], year, country)
+        column = self.values[:, y, c]
+        return {name: float(value) for name, value in zip(self.factors, column) if not np.isnan(value)}
+
+    def resolve(self, factors, years=None, countries=None):
+        """
+        Toplu çözümleme: girdiler numpy broadcast kurallarıyla birleşir
+
+        Args:
+            factors (array-like): Faktör adları (ör. (1, k) sütun adları)
+            years (array-like): Yıllar (ör. (n, 1) satır yılları); None ise en güncel
+            countries (array-like): Ülke kodları, büyük/küçük harf duyarsız; None veya
+                tanımsız kod GLOBAL (tanımsız kodlar UnknownCountryWarning ile bildirilir)
+
+        Returns:
+            ndarray: Broadcast şeklinde faktör değerleri
+
+        Raises:
+            KeyError: Tanımsız faktör veya sürümü olmayan yıl varsa
+            ValueError: Sonlu tam sayı olmayan (ör. NaN, 2024.5) yıl varsa
+        """
+        f = _codes(factors, self._factor_index)
+        if (f < 0).any():
+            unknown = np.asarray(factors)[f < 0].ravel()[0]
+            raise KeyError(f"Tanımsız emisyon faktörü: {unknown}")
+
+        y = np.full(1, len(self.years) - 1) if years is None else self._year_positions(years)
+        c = np.zeros(1, dtype=np.intp) if countries is None else self._country_positions(countries)
+
+        values = self.values[f, y, c]
+        if np.isnan(values).any():
+            raise KeyError("Bazı faktörlerin istenen yıl için değeri yok")
+        return values
+
+
+@lru_cache(maxsize=1)
+def default_registry():
+    """FACTOR_VERSIONS'tan kurulan paylaşılan kayıt (process başına bir kez)"""
+    return FactorRegistry()
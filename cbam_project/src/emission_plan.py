@@ -0,0 +1,203 @@
+"""
+Emission Plan Module
+cbam_form_config.json'daki sektör girdilerinden derlenmiş emisyon planı:
+(sektör, rota) başına faktör matrisi, tek tesis için tek dot product,
+çok tesis için tek matris çarpımı
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from .emission_factors import default_registry
+from .form_schema import load_form_schema
+
+
+# Plan çıktısındaki emisyon kategorileri (sütunlar)
+CATEGORIES = ('fuel', 'process', 'scope2')
+
+
+class EmissionPlan:
+    """
+    Tek bir (sektör, rota) için derlenmiş plan
+
+    Girdi vektörü x, config'deki alan sırasıyla temel birimde değerlerdir
+    (seçim alanları 'multipliers' ile sayıya çevrilir). Emisyon yaratan her
+    girdi için aktivite = x_i * Π x_çarpanlar, emisyon = aktivite @ F.
+
+    Attributes:
+        inputs (tuple): Vektördeki alan id'leri (rotada gizli alanlar hariç)
+        emitters (tuple): Faktörü olan alan id'leri
+        factors (ndarray): (len(emitters), len(CATEGORIES)) faktör matrisi
+    """
+
+    def __init__(self, sector, route, fields, grid_factor=None, year=None, country=None):
+        """
+        Args:
+            sector (str): Sektör anahtarı
+            route (str): Üretim rotası
+            fields (list): Config alan tanımları (grup sırasıyla)
+            grid_factor (float): Şebeke elektriği faktörü, tCO2/MWh (None ise kayıttan)
+            year (int): Faktör sürüm yılı (None ise en güncel)
+            country (str): Faktörlerin ülkesi (None ise GLOBAL)
+        """
+        self.sector = sector
+        self.route = route
+        self.year = year
+        self.country = country
+        if grid_factor is None:
+            grid_factor = default_registry().get('grid_electricity', year, country)
+        self.grid_factor = grid_factor
+
+        schema_fields = load_form_schema().sectors[sector].by_id
+        fields = [f for f in fields if 'show_if_route' not in f or route in f['show_if_route']]
+        self.inputs = tuple(f['id'] for f in fields)
+        position = {field_id: i for i, field_id in enumerate(self.inputs)}
+
+        # Seçim alanları: seçenek -> sayı
+        self.multipliers = {f['id']: f['emission']['multipliers'] for f in fields
+                            if 'multipliers' in f.get('emission', {})}
+
+        emitters, rows, scale_columns, scales = [], [], [], []
+        for f in fields:
+            spec = f.get('emission', {})
+            if 'factor' not in spec:
+                continue
+            row = np.zeros(len(CATEGORIES))
+            row[CATEGORIES.index(spec['category'])] = self._resolve_factor(spec['factor'])
+
+            columns, scale = [], 1.0
+            for other in spec.get('multiply_by', []):
+                if other not in position:
+                    raise ValueError(f"{sector}/{route}: '{f['id']}' için çarpan alanı yok: {other}")
+                columns.append(position[other])
+                # Yüzde alanları çarpan olarak kesre çevrilir
+                if schema_fields[other].base_unit == '%':
+                    scale *= 0.01
+
+            emitters.append(f['id'])
+            rows.append(row)
+            scale_columns.append(columns)
+            scales.append(scale)
+
+        self.emitters = tuple(emitters)
+        self.factors = np.array(rows).reshape(len(rows), len(CATEGORIES))
+        self._emitter_columns = np.array([position[e] for e in emitters], dtype=np.intp)
+        self._scale_columns = scale_columns
+        self._scales = np.array(scales)
+
+    def _resolve_factor(self, factor):
+        if isinstance(factor, (int, float)):
+            return float(factor)
+        if factor == 'grid_electricity':
+            return self.grid_factor
+        return default_registry().get(factor, self.year, self.country)
+
+    def vector(self, values):
+        """
+        Çözülmüş girdileri (FormRecord.values) plan vektörüne çevir
+
+        Args:
+            values (dict): Alan id'si -> temel birimde değer
+
+        Returns:
+            ndarray: (len(inputs),) girdi vektörü
+        """
+        x = np.zeros(len(self.inputs))
+        for i, field_id in enumerate(self.inputs):
+            value = values.get(field_id)
+            if field_id in self.multipliers:
+                value = self.multipliers[field_id].get(value, 0.0)
+            x[i] = value or 0.0
+        return x
+
+    def activities(self, X):
+        """
+        Emisyon yaratan girdilerin aktivite miktarları
+
+        Args:
+            X (ndarray): (n, len(inputs)) veya (len(inputs),) girdi matrisi
+
+        Returns:
+            ndarray: (n, len(emitters)) veya (len(emitters),)
+        """
+        X = np.asarray(X, dtype=float)
+        A = X[..., self._emitter_columns] * self._scales
+        for j, columns in enumerate(self._scale_columns):
+            for column in columns:
+                A[..., j] *= X[..., column]
+        return A
+
+    def evaluate(self, values):
+        """
+        Tek tesis: aktivite vektörü ile faktör matrisinin dot product'ı
+
+        Args:
+            values (dict): FormRecord.values
+
+        Returns:
+            dict: {'by_input', 'by_category', 'scope1', 'scope2', 'total', 'intensity'} (tCO2)
+        """
+        x = self.vector(values)
+        a = self.activities(x)
+        by_category = a @ self.factors
+        scope1 = float(by_category[0] + by_category[1])
+        total = float(by_category.sum())
+        production = values.get('production_quantity') or 0
+        return {
+            'by_input': dict(zip(self.emitters, (a[:, None] * self.factors).sum(axis=1).tolist())),
+            'by_category': dict(zip(CATEGORIES, by_category.tolist())),
+            'scope1': scope1,
+            'scope2': float(by_category[2]),
+            'total': total,
+            'intensity': total / production if production > 0 else 0
+        }
+
+    def evaluate_many(self, X):
+        """
+        Çok tesis: tek matris çarpımı
+
+        Args:
+            X (ndarray): (n, len(inputs)) girdi matrisi (satır başına vector() çıktısı)
+
+        Returns:
+            dict: 'by_category' (n, 3) dizisi ile 'scope1', 'scope2', 'total' (n,) dizileri
+        """
+        E = self.activities(X) @ self.factors
+        return {
+            'by_category': E,
+            'scope1': E[:, 0] + E[:, 1],
+            'scope2': E[:, 2],
+            'total': E.sum(axis=1)
+        }
+
+
+def compile_plans(grid_factor=None, year=None, country=None):
+    """
+    Config'deki tüm (sektör, rota) kombinasyonları için planları derle
+
+    Returns:
+        dict: (sektör, rota) -> EmissionPlan
+    """
+    config = load_form_schema().config
+    plans = {}
+    for sector_key, sector in config.get('sectors', {}).items():
+        fields = [field for group in sector.get('inputs', {}).values() for field in group]
+        for route in sector.get('routes', {}):
+            plans[(sector_key, route)] = EmissionPlan(sector_key, route, fields, grid_factor, year, country)
+    return plans
+
+
+@lru_cache(maxsize=32)
+def _plans(grid_factor, year, country):
+    return compile_plans(grid_factor, year, country)
+
+
+def get_plan(sector, route, grid_factor=None, year=None, country=None):
+    """
+    Önbellekli plan
+
+    Raises:
+        KeyError: Sektör/rota config'de yoksa
+    """
+    return _plans(grid_factor, year, country)[(sector, route)]
@@ -4,8 +4,6 @@ Uses Gemini LLM to predict future ETS carbon prices
 """
 
 import pandas as pd
-import numpy as np
-from google import genai
 
 
 class ETSPricePredictor:
@@ -167,19 +165,20 @@ Quarter | Forecasted Value
 """
         return prompt
     
-    def predict(self, csv_path, model="gemini-2.0-flash"):
+    def predict(self, csv_path, model="gemini-2.0-flash", history=None):
         """
         Generate ETS price forecast
         
         Args:
             csv_path (str): Path to historical data CSV
             model (str): Gemini model to use
+            history (pandas.DataFrame): Önceden ayrıştırılmış load_data çıktısı (verilirse CSV okunmaz)
             
         Returns:
             pandas.DataFrame: Forecast table with quarters and prices
         """
         # Load and process data
-        df = self.load_data(csv_path)
+        df = history if history is not None else self.load_data(csv_path)
         
         # Calculate statistics
         stats = self.calculate_statistics(df)
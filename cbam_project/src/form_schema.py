@@ -0,0 +1,283 @@
+"""
+Form Schema Module
+cbam_form_config.json'u bir kez derleyip Flask formu, JSON gövdesi ve
+Streamlit girdileri için tek geçişte doğrulayan/çözen decoder
+"""
+
+import os
+import json
+import math
+from functools import lru_cache
+
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           'cbam_form_config.json')
+
+# Gösterim birimi -> (hesaplamada kullanılan birim, çarpan)
+UNIT_FACTORS = {
+    'kg/ton': ('t/t', 0.001),
+    'kg/ton Al': ('t/t', 0.001),
+    'kg CO2/ton Klinker': ('tCO2/t', 0.001),
+    'kg': ('t', 0.001),
+    'kWh': ('MWh', 0.001),
+}
+
+# Streamlit widget tipleri -> decoder tipleri
+_WIDGET_TYPES = {'number_input': 'number', 'slider': 'integer', 'selectbox': 'select'}
+
+
+class FormValidationError(ValueError):
+    """
+    Form doğrulama hatası
+
+    Attributes:
+        errors (dict): Alan id'si -> hata mesajı
+    """
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__('; '.join(errors.values()))
+
+
+class FieldSpec:
+    """Derlenmiş tek bir alan: tip, yol, aralık, varsayılan ve birim çarpanı"""
+
+    __slots__ = ('id', 'path', 'kind', 'required', 'default', 'min', 'max',
+                 'options', 'max_length', 'unit', 'base_unit', 'factor', 'routes')
+
+    def __init__(self, field, path=None):
+        self.id = field['id']
+        self.path = tuple((path or field.get('path') or field['id']).split('.'))
+        self.kind = _WIDGET_TYPES.get(field['type'], field['type'])
+        if self.kind not in ('number', 'integer', 'select', 'text'):
+            raise ValueError(f"'{self.id}': bilinmeyen alan tipi {field['type']}")
+
+        self.required = field.get('required', False)
+        self.min = field.get('min')
+        self.max = field.get('max')
+        self.max_length = field.get('max_length')
+        options = field.get('options')
+        if options is not None:
+            options = tuple(opt['value'] if isinstance(opt, dict) else opt for opt in options)
+        self.options = options
+        self.routes = frozenset(field['show_if_route']) if 'show_if_route' in field else None
+
+        self.unit = field.get('unit', '')
+        self.base_unit, self.factor = UNIT_FACTORS.get(self.unit, (self.unit, 1.0))
+
+        default = field.get('default')
+        if default is None and self.kind in ('number', 'integer') and not self.required:
+            default = self.min if self.min is not None else 0
+        if default is None and self.kind == 'select' and options:
+            default = options[0]
+        self.default = self._convert(default) if default is not None else None
+
+    def _convert(self, value):
+        if self.kind == 'integer':
+            return int(round(value * self.factor)) if self.factor != 1.0 else int(value)
+        if self.kind == 'number':
+            return float(value) * self.factor
+        return value
+
+    def parse(self, raw):
+        """
+        Ham değeri doğrula ve tipine/temel birimine çevir
+
+        Returns:
+            tuple: (değer, hata mesajı veya None)
+        """
+        if self.kind in ('number', 'integer'):
+            if isinstance(raw, bool):
+                return None, f"'{self.id}' sayısal olmalı"
+            try:
+                value = float(raw)
+            except (TypeError, ValueError):
+                return None, f"'{self.id}' sayısal olmalı"
+            if not math.isfinite(value):
+                return None, f"'{self.id}' sonlu olmalı"
+            if self.kind == 'integer' and value != int(value):
+                return None, f"'{self.id}' tam sayı olmalı"
+            # Aralıklar config'deki (gösterim) birimindedir, kontrol çevirmeden önce
+            if self.min is not None and value < self.min:
+                return None, f"'{self.id}' en az {self.min} olmalı"
+            if self.max is not None and value > self.max:
+                return None, f"'{self.id}' en fazla {self.max} olmalı"
+            return self._convert(value), None
+
+        value = str(raw).strip()
+        if self.options is not None and value not in self.options:
+            return None, f"'{self.id}' geçersiz seçim: {value}"
+        if self.max_length is not None and len(value) > self.max_length:
+            return None, f"'{self.id}' en fazla {self.max_length} karakter olabilir"
+        return value, None
+
+
+class FormRecord:
+    """
+    Çözülmüş form: düz değerler, iç içe yapı ve gönderilen alanlar
+
+    Attributes:
+        values (dict): Alan id'si -> tiplenmiş değer (temel birimde)
+        data (dict): Config'deki 'path' alanlarına göre iç içe sözlük
+        present (set): İstekte boş olmayan değerle gelen alan id'leri
+        units (dict): Alan id'si -> değerin birimi
+    """
+
+    def __init__(self, values, data, present, units, sections):
+        self.values = values
+        self.data = data
+        self.present = present
+        self.units = units
+        self._sections = sections
+
+    def __getitem__(self, key):
+        return self.data[key]
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def section(self, name):
+        """
+        Bölümün iç içe verisi; tetikleyici alanlarından hiçbiri gönderilmediyse None
+
+        Args:
+            name (str): Bölüm adı (ör. 'scope1', 'scope2')
+        """
+        triggers = self._sections.get(name)
+        if triggers is not None and not (triggers & self.present):
+            return None
+        return self.data.get(name)
+
+
+class CompiledForm:
+    """Alan listesi ve bölüm tetikleyicileri; decode() tek geçişte çalışır"""
+
+    def __init__(self, fields, sections=None):
+        self.fields = tuple(fields)
+        self.by_id = {field.id: field for field in self.fields}
+        self.sections = {name: frozenset(ids) for name, ids in (sections or {}).items()}
+
+        for name, ids in self.sections.items():
+            unknown = set(ids) - set(self.by_id)
+            if unknown:
+                raise ValueError(f"'{name}' bölümünde tanımsız alanlar: {sorted(unknown)}")
+
+    def decode(self, data, route=None):
+        """
+        Form/JSON verisini doğrula, tiple ve birim çevir
+
+        Args:
+            data (Mapping): request.form, JSON gövdesi veya widget değerleri
+            route (str): Üretim rotası (show_if_route alanları için)
+
+        Returns:
+            FormRecord: Çözülmüş kayıt
+
+        Raises:
+            FormValidationError: Bir veya daha fazla alan geçersizse
+        """
+        values, nested, present, units, errors = {}, {}, set(), {}, {}
+        get = data.get
+
+        for field in self.fields:
+            if field.routes is not None and route not in field.routes:
+                continue
+
+            raw = get(field.id)
+            if raw is None or (isinstance(raw, str) and not raw.strip()):
+                if field.required:
+                    errors[field.id] = f"'{field.id}' zorunlu"
+                    continue
+                value = field.default
+            else:
+                value, error = field.parse(raw)
+                if error:
+                    errors[field.id] = error
+                    continue
+                present.add(field.id)
+
+            values[field.id] = value
+            units[field.id] = field.base_unit
+            if value is None:
+                continue
+            node = nested
+            for key in field.path[:-1]:
+                node = node.setdefault(key, {})
+            node[field.path[-1]] = value
+
+        if errors:
+            raise FormValidationError(errors)
+        return FormRecord(values, nested, present, units, self.sections)
+
+
+class FormSchema:
+    """
+    Derlenmiş cbam_form_config.json
+
+    - web_form: Flask /calculate ve /full-analysis alanları
+    - sectors: Sektör başına Streamlit girdileri (grup -> alanlar, rota koşullu)
+    - financials: Ortak finansal girdiler
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+        web_form = config.get('web_form', {})
+        self.web_form = CompiledForm((FieldSpec(f) for f in web_form.get('fields', [])),
+                                     web_form.get('sections'))
+
+        self.sectors = {}
+        self.routes = {}
+        for sector_key, sector in config.get('sectors', {}).items():
+            fields = [FieldSpec(field, path=f"{group}.{field['id']}")
+                      for group, group_fields in sector.get('inputs', {}).items()
+                      for field in group_fields]
+            self.sectors[sector_key] = CompiledForm(fields)
+            self.routes[sector_key] = tuple(sector.get('routes', {}))
+
+        self.financials = CompiledForm(FieldSpec(field, path=f"financials.{field['id']}")
+                                       for field in config.get('financials', {}).get('inputs', []))
+
+    def decode_form(self, data):
+        """Flask formu veya JSON gövdesi -> FormRecord"""
+        return self.web_form.decode(data)
+
+    def decode_sector(self, sector, route, data):
+        """
+        Sektör girdileri + finansallar -> FormRecord
+
+        Args:
+            sector (str): Sektör anahtarı (ör. 'iron_steel')
+            route (str): Üretim rotası (ör. 'eaf')
+            data (Mapping): Alan id'si -> ham değer
+
+        Raises:
+            FormValidationError: Sektör/rota bilinmiyorsa veya alanlar geçersizse
+        """
+        if sector not in self.sectors:
+            raise FormValidationError({'sector': f"'sector' geçersiz seçim: {sector}"})
+        if route not in self.routes[sector]:
+            raise FormValidationError({'route': f"'route' geçersiz seçim: {route}"})
+
+        record = self.sectors[sector].decode(data, route=route)
+        financials = self.financials.decode(data)
+        record.values.update(financials.values)
+        record.data.update(financials.data)
+        record.present |= financials.present
+        record.units.update(financials.units)
+        return record
+
+
+@lru_cache(maxsize=4)
+def load_form_schema(path=CONFIG_PATH):
+    """
+    Config'i okuyup derle (process başına bir kez)
+
+    Args:
+        path (str): Config JSON yolu
+
+    Returns:
+        FormSchema: Derlenmiş şema
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        return FormSchema(json.load(f))
@@ -0,0 +1,216 @@
+"""
+Markdown Flowables Module
+Single-pass compiler from LLM report Markdown to reportlab flowables
+"""
+
+import re
+import html
+import hashlib
+import threading
+from collections import OrderedDict
+
+from reportlab.lib import colors
+from reportlab.lib.units import cm
+from reportlab.platypus import Paragraph, Spacer, Table, TableStyle, KeepTogether
+
+
+# Satır içi biçimler tek regex ile tek geçişte işlenir
+_INLINE = re.compile(r'\*\*(.+?)\*\*|__(.+?)__|(?<![\w*])\*(?!\s)(.+?)(?<!\s)\*(?![\w*])|`(.+?)`')
+_HEADING = re.compile(r'^(#{1,6})\s*(.*)$')
+_NUMBERED = re.compile(r'^(?:\*\*)?(\d+)\.\s+(.*)$')
+_BULLET = re.compile(r'^(?:[-*•✓])\s+(.*)$')
+_TABLE_SEPARATOR = re.compile(r'^\|?\s*:?-{2,}:?\s*(\|\s*:?-{2,}:?\s*)*\|?$')
+_RULE = re.compile(r'^(-{3,}|\*{3,}|_{3,})$')
+
+# Grafiklerin ekleneceği bölüm başlığı
+_CHART_ANCHOR = re.compile(r'^3\.|EM[İI]SYON ANAL[İI]Z[İI]', re.IGNORECASE)
+
+_CACHE_SIZE = 64
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def _inline(text):
+    """Markdown satır içi biçimleri reportlab paragraf işaretlemesine çevir"""
+    def replace(match):
+        bold, bold_alt, italic, code = match.groups()
+        if bold is not None or bold_alt is not None:
+            return f'<b>{_inline_raw(bold if bold is not None else bold_alt)}</b>'
+        if italic is not None:
+            return f'<i>{_inline_raw(italic)}</i>'
+        return f'<font face="Courier">{code}</font>'
+
+    def _inline_raw(inner):
+        return _INLINE.sub(replace, inner)
+
+    return _INLINE.sub(replace, html.escape(text, quote=False))
+
+
+def _is_upper_heading(text):
+    """'3. EMİSYON ANALİZİ' gibi numaralı bölüm başlıklarını liste maddelerinden ayır"""
+    letters = [c for c in text if c.isalpha()]
+    return bool(letters) and sum(c.isupper() for c in letters) / len(letters) > 0.6
+
+
+def _split_row(line):
+    cells = line.strip().strip('|').split('|')
+    return [_inline(c.strip()) for c in cells]
+
+
+def _compile(text):
+    """
+    Rapor metnini blok listesine derle (tek geçiş)
+
+    Blok tipleri:
+        ('heading', level, markup)
+        ('paragraph', markup)
+        ('bullet', markup)
+        ('table', rows, has_header)
+        ('charts',)  - ilk emisyon analizi başlığından sonra bir kez
+    """
+    blocks = []
+    table_rows = []
+    table_header = False
+    charts_placed = False
+
+    def flush_table():
+        nonlocal table_rows, table_header
+        if table_rows:
+            width = max(len(r) for r in table_rows)
+            rows = tuple(tuple(r + [''] * (width - len(r))) for r in table_rows)
+            blocks.append(('table', rows, table_header))
+        table_rows = []
+        table_header = False
+
+    for raw_line in text.replace('\r\n', '\n').split('\n'):
+        line = raw_line.strip()
+
+        # Tablolar: ardışık '|' satırları
+        if line.startswith('|'):
+            if _TABLE_SEPARATOR.match(line):
+                table_header = len(table_rows) == 1
+            else:
+                table_rows.append(_split_row(line))
+            continue
+        flush_table()
+
+        if not line or _RULE.match(line):
+            continue
+
+        heading = _HEADING.match(line)
+        numbered = _NUMBERED.match(line)
+        if heading or (numbered and _is_upper_heading(numbered.group(2))):
+            if heading:
+                level = min(len(heading.group(1)), 4)
+                title = heading.group(2).strip()
+            else:
+                level = 3
+                title = line
+            title = title.strip('*').strip()
+            blocks.append(('heading', 1 if level <= 3 else 2, _inline(title)))
+
+            if not charts_placed and _CHART_ANCHOR.search(title):
+                blocks.append(('charts',))
+                charts_placed = True
+            continue
+
+        bullet = _BULLET.match(line)
+        if bullet:
+            blocks.append(('bullet', _inline(bullet.group(1))))
+        else:
+            blocks.append(('paragraph', _inline(line)))
+
+    flush_table()
+    return tuple(blocks)
+
+
+def compile_markdown(text):
+    """
+    Rapor Markdown'ını derle; sonuç metin hash'i ile önbelleğe alınır
+
+    Args:
+        text (str): LLM rapor metni
+
+    Returns:
+        tuple: Derlenmiş bloklar (değiştirilmemeli)
+    """
+    if not text:
+        return ()
+
+    key = hashlib.sha256(text.encode('utf-8')).hexdigest()
+    with _cache_lock:
+        blocks = _cache.get(key)
+        if blocks is not None:
+            _cache.move_to_end(key)
+            return blocks
+
+    blocks = _compile(text)
+
+    with _cache_lock:
+        _cache[key] = blocks
+        while len(_cache) > _CACHE_SIZE:
+            _cache.popitem(last=False)
+    return blocks
+
+
+def build_flowables(blocks, styles, chart_factory=None, table_width=17*cm):
+    """
+    Derlenmiş blokları reportlab flowable listesine çevir
+
+    Flowable'lar yerleşim sırasında değiştirildiği için her belge için
+    yeniden oluşturulur; pahalı olan ayrıştırma önbellekten gelir.
+
+    Args:
+        blocks (tuple): compile_markdown çıktısı
+        styles: Stil sayfası (ExecBody, SectionHeading, SubSectionHeading, ExecTableCell)
+        chart_factory (callable): Grafik flowable'larını döndüren fonksiyon (bir kez çağrılır)
+        table_width (float): Tablo genişliği
+
+    Returns:
+        list: Flowable listesi
+    """
+    story = []
+    for block in blocks:
+        kind = block[0]
+        if kind == 'heading':
+            style = styles['SectionHeading'] if block[1] == 1 else styles['SubSectionHeading']
+            story.append(Paragraph(block[2], style))
+        elif kind == 'paragraph':
+            story.append(Paragraph(block[1], styles['ExecBody']))
+        elif kind == 'bullet':
+            story.append(Paragraph(f'• {block[1]}', styles['ExecBody']))
+        elif kind == 'charts':
+            if chart_factory:
+                for chart in chart_factory():
+                    story.append(KeepTogether([chart, Spacer(1, 0.5*cm)]))
+        elif kind == 'table':
+            story.append(_build_table(block[1], block[2], styles, table_width))
+            story.append(Spacer(1, 0.4*cm))
+    return story
+
+
+def _build_table(rows, has_header, styles, table_width):
+    cell_style = styles['ExecTableCell']
+    header_style = styles['ExecTableHeader']
+    data = []
+    for i, row in enumerate(rows):
+        style = header_style if (has_header and i == 0) else cell_style
+        data.append([Paragraph(cell, style) for cell in row])
+
+    col_count = len(rows[0])
+    table = Table(data, colWidths=[table_width / col_count] * col_count, repeatRows=1 if has_header else 0)
+    commands = [
+        ('INNERGRID', (0, 0), (-1, -1), 0.5, colors.HexColor('#E5E7EB')),
+        ('BOX', (0, 0), (-1, -1), 0.5, colors.HexColor('#2D3748')),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ('TOPPADDING', (0, 0), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 0), (-1, -1), 6),
+        ('ROWBACKGROUNDS', (0, 1 if has_header else 0), (-1, -1), [colors.white, colors.HexColor('#F9FAFB')]),
+    ]
+    if has_header:
+        commands += [
+            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#0B1121')),
+            ('LINEBELOW', (0, 0), (-1, 0), 2, colors.HexColor('#C9FD02')),
+        ]
+    table.setStyle(TableStyle(commands))
+    return table
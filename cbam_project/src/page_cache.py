@@ -0,0 +1,115 @@
+"""
+Page Cache Module
+Pre-rendered, pre-compressed HTML for pages that only change with the data
+"""
+
+import gzip
+import json
+import hashlib
+import threading
+
+
+# Bu boyutun altındaki sayfaları sıkıştırmaya değmez (byte)
+MIN_COMPRESS_BYTES = 512
+
+
+def _get_brotli():
+    try:
+        import brotli
+        return brotli
+    except ImportError:
+        return None
+
+
+def data_version(*objects):
+    """
+    Sayfa verisinin sürüm hash'i (veri değişmedikçe aynı kalır)
+
+    Args:
+        *objects: JSON'a çevrilebilir veri (ör. CN_CODE_DATABASE)
+
+    Returns:
+        str: Kısa SHA-256 hex özeti
+    """
+    raw = json.dumps(objects, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()[:16]
+
+
+class RenderedPage:
+    """
+    Bir kez render edilmiş sayfa: ham gövde, strong ETag ve sıkıştırılmış
+    kopyalar. Her kodlamanın kendi ETag'i vardır (strong ETag kodlama başına
+    byte-eşdeğerlik gerektirir).
+    """
+
+    def __init__(self, version, html):
+        self.version = version
+        self.body = html.encode('utf-8')
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+        self.encodings = {}
+
+        if len(self.body) >= MIN_COMPRESS_BYTES:
+            self.encodings['gzip'] = gzip.compress(self.body, compresslevel=9, mtime=0)
+            brotli = _get_brotli()
+            if brotli is not None:
+                self.encodings['br'] = brotli.compress(self.body, quality=11)
+
+    def variant(self, encoding=None):
+        """
+        Kodlamaya göre gövde ve ETag
+
+        Args:
+            encoding (str): 'br', 'gzip' veya None (sıkıştırmasız)
+
+        Returns:
+            tuple: (body bytes, etag)
+        """
+        if encoding in self.encodings:
+            return self.encodings[encoding], f'{self.etag}-{encoding}'
+        return self.body, self.etag
+
+
+class PageCache:
+    """
+    Anahtar (sayfa adı, kök yol) başına tek RenderedPage tutar; veri sürümü
+    değişince sayfa yeniden render edilir.
+    """
+
+    def __init__(self):
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, version, render):
+        """
+        Önbellekteki sayfayı döndür, yoksa veya sürüm eskiyse render et
+
+        Args:
+            key (hashable): Sayfa anahtarı
+            version (str): data_version çıktısı
+            render (callable): render() -> HTML metni
+
+        Returns:
+            RenderedPage: Render edilmiş sayfa
+        """
+        page = self._pages.get(key)
+        if page is not None and page.version == version:
+            return page
+
+        with self._lock:
+            page = self._pages.get(key)
+            if page is None or page.version != version:
+                page = RenderedPage(version, render())
+                self._pages[key] = page
+        return page
+
+    def clear(self):
+        with self._lock:
+            self._pages.clear()
+
+    def stats(self):
+        """Önbellekteki sayfalar ve boyutları"""
+        return {
+            str(key): {'bytes': len(page.body),
+                       **{enc: len(body) for enc, body in page.encodings.items()}}
+            for key, page in list(self._pages.items())
+        }
@@ -0,0 +1,156 @@
+"""
+PDF Batch Module
+Multi-company PDF rendering across a process pool
+"""
+
+import os
+import json
+import zipfile
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+
+# Her worker process'te bir kez oluşturulan generator (fontlar + stiller hazır)
+_worker_generator = None
+
+
+def _init_worker(chart_backend, image_dpi=150, image_format='flate', max_bytes=None):
+    """Worker başlangıcı: font kaydı ve stil sayfaları bir kez hazırlanır"""
+    global _worker_generator
+    from .pdf_generator import get_pdf_generator, get_logo_reader
+    _worker_generator = get_pdf_generator(chart_backend, image_dpi, image_format, max_bytes)
+    get_logo_reader(image_dpi, image_format)
+
+
+def report_filename(report, index=0):
+    """Rapor için benzersiz PDF dosya adı"""
+    company = (report.get('company_info') or {}).get('company_name') \
+        or (report.get('cbam_summary') or {}).get('company_name') or 'Firma'
+    company = ''.join(c if c.isalnum() or c in '-_' else '_' for c in company)
+    # Kimliğin tamamı kullanılır; ilk karakterleri ortak iki rapor aynı dosyaya yazılmaz
+    suffix = ''.join(c if c.isalnum() or c in '-_' else '_'
+                     for c in str(report.get('report_id') or index))
+    return f"CBAM_Raporu_{company}_{suffix}.pdf"
+
+
+def is_renderable(report):
+    """Sadece tam analiz kayıtları PDF'e çevrilir (hızlı hesaplamalarda rapor verisi yok)"""
+    return report.get('type', 'full_analysis') == 'full_analysis' and bool(report.get('cbam_summary'))
+
+
+def _render_one(task):
+    """Tek raporu worker içinde PDF'e çevir"""
+    import pandas as pd
+
+    index, report = task
+    ets_forecast = report.get('ets_forecast')
+    if not hasattr(ets_forecast, 'to_dict'):
+        ets_forecast = pd.DataFrame(ets_forecast or [])
+
+    buffer = _worker_generator.generate_report(
+        cbam_summary=report.get('cbam_summary') or {},
+        ets_forecast=ets_forecast,
+        report_text=report.get('report_text', ''),
+        emission_analysis=report.get('emission_analysis'),
+        optimization_scenarios=report.get('optimization_scenarios')
+    )
+    return report_filename(report, index), buffer.getvalue()
+
+
+def iter_jsonl_reports(path):
+    """
+    ReportExporter çıktısını (part-*.jsonl) satır satır oku
+
+    Args:
+        path (str): JSONL dosyası veya export dizini
+
+    Yields:
+        dict: Rapor verisi
+    """
+    if os.path.isdir(path):
+        files = sorted(os.path.join(path, n) for n in os.listdir(path) if n.endswith('.jsonl'))
+    else:
+        files = [path]
+
+    for file_path in files:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def render_batch(reports, output, workers=None, chart_backend='vector', progress=None,
+                 image_dpi=150, image_format='flate', max_bytes=None):
+    """
+    Rapor listesini paralel olarak PDF'e çevir
+
+    Sonuçlar tamamlandıkça diske veya ZIP'e yazılır; aynı anda en fazla
+    2 x worker sayısı kadar rapor bellekte bekler. Tam analiz olmayan
+    kayıtlar atlanır; bir raporun hatası diğerlerini durdurmaz.
+
+    Args:
+        reports (iterable): Rapor sözlükleri (ör. iter_jsonl_reports çıktısı)
+        output (str): '.zip' ile biten yol veya çıktı dizini
+        workers (int): Process sayısı (varsayılan: CPU sayısı)
+        chart_backend (str): 'vector' veya 'matplotlib'
+        progress (callable): progress(done_count, filename) geri çağrısı
+        image_dpi (int): Raster görseller için hedef DPI
+        image_format (str): 'flate' veya 'jpeg'
+        max_bytes (int): PDF başına boyut bütçesi
+
+    Returns:
+        dict: written (yazılan dosya adları), failed ([(dosya adı, hata)]),
+              skipped (tam analiz olmayan kayıt sayısı)
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2
+    written, failed = [], []
+    skipped = 0
+
+    to_zip = output.lower().endswith('.zip')
+    if to_zip:
+        parent = os.path.dirname(output)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        archive = zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED)
+    else:
+        os.makedirs(output, exist_ok=True)
+        archive = None
+
+    def store(future, name):
+        try:
+            filename, data = future.result()
+        except Exception as e:
+            print(f"❌ PDF üretilemedi ({name}): {e}")
+            failed.append((name, f"{type(e).__name__}: {e}"))
+            return
+        if archive is not None:
+            # PDF içeriği zaten sıkıştırılmış; ZIP_STORED yeterli
+            archive.writestr(filename, data)
+        else:
+            with open(os.path.join(output, filename), 'wb') as f:
+                f.write(data)
+        written.append(filename)
+        if progress:
+            progress(len(written), filename)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(chart_backend, image_dpi, image_format, max_bytes)) as pool:
+            pending = {}
+            for index, report in enumerate(reports):
+                if not is_renderable(report):
+                    skipped += 1
+                    continue
+                if len(pending) >= max_pending:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        store(future, pending.pop(future))
+                pending[pool.submit(_render_one, (index, report))] = report_filename(report, index)
+
+            for future in wait(pending).done:
+                store(future, pending[future])
+    finally:
+        if archive is not None:
+            archive.close()
+
+    return {'written': written, 'failed': failed, 'skipped': skipped}
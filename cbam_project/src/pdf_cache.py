@@ -0,0 +1,148 @@
+"""
+PDF Cache Module
+Disk cache for generated PDF reports keyed by report content hash
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import threading
+from datetime import datetime
+
+from .report_codec import _json_default
+
+
+# PDF yerleşimi/tasarımı değiştiğinde artırılır (eski önbellek geçersiz olur)
+CACHE_VERSION = 4
+
+COPY_CHUNK_SIZE = 256 * 1024
+
+
+def report_content_hash(cbam_summary, ets_forecast, report_text,
+                        emission_analysis=None, optimization_scenarios=None, render_options=None):
+    """
+    PDF içeriğini belirleyen girdilerden kararlı bir hash üret
+
+    Args:
+        cbam_summary (dict): CBAM özeti
+        ets_forecast: DataFrame veya kayıt listesi
+        report_text (str): AI rapor metni
+        emission_analysis (dict): Emisyon analizi
+        optimization_scenarios (dict): Optimizasyon senaryoları
+        render_options (dict): Çıktıyı etkileyen üretim ayarları (DPI, görsel formatı, bütçe)
+
+    Returns:
+        str: SHA-256 hex özeti (ETag olarak da kullanılır)
+    """
+    if hasattr(ets_forecast, 'to_dict'):
+        ets_forecast = ets_forecast.to_dict('records')
+
+    payload = {
+        'version': CACHE_VERSION,
+        # Sayfa altbilgisi yılı içerir
+        'year': datetime.now().year,
+        'cbam_summary': cbam_summary,
+        'ets_forecast': ets_forecast,
+        'report_text': report_text,
+        'emission_analysis': emission_analysis,
+        'optimization_scenarios': optimization_scenarios,
+        'render_options': render_options
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=_json_default)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+
+class PDFCache:
+    """
+    Üretilmiş PDF'leri diskte tutar; toplam boyut sınırı aşılınca
+    en uzun süredir kullanılmayan dosyalar silinir.
+    """
+
+    def __init__(self, cache_dir, max_bytes=256 * 1024 * 1024):
+        """
+        Initialize cache
+
+        Args:
+            cache_dir (str): Önbellek dizini
+            max_bytes (int): Toplam boyut sınırı
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def path_for(self, key):
+        return os.path.join(self.cache_dir, f'{key}.pdf')
+
+    def get(self, key):
+        """
+        Önbellekteki PDF'i okumak için aç
+
+        Dosya yol olarak değil açık dosya olarak döner: başka bir worker'ın
+        silme işlemi (evict) açık dosyayı etkilemez. Kontrolle açma arasında
+        silinmiş dosya önbellekte yok sayılır.
+
+        Args:
+            key (str): report_content_hash çıktısı
+
+        Returns:
+            file or None: İkili modda açık dosya (çağıran kapatır; yoksa None)
+        """
+        path = self.path_for(key)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return None
+        try:
+            # Son kullanım zamanını güncelle (LRU silme için)
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        return f
+
+    def put(self, key, data):
+        """
+        PDF içeriğini önbelleğe yaz
+
+        Args:
+            key (str): İçerik hash'i
+            data (bytes or file-like): PDF içeriği
+
+        Returns:
+            str: Yazılan dosyanın yolu
+        """
+        path = self.path_for(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            if hasattr(data, 'read'):
+                # Dosya nesnesi parça parça kopyalanır (büyük PDF belleğe alınmaz)
+                shutil.copyfileobj(data, f, COPY_CHUNK_SIZE)
+            else:
+                f.write(data)
+        os.replace(tmp_path, path)
+
+        self.evict()
+        return path
+
+    def evict(self):
+        """Boyut sınırı aşıldıysa en eski kullanılan dosyaları sil"""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.pdf'):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
@@ -5,24 +5,32 @@ Premium PDF design with Adobe InDesign-like aesthetics.
 
 import os
 import io
-import re
-import pandas as pd
-import matplotlib.pyplot as plt
-import matplotlib
-matplotlib.use('Agg')
+import time
+import tempfile
 from datetime import datetime
+from functools import lru_cache
 
+from reportlab import rl_config
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import cm, inch
+from reportlab.lib.utils import ImageReader
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY, TA_RIGHT
 from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfgen.canvas import Canvas
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.platypus import (
     BaseDocTemplate, PageTemplate, Frame, Paragraph, 
-    Spacer, Table, TableStyle, Image, PageBreak, KeepTogether, NextPageTemplate
+    Spacer, Table, TableStyle, Image, PageBreak, NextPageTemplate
 )
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.graphics.charts.doughnut import Doughnut
+from reportlab.graphics.charts.lineplots import LinePlot
+from reportlab.graphics.charts.legends import Legend
+from reportlab.graphics.widgets.markers import makeMarker
+
+from .markdown_flowables import compile_markdown, build_flowables
 
 # --- BRANDING & DESIGN SYSTEM ---
 COLOR_NAVY = colors.HexColor('#0B1121')
@@ -36,6 +44,15 @@ COLOR_WHITE = colors.HexColor('#FFFFFF')
 # Dinamik Logo Yolu
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LOGO_PATH = os.path.join(BASE_DIR, "favicon.png")
+LOGO_SIZE = 2.5*cm  # Kapakta çizilen kare logo alanı
+
+# --- OUTPUT SIZE CONTROLS ---
+# Akışlar ASCII85 yerine ikili (binary) yazılır: ASCII85 akışı ~%25 şişirir; dosya
+# toplamında kazanç raster görsel oranına bağlı (vektör grafikle ~%4, matplotlib ile ~%12)
+rl_config.useA85 = 0
+MIN_IMAGE_DPI = 72
+# Spool modunda bu boyutu aşan çıktı belleğe değil geçici dosyaya yazılır
+SPOOL_MAX_BYTES = 8 * 1024 * 1024
 
 # --- FONT REGISTRATION (Linux & MacOS Compatibility) ---
 def register_premium_fonts():
@@ -75,142 +92,385 @@ def register_premium_fonts():
 
 FONT_REG, FONT_BOLD = register_premium_fonts()
 
+
+def _forecast_series(ets_forecast, limit=12):
+    """Tahmin tablosundan (çeyrek etiketleri, fiyatlar) çıkar"""
+    df = ets_forecast.head(limit)
+    cols = df.columns.tolist()
+    val_col = next((c for c in ['Forecasted Value', 'ETS_Price', 'Predicted_Price'] if c in cols), None)
+    if val_col is None:
+        val_col = next(c for c in cols if c != 'Quarter')
+    return [str(q) for q in df['Quarter']], [float(v) for v in df[val_col]]
+
+
+@lru_cache(maxsize=1)
+def build_style_sheet():
+    """
+    Setup Professional Typography (process başına bir kez)
+
+    Dönen stil sayfası tüm generator örnekleri arasında paylaşılır;
+    üzerinde değişiklik yapılmamalıdır.
+    """
+    styles = getSampleStyleSheet()
+    # Global Body
+    styles.add(ParagraphStyle(
+        name='ExecBody',
+        fontName=FONT_REG,
+        fontSize=10,
+        textColor=colors.HexColor('#333333'),
+        leading=14,
+        alignment=TA_JUSTIFY,
+        spaceAfter=12
+    ))
+    
+    # Dark Background Body (for card-like sections)
+    styles.add(ParagraphStyle(
+        name='ExecBodyDark',
+        fontName=FONT_REG,
+        fontSize=10,
+        textColor=COLOR_TEXT_MAIN,
+        leading=14,
+        alignment=TA_LEFT,
+        spaceAfter=8
+    ))
+    
+    # Cover Titles
+    styles.add(ParagraphStyle(
+        name='CoverMainTitle',
+        fontName=FONT_BOLD,
+        fontSize=42,
+        textColor=COLOR_WHITE,
+        leading=48,
+        alignment=TA_LEFT
+    ))
+    
+    styles.add(ParagraphStyle(
+        name='CoverSubTitle',
+        fontName=FONT_REG,
+        fontSize=18,
+        textColor=COLOR_NEON,
+        leading=22,
+        alignment=TA_LEFT,
+        spaceBefore=10
+    ))
+    
+    # Section Headings
+    styles.add(ParagraphStyle(
+        name='SectionHeading',
+        fontName=FONT_BOLD,
+        fontSize=18,
+        textColor=COLOR_NAVY,
+        spaceBefore=25,
+        spaceAfter=15,
+        leading=22,
+        borderPadding=(0, 0, 5, 0),
+        borderWidth=0,
+        alignment=TA_LEFT
+    ))
+
+    # Subsection Headings
+    styles.add(ParagraphStyle(
+        name='SubSectionHeading',
+        fontName=FONT_BOLD,
+        fontSize=12,
+        textColor=colors.HexColor('#1F2937'),
+        spaceBefore=15,
+        spaceAfter=10,
+        leading=14,
+        alignment=TA_LEFT
+    ))
+
+    # Sabit kapak / tablo / yasal not stilleri
+    styles.add(ParagraphStyle(name='CoverFoot', fontName=FONT_REG, fontSize=11, textColor=COLOR_WHITE))
+    styles.add(ParagraphStyle(name='TableHeader', fontName=FONT_BOLD, fontSize=11, textColor=COLOR_WHITE))
+    styles.add(ParagraphStyle(name='Legal', fontName=FONT_REG, fontSize=7, textColor=colors.grey, alignment=TA_CENTER))
+    
+    # AI rapor tabloları
+    styles.add(ParagraphStyle(name='ExecTableCell', fontName=FONT_REG, fontSize=8.5, leading=11, textColor=colors.HexColor('#333333')))
+    styles.add(ParagraphStyle(name='ExecTableHeader', fontName=FONT_BOLD, fontSize=8.5, leading=11, textColor=COLOR_WHITE))
+    return styles
+
+
+@lru_cache(maxsize=8)
+def get_logo_reader(dpi=None, image_format='flate'):
+    """
+    Logo bir kez okunup decode edilir (ImageReader process içinde paylaşılır)
+
+    Args:
+        dpi (int): Hedef çözünürlük; verilirse logo kapaktaki boyutuna göre küçültülür
+        image_format (str): 'flate' (kayıpsız PNG, şeffaf) veya 'jpeg' (lacivert zemine düzleştirilir)
+    """
+    if not os.path.exists(LOGO_PATH):
+        return None
+    if dpi is None and image_format == 'flate':
+        return ImageReader(LOGO_PATH)
+
+    from PIL import Image as PILImage
+    img = PILImage.open(LOGO_PATH)
+    if dpi:
+        target = max(16, round(LOGO_SIZE / inch * dpi))
+        img.thumbnail((target, target), PILImage.LANCZOS)
+
+    buf = io.BytesIO()
+    if image_format == 'jpeg':
+        rgba = img.convert('RGBA')
+        flat = PILImage.new('RGB', rgba.size, COLOR_NAVY.hexval().replace('0x', '#'))
+        flat.paste(rgba, mask=rgba.split()[-1])
+        flat.save(buf, 'JPEG', quality=85, optimize=True)
+    else:
+        img.save(buf, 'PNG', optimize=True)
+    buf.seek(0)
+    return ImageReader(buf)
+
+
+def _page_bytes(logo=None):
+    canvas = Canvas(io.BytesIO(), pagesize=A4, invariant=1)
+    if logo is not None:
+        canvas.drawImage(logo, 1.5*cm, 24*cm, width=4*cm, height=2.5*cm, mask='auto', preserveAspectRatio=True)
+    canvas.showPage()
+    canvas.save()
+    return len(canvas.getpdfdata())
+
+
+@lru_cache(maxsize=16)
+def logo_pdf_bytes(dpi=None, image_format='flate'):
+    """
+    Logonun verilen ayarlarla PDF'e eklediği byte (boş sayfaya göre fark)
+
+    Vektör grafik modunda tek raster görsel logo olduğundan, bütçe denemelerinde
+    belgenin yeni boyutu bu farkla tahmin edilir.
+    """
+    logo = get_logo_reader(dpi, image_format)
+    if logo is None:
+        return 0
+    return _page_bytes(logo) - _page_bytes()
+
+
+def _image_fallbacks(dpi, image_format):
+    """Bütçe aşımında sırayla denenecek (dpi, format) ayarları: önce JPEG, sonra DPI yarıya"""
+    while True:
+        if image_format != 'jpeg':
+            image_format = 'jpeg'
+        elif dpi > MIN_IMAGE_DPI:
+            dpi = max(MIN_IMAGE_DPI, dpi // 2)
+        else:
+            return
+        yield dpi, image_format
+
+
 class CBAMPDFGenerator:
     """Premium McKinsey-Style Corporate Document Generator"""
 
-    def __init__(self):
-        self.styles = getSampleStyleSheet()
-        self._setup_executive_styles()
-
-    def _setup_executive_styles(self):
-        """Setup Professional Typography"""
-        # Global Body
-        self.styles.add(ParagraphStyle(
-            name='ExecBody',
-            fontName=FONT_REG,
-            fontSize=10,
-            textColor=colors.HexColor('#333333'),
-            leading=14,
-            alignment=TA_JUSTIFY,
-            spaceAfter=12
-        ))
-        
-        # Dark Background Body (for card-like sections)
-        self.styles.add(ParagraphStyle(
-            name='ExecBodyDark',
-            fontName=FONT_REG,
-            fontSize=10,
-            textColor=COLOR_TEXT_MAIN,
-            leading=14,
-            alignment=TA_LEFT,
-            spaceAfter=8
-        ))
+    def __init__(self, chart_backend='vector', image_dpi=150, image_format='flate', max_bytes=None):
+        """
+        Args:
+            chart_backend (str): 'vector' (reportlab.graphics) veya 'matplotlib' (raster)
+            image_dpi (int): Raster görseller (logo, matplotlib grafikleri) için hedef DPI
+            image_format (str): 'flate' (kayıpsız) veya 'jpeg' (DCT, daha küçük)
+            max_bytes (int): Dosya boyutu bütçesi; aşılırsa görseller JPEG'e çevrilip
+                DPI yarıya indirilerek (en az MIN_IMAGE_DPI) yeniden üretilir
         
-        # Cover Titles
-        self.styles.add(ParagraphStyle(
-            name='CoverMainTitle',
-            fontName=FONT_BOLD,
-            fontSize=42,
-            textColor=COLOR_WHITE,
-            leading=48,
-            alignment=TA_LEFT
-        ))
-        
-        self.styles.add(ParagraphStyle(
-            name='CoverSubTitle',
-            fontName=FONT_REG,
-            fontSize=18,
-            textColor=COLOR_NEON,
-            leading=22,
-            alignment=TA_LEFT,
-            spaceBefore=10
-        ))
-        
-        # Section Headings
-        self.styles.add(ParagraphStyle(
-            name='SectionHeading',
-            fontName=FONT_BOLD,
-            fontSize=18,
-            textColor=COLOR_NAVY,
-            spaceBefore=25,
-            spaceAfter=15,
-            leading=22,
-            borderPadding=(0, 0, 5, 0),
-            borderWidth=0,
-            alignment=TA_LEFT
-        ))
-
-        # Subsection Headings
-        self.styles.add(ParagraphStyle(
-            name='SubSectionHeading',
-            fontName=FONT_BOLD,
-            fontSize=12,
-            textColor=colors.HexColor('#1F2937'),
-            spaceBefore=15,
-            spaceAfter=10,
-            leading=14,
-            alignment=TA_LEFT
-        ))
-
-    def _draw_cover_background(self, canvas, doc):
+        TTF fontlar reportlab tarafından her zaman alt küme (subset) olarak gömülür;
+        sadece kullanılan glifler PDF'e girer.
+        """
+        if image_format not in ('flate', 'jpeg'):
+            raise ValueError(f"Desteklenmeyen görsel formatı: {image_format}")
+        self.chart_backend = chart_backend
+        self.image_dpi = image_dpi
+        self.image_format = image_format
+        self.max_bytes = max_bytes
+        self.styles = build_style_sheet()
+
+    def _draw_cover_background(self, canvas, doc, logo=None):
         """Elegant Corporate Cover"""
-        canvas.saveState()
-        # Main Navy background
-        canvas.setFillColor(COLOR_NAVY)
-        canvas.rect(0, 0, A4[0], A4[1], fill=1, stroke=0)
-        
-        # Aesthetic background elements (Diagonal line)
-        canvas.setStrokeColor(colors.HexColor('#151E32'))
-        canvas.setLineWidth(150)
-        canvas.line(-100, 200, 700, 900)
-        
-        # Strategic Neon Accent
-        canvas.setStrokeColor(COLOR_NEON)
-        canvas.setLineWidth(3)
-        canvas.line(1.5*cm, 18*cm, 5*cm, 18*cm)
-        
-        # Logo on cover
-        if os.path.exists(LOGO_PATH):
-            canvas.drawImage(LOGO_PATH, 1.5*cm, 24*cm, width=4*cm, height=2.5*cm, mask='auto', preserveAspectRatio=True)
+        # Statik kapak tasarımı PDF form XObject olarak bir kez tanımlanır
+        if not canvas.hasForm('CoverDecor'):
+            canvas.beginForm('CoverDecor')
+            # Main Navy background
+            canvas.setFillColor(COLOR_NAVY)
+            canvas.rect(0, 0, A4[0], A4[1], fill=1, stroke=0)
+            
+            # Aesthetic background elements (Diagonal line)
+            canvas.setStrokeColor(colors.HexColor('#151E32'))
+            canvas.setLineWidth(150)
+            canvas.line(-100, 200, 700, 900)
+            
+            # Strategic Neon Accent
+            canvas.setStrokeColor(COLOR_NEON)
+            canvas.setLineWidth(3)
+            canvas.line(1.5*cm, 18*cm, 5*cm, 18*cm)
+            
+            # Logo on cover (decode edilmiş logo process içinde önbellekte)
+            logo = logo or get_logo_reader()
+            if logo is not None:
+                canvas.drawImage(logo, 1.5*cm, 24*cm, width=4*cm, height=2.5*cm, mask='auto', preserveAspectRatio=True)
+            canvas.endForm()
         
+        canvas.saveState()
+        canvas.doForm('CoverDecor')
         canvas.restoreState()
 
     def _draw_standard_page(self, canvas, doc):
         """Standard White Interior Pages for Readability"""
-        canvas.saveState()
-        
-        # Ensure background is white
-        canvas.setFillColor(colors.white)
-        canvas.rect(0, 0, A4[0], A4[1], fill=1, stroke=0)
-        
-        # Vertical accent strip on the left (Navy)
-        canvas.setFillColor(COLOR_NAVY)
-        canvas.rect(0, 0, 0.4*cm, A4[1], fill=1, stroke=0)
+        # Sabit sayfa süslemeleri tek bir form olarak tanımlanır, her sayfada referans verilir
+        if not canvas.hasForm('InsideDecor'):
+            canvas.beginForm('InsideDecor')
+            # Ensure background is white
+            canvas.setFillColor(colors.white)
+            canvas.rect(0, 0, A4[0], A4[1], fill=1, stroke=0)
+            
+            # Vertical accent strip on the left (Navy)
+            canvas.setFillColor(COLOR_NAVY)
+            canvas.rect(0, 0, 0.4*cm, A4[1], fill=1, stroke=0)
+            
+            # Header text (Subtle Gray)
+            canvas.setFont(FONT_BOLD, 8)
+            canvas.setFillColor(colors.HexColor('#6B7280'))
+            canvas.drawString(1.5*cm, doc.pagesize[1] - 1.2*cm, "Grefins Intelligence Systems | Board Member Report")
+            
+            # Footer (static part)
+            canvas.setFont(FONT_REG, 8)
+            canvas.setFillColor(colors.HexColor('#9CA3AF'))
+            canvas.drawString(1.5*cm, 1*cm, f"Confidential | {datetime.now().year}")
+            canvas.endForm()
         
-        # Header text (Subtle Gray)
-        canvas.setFont(FONT_BOLD, 8)
-        canvas.setFillColor(colors.HexColor('#6B7280'))
-        canvas.drawString(1.5*cm, doc.pagesize[1] - 1.2*cm, "Grefins Intelligence Systems | Board Member Report")
+        canvas.saveState()
+        canvas.doForm('InsideDecor')
         
-        # Footer
+        # Footer page number (sayfaya özgü)
         canvas.setFont(FONT_REG, 8)
         canvas.setFillColor(colors.HexColor('#9CA3AF'))
-        canvas.drawString(1.5*cm, 1*cm, f"Confidential | {datetime.now().year}")
         canvas.drawRightString(doc.pagesize[0] - 1.5*cm, 1*cm, f"Sayfa {doc.page}")
         
         canvas.restoreState()
 
-    def draw_premium_charts(self, cbam_summary, ets_forecast, emission_analysis=None):
-        """Generate Professional Visuals for Light Background"""
+    def draw_vector_charts(self, cbam_summary, ets_forecast, emission_analysis=None):
+        """Native vector charts (reportlab.graphics) - same branding, no rasterization"""
         charts = []
+        width, height = 14*cm, 7*cm
         
         # Chart 1: Carbon Mix
         if emission_analysis:
-            plt.figure(figsize=(6, 4), dpi=300)
-            s1 = float(emission_analysis.get('scope1', {}).get('total_scope1', 0))
-            s2 = float(emission_analysis.get('scope2', {}).get('total_scope2', 0))
+            s1 = float((emission_analysis.get('scope1') or {}).get('total_scope1', 0))
+            s2 = float((emission_analysis.get('scope2') or {}).get('total_scope2', 0))
             
             if s1 > 0 or s2 > 0:
+                d = Drawing(width, height)
+                d.add(String(width / 2, height - 0.5*cm, "Emisyon Dağılım Profili",
+                             fontName=FONT_BOLD, fontSize=12, fillColor=COLOR_NAVY, textAnchor='middle'))
+                
+                total = s1 + s2
+                pie = Doughnut()
+                pie.x, pie.y = width / 2 - 4*cm, 0.4*cm
+                pie.width = pie.height = 4.8*cm
+                pie.data = [s1, s2]
+                pie.startAngle = 90
+                pie.innerRadiusFraction = 0.5
+                pie.slices.strokeColor = COLOR_WHITE
+                pie.slices.strokeWidth = 1.5
+                pie.slices[0].fillColor = COLOR_NEON
+                pie.slices[1].fillColor = COLOR_NAVY
+                d.add(pie)
+                
+                legend = Legend()
+                legend.x, legend.y = width / 2 + 1.6*cm, 3.4*cm
+                legend.fontName = FONT_BOLD
+                legend.fontSize = 9
+                legend.fillColor = colors.HexColor('#1F2937')
+                legend.strokeColor = None
+                legend.alignment = 'right'
+                legend.deltay = 14
+                legend.colorNamePairs = [
+                    (COLOR_NEON, f"Scope 1  {s1 / total * 100:.1f}%"),
+                    (COLOR_NAVY, f"Scope 2  {s2 / total * 100:.1f}%")
+                ]
+                d.add(legend)
+                charts.append(d)
+
+        # Chart 2: Cost Trend
+        if ets_forecast is not None and not ets_forecast.empty:
+            quarters, values = _forecast_series(ets_forecast)
+            
+            d = Drawing(width, height)
+            d.add(String(width / 2, height - 0.5*cm, "CBAM Sertifika Fiyat Projeksiyonu (€)",
+                         fontName=FONT_BOLD, fontSize=12, fillColor=COLOR_NAVY, textAnchor='middle'))
+            
+            # X ekseni çeyrek indeksleri, etiketler çeyrek isimleri
+            lp = LinePlot()
+            lp.x, lp.y = 1.8*cm, 1.9*cm
+            lp.width, lp.height = width - 2.4*cm, height - 3.2*cm
+            lp.data = [list(enumerate(values))]
+            lp.lines[0].strokeColor = COLOR_NAVY
+            lp.lines[0].strokeWidth = 2.5
+            lp.lines[0].inFill = 1
+            lp.lines[0].fillColor = COLOR_NEON.clone(alpha=0.1)
+            lp.lines[0].symbol = makeMarker('FilledCircle', size=6,
+                                            fillColor=COLOR_NEON, strokeColor=COLOR_NAVY)
+            
+            lp.xValueAxis.valueMin = 0
+            lp.xValueAxis.valueMax = len(values) - 1 if len(values) > 1 else 1
+            lp.xValueAxis.valueStep = 1
+            lp.xValueAxis.labelTextFormat = lambda i: quarters[int(i)] if 0 <= int(i) < len(quarters) else ''
+            lp.xValueAxis.labels.angle = 45
+            lp.xValueAxis.labels.boxAnchor = 'ne'
+            lp.xValueAxis.labels.fontName = FONT_REG
+            lp.xValueAxis.labels.fontSize = 7
+            lp.xValueAxis.labels.fillColor = colors.HexColor('#4B5563')
+            lp.xValueAxis.strokeColor = colors.HexColor('#E5E7EB')
+            
+            span = (max(values) - min(values)) or max(values) or 1
+            lp.yValueAxis.valueMin = min(values) - span * 0.1
+            lp.yValueAxis.valueMax = max(values) + span * 0.1
+            lp.yValueAxis.labels.fontName = FONT_REG
+            lp.yValueAxis.labels.fontSize = 7
+            lp.yValueAxis.labels.fillColor = colors.HexColor('#4B5563')
+            lp.yValueAxis.labelTextFormat = '%.0f' if span >= 5 else '%.1f'
+            lp.yValueAxis.strokeColor = None
+            lp.yValueAxis.visibleGrid = 1
+            lp.yValueAxis.gridStrokeColor = COLOR_NAVY.clone(alpha=0.2)
+            lp.yValueAxis.gridStrokeDashArray = (2, 2)
+            d.add(lp)
+            charts.append(d)
+            
+        return charts
+
+    def _chart_flowables(self, cbam_summary, ets_forecast, emission_analysis=None,
+                         dpi=300, image_format='flate'):
+        """Seçili backend'e göre grafik flowable'ları"""
+        if self.chart_backend == 'matplotlib':
+            charts = self.draw_premium_charts(cbam_summary, ets_forecast, emission_analysis,
+                                              dpi=dpi, image_format=image_format)
+            return [Image(c, width=14*cm, height=7*cm) for c in charts]
+        return self.draw_vector_charts(cbam_summary, ets_forecast, emission_analysis)
+
+    def draw_premium_charts(self, cbam_summary, ets_forecast, emission_analysis=None,
+                            dpi=300, image_format='flate'):
+        """Generate Professional Visuals for Light Background (raster, PNG veya JPEG)"""
+        # matplotlib sadece raster backend seçildiğinde yüklenir
+        import matplotlib
+        matplotlib.use('Agg')
+        import matplotlib.pyplot as plt
+        
+        def save_figure():
+            buf = io.BytesIO()
+            if image_format == 'jpeg':
+                plt.savefig(buf, format='jpeg', dpi=dpi, facecolor='white', bbox_inches='tight',
+                            pil_kwargs={'quality': 80, 'optimize': True})
+            else:
+                plt.savefig(buf, format='png', dpi=dpi, transparent=True, bbox_inches='tight')
+            plt.close()
+            buf.seek(0)
+            return buf
+        
+        charts = []
+        
+        # Chart 1: Carbon Mix
+        if emission_analysis:
+            s1 = float((emission_analysis.get('scope1') or {}).get('total_scope1', 0))
+            s2 = float((emission_analysis.get('scope2') or {}).get('total_scope2', 0))
+            
+            if s1 > 0 or s2 > 0:
+                plt.figure(figsize=(6, 4), dpi=dpi)
                 wedges, texts, autotexts = plt.pie(
                     [s1, s2], labels=['Scope 1', 'Scope 2'], autopct='%1.1f%%',
                     colors=['#C9FD02', '#0B1121'], startangle=90,
@@ -220,41 +480,144 @@ class CBAMPDFGenerator:
                 plt.setp(texts, size=9, weight="bold", color="#1F2937") # Dark labels for light BG
                 plt.title("Emisyon Dağılım Profili", fontsize=12, fontweight='bold', pad=20, color="#0B1121")
                 
-                buf = io.BytesIO()
-                plt.savefig(buf, format='png', transparent=True, bbox_inches='tight')
-                buf.seek(0)
-                charts.append(buf)
-                plt.close()
+                charts.append(save_figure())
 
         # Chart 2: Cost Trend
         if ets_forecast is not None and not ets_forecast.empty:
-            plt.figure(figsize=(8, 4), dpi=300)
-            df = ets_forecast.head(12)
-            plt.plot(df['Quarter'], df['Forecasted Value'], color='#0B1121', linewidth=3, marker='o', markerfacecolor='#C9FD02', markersize=8)
-            plt.fill_between(df['Quarter'], df['Forecasted Value'], color='#C9FD02', alpha=0.1)
+            plt.figure(figsize=(8, 4), dpi=dpi)
+            quarters, values = _forecast_series(ets_forecast)
+            plt.plot(quarters, values, color='#0B1121', linewidth=3, marker='o', markerfacecolor='#C9FD02', markersize=8)
+            plt.fill_between(quarters, values, color='#C9FD02', alpha=0.1)
             plt.title("CBAM Sertifika Fiyat Projeksiyonu (€)", fontsize=12, fontweight='bold', pad=15, color="#0B1121")
             plt.grid(axis='y', linestyle='--', alpha=0.2, color="#0B1121")
             plt.xticks(rotation=45, color="#4B5563")
             plt.yticks(color="#4B5563")
             plt.tight_layout()
             
-            buf = io.BytesIO()
-            plt.savefig(buf, format='png', transparent=True, bbox_inches='tight')
-            buf.seek(0)
-            charts.append(buf)
-            plt.close()
+            charts.append(save_figure())
             
         return charts
 
     def generate_report(self, cbam_summary, ets_forecast, report_text, 
                        emission_analysis=None, optimization_scenarios=None):
         """Orchestrate the high-end document"""
-        buffer = io.BytesIO()
+        buffer, _ = self.generate_report_with_stats(
+            cbam_summary, ets_forecast, report_text, emission_analysis, optimization_scenarios
+        )
+        return buffer
+
+    def generate_report_spooled(self, cbam_summary, ets_forecast, report_text,
+                                emission_analysis=None, optimization_scenarios=None,
+                                spool_max_bytes=SPOOL_MAX_BYTES):
+        """
+        Büyük (çok tesisli) raporlar için: çıktı SpooledTemporaryFile'a yazılır
+        
+        Belge doğrudan spooled dosyaya derlenir, ancak reportlab PDF'i artımlı
+        yazamaz: kaydederken (xref tablosu için) bütün belgeyi GetPDFData ile
+        bellekte üretip tek seferde yazar. Bu yüzden üretim sırasındaki tepe
+        bellek belge boyutuyla sınırlı değildir. Spool'un sağladığı, üretim
+        bittikten sonra spool_max_bytes'ı aşan çıktının bellekte tutulmaması ve
+        yanıt/önbellek kopyalaması boyunca diskten parça parça okunmasıdır;
+        kapatıldığında diskteki geçici dosya silinir.
+        
+        Returns:
+            tuple: (SpooledTemporaryFile, stats dict)
+        """
+        return self.generate_report_with_stats(
+            cbam_summary, ets_forecast, report_text, emission_analysis, optimization_scenarios,
+            output_factory=lambda: tempfile.SpooledTemporaryFile(max_size=spool_max_bytes,
+                                                                 prefix='cbam_pdf_')
+        )
+
+    def generate_report_with_stats(self, cbam_summary, ets_forecast, report_text,
+                                   emission_analysis=None, optimization_scenarios=None,
+                                   output_factory=io.BytesIO):
+        """
+        PDF üret ve boyut/süre raporu döndür
+        
+        max_bytes aşılırsa görseller önce JPEG'e çevrilir, sonra DPI yarıya
+        indirilerek belge yeniden üretilir. Vektör grafik modunda değişen tek
+        şey logo olduğundan ara ayarlar üretilmez: boyut logo farkıyla tahmin
+        edilir ve sadece bütçeye sığan ilk (ya da son) ayar üretilir.
+        
+        Args:
+            output_factory (callable): Her deneme için yazılabilir, seek edilebilir dosya nesnesi üretir
+        
+        Returns:
+            tuple: (dosya nesnesi - başa sarılmış, stats dict)
+        """
+        start = time.perf_counter()
+        dpi, image_format = self.image_dpi, self.image_format
+        attempts = []
+        buffer = None
+        fallbacks = _image_fallbacks(dpi, image_format)
+        
+        while True:
+            attempt_start = time.perf_counter()
+            if buffer is not None:
+                # Bütçeyi aşan önceki deneme (geçici dosyaysa diskten silinir)
+                buffer.close()
+            buffer, pages = self._build_document(
+                cbam_summary, ets_forecast, report_text, emission_analysis,
+                dpi=dpi, image_format=image_format, output=output_factory()
+            )
+            buffer.seek(0, os.SEEK_END)
+            size = buffer.tell()
+            buffer.seek(0)
+            attempts.append({
+                'image_dpi': dpi,
+                'image_format': image_format,
+                'bytes': size,
+                'seconds': round(time.perf_counter() - attempt_start, 4)
+            })
+            
+            if not self.max_bytes or size <= self.max_bytes:
+                break
+            settings = next(fallbacks, None)
+            if settings is None:
+                break
+            if self.chart_backend == 'vector':
+                base = size - logo_pdf_bytes(dpi, image_format)
+                while base + logo_pdf_bytes(*settings) > self.max_bytes:
+                    later = next(fallbacks, None)
+                    if later is None:
+                        break
+                    settings = later
+                if base + logo_pdf_bytes(*settings) >= size:
+                    # Logo küçültmek boyutu düşürmüyor (ör. logo yok); yeniden üretmeye değmez
+                    break
+            dpi, image_format = settings
+        
+        stats = {
+            'bytes': size,
+            'seconds': round(time.perf_counter() - start, 4),
+            'pages': pages,
+            'image_dpi': dpi,
+            'image_format': image_format,
+            'chart_backend': self.chart_backend,
+            'max_bytes': self.max_bytes,
+            'within_budget': not self.max_bytes or size <= self.max_bytes,
+            # TTFont sadece kullanılan glifleri gömer; standart Helvetica hiç gömülmez
+            'fonts': {
+                'regular': FONT_REG,
+                'bold': FONT_BOLD,
+                'embedding': 'subset' if FONT_REG != 'Helvetica' else 'none'
+            },
+            'attempts': attempts
+        }
+        return buffer, stats
+
+    def _build_document(self, cbam_summary, ets_forecast, report_text, emission_analysis=None,
+                        dpi=150, image_format='flate', output=None):
+        """Belgeyi verilen görsel ayarlarıyla bir kez üret; (buffer, sayfa sayısı) döndürür"""
+        buffer = output if output is not None else io.BytesIO()
         doc = BaseDocTemplate(buffer, pagesize=A4, leftMargin=2*cm, rightMargin=1.5*cm, topMargin=2.5*cm, bottomMargin=2.5*cm)
         
         full_frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
         
-        cover_template = PageTemplate(id='Cover', frames=[full_frame], onPage=self._draw_cover_background)
+        logo = get_logo_reader(dpi, image_format)
+        cover_template = PageTemplate(id='Cover', frames=[full_frame],
+                                      onPage=lambda canvas, d: self._draw_cover_background(canvas, d, logo))
         inside_template = PageTemplate(id='Inside', frames=[full_frame], onPage=self._draw_standard_page)
         
         doc.addPageTemplates([cover_template, inside_template])
@@ -268,7 +631,7 @@ class CBAMPDFGenerator:
         story.append(Paragraph("GreFins Intelligence Systems | Board Member Report", self.styles['CoverSubTitle']))
         
         story.append(Spacer(1, 4*cm))
-        footer_style = ParagraphStyle(name='CoverFoot', fontName=FONT_REG, fontSize=11, textColor=COLOR_WHITE)
+        footer_style = self.styles['CoverFoot']
         story.append(Paragraph(f"<b>Firma:</b> {cbam_summary.get('company_name', 'Firma')}", footer_style))
         story.append(Paragraph(f"<b>Dönem:</b> {cbam_summary.get('reporting_period', '2024')}", footer_style))
         story.append(Paragraph(f"<b>Lokasyon:</b> {cbam_summary.get('origin_country', 'TR')}", footer_style))
@@ -288,7 +651,7 @@ class CBAMPDFGenerator:
             qty_val = 0
 
         metrics_data = [
-            [Paragraph("<b>TEMEL METRİKLER</b>", ParagraphStyle(name='TableHeader', fontName=FONT_BOLD, fontSize=11, textColor=COLOR_WHITE)), ""],
+            [Paragraph("<b>TEMEL METRİKLER</b>", self.styles['TableHeader']), ""],
             [Paragraph("Üretim Rotası", self.styles['ExecBody']), Paragraph(f"{cbam_summary.get('production_route', 'N/A').upper()}", self.styles['ExecBody'])],
             [Paragraph("Ürün Segmenti", self.styles['ExecBody']), Paragraph(f"{cbam_summary.get('product', 'N/A')}", self.styles['ExecBody'])],
             [Paragraph("Toplam Emisyon", self.styles['ExecBody']), Paragraph(f"{float(cbam_summary.get('total_emission', 0)):,.2f} tCO2e", self.styles['ExecBody'])],
@@ -313,53 +676,33 @@ class CBAMPDFGenerator:
         story.append(Spacer(1, 1*cm))
         
         # --- AI CONTENT HANDLING ---
-        def clean_md(text):
-            if not text: return ""
-            text = text.replace('✓', '•') # Standardize bullets
-            text = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', text)
-            text = re.sub(r'\*(.*?)\*', r'<i>\1</i>', text)
-            return text
-
+        # Markdown tek geçişte derlenir (metin hash'i ile önbellekli), grafikler bir kez çizilir
         if report_text:
-            sections = re.split(r'\n(?=###|\d\.)', report_text)
-            for section in sections:
-                lines = section.strip().split('\n')
-                if not lines: continue
-                
-                header = lines[0]
-                content_lines = lines[1:]
-                
-                # Main headings (Force Dark Color)
-                if any(x in header for x in ['###', '1.', '2.', '3.', '4.', '5.']):
-                    clean_h = header.replace('###', '').strip()
-                    story.append(Paragraph(clean_md(clean_h), self.styles['SectionHeading']))
-                else:
-                    content_lines = [header] + content_lines
-                
-                # Visuals integration logic
-                if "EMİSYON ANALİZİ" in header.upper() or "3." in header:
-                    charts = self.draw_premium_charts(cbam_summary, ets_forecast, emission_analysis)
-                    for c in charts:
-                        story.append(KeepTogether([Image(c, width=14*cm, height=7*cm), Spacer(1, 0.5*cm)]))
-
-                # Body text (Ensuring Dark Gray for readability)
-                for line in content_lines:
-                    line = line.strip()
-                    if not line: continue
-                    
-                    p_style = self.styles['ExecBody']
-                    if line.startswith('-') or line.startswith('*') or line.startswith('•'):
-                        text = f"• {clean_md(line.replace('-', '').replace('*', '').strip())}"
-                    else:
-                        text = clean_md(line)
-                    
-                    story.append(Paragraph(text, p_style))
+            blocks = compile_markdown(report_text)
+            story.extend(build_flowables(
+                blocks, self.styles,
+                chart_factory=lambda: self._chart_flowables(cbam_summary, ets_forecast, emission_analysis,
+                                                            dpi=dpi, image_format=image_format),
+                table_width=doc.width - 0.5*cm
+            ))
 
         # Final Branding
         story.append(Spacer(1, 2*cm))
-        story.append(Paragraph("Bu rapor GreFins Intelligence altyapısı tarafından üretilmiştir. Veriler Avrupa Komisyonu ve EU ETS piyasa verileriyle desteklenmektedir.", 
-                               ParagraphStyle(name='Legal', fontName=FONT_REG, fontSize=7, textColor=colors.grey, alignment=TA_CENTER)))
+        story.append(Paragraph("Bu rapor GreFins Intelligence altyapısı tarafından üretilmiştir. Veriler Avrupa Komisyonu ve EU ETS piyasa verileriyle desteklenmektedir.",  
+                               self.styles['Legal']))
 
         doc.build(story)
         buffer.seek(0)
-        return buffer
+        return buffer, doc.page
+
+
+@lru_cache(maxsize=None)
+def get_pdf_generator(chart_backend='vector', image_dpi=150, image_format='flate', max_bytes=None):
+    """
+    Process düzeyinde paylaşılan generator örneği (ayar kombinasyonu başına bir tane)
+
+    generate_report sadece okunan stil sayfalarını kullanır; aynı örnek
+    thread'ler arasında güvenle tekrar kullanılabilir.
+    """
+    return CBAMPDFGenerator(chart_backend=chart_backend, image_dpi=image_dpi,
+                            image_format=image_format, max_bytes=max_bytes)
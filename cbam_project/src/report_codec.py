@@ -0,0 +1,233 @@
+"""
+Report Codec Module
+Compression of large report attributes for DynamoDB storage
+"""
+
+import json
+import zlib
+from decimal import Decimal
+
+
+# Büyük (ağır) rapor alanları - DynamoDB'ye sıkıştırılarak yazılır
+HEAVY_ATTRIBUTES = ('report_text', 'ets_forecast', 'optimization_scenarios')
+
+# Dashboard listesi için yeterli olan hafif alanlar
+DASHBOARD_ATTRIBUTES = (
+    'report_id', 'type', 'created_at', 'timestamp',
+    'company_info', 'cbam_summary', 'summary', 'emission_analysis'
+)
+
+# Bu boyutun altındaki alanları sıkıştırmaya değmez (byte)
+COMPRESSION_THRESHOLD = 1024
+
+DEFAULT_CODEC = 'zlib'
+
+
+def _json_default(obj):
+    """json.dumps için Decimal / numpy / datetime dönüşümü"""
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if hasattr(obj, 'item'):
+        return obj.item()
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    return str(obj)
+
+
+def _get_zstd():
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+def available_codec(preferred=DEFAULT_CODEC):
+    """
+    Kullanılabilir sıkıştırma codec'ini döndür
+
+    Args:
+        preferred (str): 'zlib' veya 'zstd'
+
+    Returns:
+        str: Kullanılacak codec adı (zstd yüklü değilse zlib)
+    """
+    if preferred == 'zstd' and _get_zstd() is not None:
+        return 'zstd'
+    return 'zlib'
+
+
+def compress_attribute(value, codec=DEFAULT_CODEC):
+    """
+    Bir rapor alanını JSON'a çevirip sıkıştır
+
+    Args:
+        value: JSON'a çevrilebilir değer
+        codec (str): 'zlib' veya 'zstd'
+
+    Returns:
+        bytes: Sıkıştırılmış içerik
+    """
+    raw = json.dumps(value, ensure_ascii=False, separators=(',', ':'),
+                     default=_json_default).encode('utf-8')
+    if codec == 'zstd':
+        return _get_zstd().ZstdCompressor(level=9).compress(raw)
+    return zlib.compress(raw, 9)
+
+
+def decompress_attribute(blob, codec=DEFAULT_CODEC):
+    """
+    compress_attribute ile sıkıştırılmış alanı geri aç
+
+    Args:
+        blob: bytes veya boto3 Binary nesnesi
+        codec (str): Yazarken kullanılan codec
+
+    Returns:
+        Orijinal değer
+    """
+    # boto3 okumada Binary sarmalayıcı döndürür
+    data = getattr(blob, 'value', blob)
+    if codec == 'zstd':
+        raw = _get_zstd().ZstdDecompressor().decompress(data)
+    else:
+        raw = zlib.decompress(data)
+    return json.loads(raw.decode('utf-8'))
+
+
+def encode_report_item(item, codec=DEFAULT_CODEC, threshold=COMPRESSION_THRESHOLD):
+    """
+    Ağır alanları sıkıştırılmış hale getir (DynamoDB'ye yazmadan önce)
+
+    Args:
+        item (dict): Rapor verisi
+        codec (str): Tercih edilen codec
+        threshold (int): Sıkıştırma eşiği (byte)
+
+    Returns:
+        dict: Sıkıştırılmış alanları içeren yeni sözlük
+    """
+    codec = available_codec(codec)
+    encoded = dict(item)
+    compressed = []
+
+    for key in HEAVY_ATTRIBUTES:
+        value = encoded.get(key)
+        if value is None:
+            continue
+        size = len(json.dumps(value, ensure_ascii=False, default=_json_default).encode('utf-8'))
+        if size < threshold:
+            continue
+        encoded[key] = compress_attribute(value, codec)
+        compressed.append(key)
+
+    if compressed:
+        encoded['compressed_attributes'] = compressed
+        encoded['compression_codec'] = codec
+
+    return encoded
+
+
+class LazyReport(dict):
+    """
+    DynamoDB'den okunan rapor - sıkıştırılmış alanlar ilk erişimde açılır
+
+    Tek alan erişimi (report[key], get, pop) sadece o alanı açar; tüm
+    değerleri gören erişimler (items, values, copy, dict(report),
+    json.dumps) önce bekleyen tüm alanları açar.
+    """
+
+    def __init__(self, item):
+        super().__init__(item)
+        self._codec = item.get('compression_codec', DEFAULT_CODEC)
+        self._pending = set(item.get('compressed_attributes', [])) & set(item.keys())
+
+    def __getitem__(self, key):
+        value = super().__getitem__(key)
+        if key in self._pending:
+            value = decompress_attribute(value, self._codec)
+            super().__setitem__(key, value)
+            self._pending.discard(key)
+        return value
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key, *default):
+        if key in self._pending:
+            self[key]
+        return super().pop(key, *default)
+
+    def _decode_all(self):
+        for key in list(self._pending):
+            self[key]
+
+    def __iter__(self):
+        # dict alt sınıfı __iter__ tanımlarsa dict(report) ve {**report} ham
+        # değerleri kopyalamak yerine keys() + __getitem__ kullanır
+        return super().__iter__()
+
+    def items(self):
+        # json.dumps dict alt sınıflarını items() ile gezer
+        self._decode_all()
+        return super().items()
+
+    def values(self):
+        self._decode_all()
+        return super().values()
+
+    def copy(self):
+        return self.materialize()
+
+    def materialize(self):
+        """Tüm sıkıştırılmış alanları aç ve düz dict döndür"""
+        self._decode_all()
+        return dict(super().items())
+
+
+def to_plain(obj):
+    """DynamoDB Decimal değerlerini float'a çevir (iç içe yapılar dahil)"""
+    if isinstance(obj, list):
+        return [to_plain(i) for i in obj]
+    if isinstance(obj, dict):
+        return {k: to_plain(v) for k, v in obj.items()}
+    if isinstance(obj, Decimal):
+        return float(obj)
+    return obj
+
+
+def decode_report_item(item):
+    """
+    DynamoDB item'ını düz Python sözlüğüne çevir (tüm alanlar açılmış)
+
+    Args:
+        item (dict): DynamoDB'den okunan ham item
+
+    Returns:
+        dict: Decimal'siz, sıkıştırmasız rapor verisi
+    """
+    report = LazyReport(to_plain(item)).materialize()
+    report.pop('compressed_attributes', None)
+    report.pop('compression_codec', None)
+    return report
+
+
+def build_projection(attributes):
+    """
+    DynamoDB scan/query için ProjectionExpression parametreleri oluştur
+
+    'type' gibi rezerve kelimeler için ExpressionAttributeNames kullanılır.
+
+    Args:
+        attributes (iterable): Çekilecek alan adları
+
+    Returns:
+        dict: scan() çağrısına verilecek ek parametreler
+    """
+    names = {f'#a{i}': attr for i, attr in enumerate(attributes)}
+    return {
+        'ProjectionExpression': ', '.join(names.keys()),
+        'ExpressionAttributeNames': names
+    }
@@ -0,0 +1,233 @@
+"""
+Report Exporter Module
+Parallel segmented export / backfill of stored DynamoDB reports
+"""
+
+import os
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from .report_codec import decode_report_item, _json_default
+
+
+class ReportExporter:
+    """
+    DynamoDB paralel scan (Segment/TotalSegments) ile tüm raporları dışa aktarır.
+
+    Her segment kendi dosyasına yazar ve her sayfadan sonra checkpoint
+    kaydeder; yarıda kalan bir export aynı çıktı dizininden devam ettirilebilir.
+    Bellekte segment başına en fazla bir sayfa (page_size item) tutulur.
+    """
+
+    def __init__(self, table_factory, total_segments=4, page_size=200):
+        """
+        Initialize exporter
+
+        Args:
+            table_factory (callable): Yeni bir DynamoDB Table nesnesi döndüren fonksiyon
+                (boto3 resource'ları thread-safe değildir, her worker kendi tablosunu açar)
+            total_segments (int): Paralel scan segment sayısı
+            page_size (int): Scan sayfa boyutu (Limit)
+        """
+        self.table_factory = table_factory
+        self.total_segments = total_segments
+        self.page_size = page_size
+        self._lock = threading.Lock()
+
+    # --- Checkpoint yönetimi ---
+
+    def _checkpoint_path(self, output_dir, segment):
+        return os.path.join(output_dir, 'checkpoints', f'segment-{segment:03d}.json')
+
+    def _check_segments(self, checkpoint, path):
+        # LastEvaluatedKey sadece aynı Segment/TotalSegments bölünmesinde anlamlıdır;
+        # farklı bölünmede devam etmek raporları sessizce çiftler veya atlar
+        if checkpoint.get('total_segments') != self.total_segments:
+            raise ValueError(
+                f"{path}: checkpoint {checkpoint.get('total_segments')} segmentle yazılmış, "
+                f"şimdi {self.total_segments} segment istendi. Aynı segment sayısıyla devam edin "
+                f"veya yeni bir çıktı dizini kullanın."
+            )
+
+    def load_checkpoint(self, output_dir, segment):
+        """
+        Segment checkpoint'ini oku (yoksa boş başlangıç durumu)
+
+        Raises:
+            ValueError: Checkpoint farklı bir segment sayısıyla yazılmışsa
+        """
+        path = self._checkpoint_path(output_dir, segment)
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                checkpoint = json.load(f)
+            self._check_segments(checkpoint, path)
+            return checkpoint
+        return {'segment': segment, 'total_segments': self.total_segments, 'last_key': None,
+                'pages': 0, 'items': 0, 'offset': 0, 'done': False}
+
+    def check_output_dir(self, output_dir):
+        """
+        Mevcut tüm checkpoint'lerin bu segment sayısıyla yazıldığını doğrula
+
+        Raises:
+            ValueError: Herhangi bir checkpoint farklı segment sayısıyla yazılmışsa
+        """
+        checkpoint_dir = os.path.join(output_dir, 'checkpoints')
+        if not os.path.isdir(checkpoint_dir):
+            return
+        for name in sorted(os.listdir(checkpoint_dir)):
+            if name.startswith('segment-') and name.endswith('.json'):
+                path = os.path.join(checkpoint_dir, name)
+                with open(path, 'r', encoding='utf-8') as f:
+                    self._check_segments(json.load(f), path)
+
+    def save_checkpoint(self, output_dir, checkpoint):
+        """Checkpoint'i atomik olarak yaz"""
+        path = self._checkpoint_path(output_dir, checkpoint['segment'])
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(checkpoint, f, default=_json_default)
+        os.replace(tmp_path, path)
+
+    # --- Yazıcılar ---
+
+    def _write_jsonl_page(self, output_dir, checkpoint, items):
+        path = os.path.join(output_dir, f"part-{checkpoint['segment']:03d}.jsonl")
+        mode = 'r+b' if os.path.exists(path) else 'wb'
+        with open(path, mode) as f:
+            # Son checkpoint'ten sonra yazılmış (yarım kalmış) satırları at
+            f.seek(checkpoint['offset'])
+            f.truncate()
+            for item in items:
+                line = json.dumps(item, ensure_ascii=False, default=_json_default)
+                f.write(line.encode('utf-8') + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+            checkpoint['offset'] = f.tell()
+
+    def _write_parquet_page(self, output_dir, checkpoint, items):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Parquet çıktısı için 'pyarrow' paketi gerekli: pip install pyarrow")
+
+        # İç içe yapılar JSON string olarak saklanır (şema sayfalar arası sabit kalsın)
+        rows = [
+            {k: (json.dumps(v, ensure_ascii=False, default=_json_default)
+                 if isinstance(v, (dict, list)) else v) for k, v in item.items()}
+            for item in items
+        ]
+        path = os.path.join(
+            output_dir, f"part-{checkpoint['segment']:03d}-{checkpoint['pages']:05d}.parquet"
+        )
+        pq.write_table(pa.Table.from_pylist(rows), path)
+
+    # --- Segment işleme ---
+
+    def _export_segment(self, segment, output_dir, fmt, transform, progress):
+        checkpoint = self.load_checkpoint(output_dir, segment)
+        if checkpoint['done']:
+            return checkpoint
+
+        table = self.table_factory()
+        writer = self._write_parquet_page if fmt == 'parquet' else self._write_jsonl_page
+
+        while True:
+            scan_kwargs = {
+                'Segment': segment,
+                'TotalSegments': self.total_segments,
+                'Limit': self.page_size
+            }
+            if checkpoint['last_key']:
+                scan_kwargs['ExclusiveStartKey'] = checkpoint['last_key']
+
+            response = table.scan(**scan_kwargs)
+            items = [decode_report_item(item) for item in response.get('Items', [])]
+            if transform:
+                items = [r for r in (transform(item) for item in items) if r is not None]
+
+            if items:
+                writer(output_dir, checkpoint, items)
+
+            checkpoint['pages'] += 1
+            checkpoint['items'] += len(items)
+            checkpoint['last_key'] = response.get('LastEvaluatedKey')
+            checkpoint['done'] = checkpoint['last_key'] is None
+            self.save_checkpoint(output_dir, checkpoint)
+
+            if progress:
+                with self._lock:
+                    progress(segment, checkpoint)
+
+            if checkpoint['done']:
+                return checkpoint
+
+    def export(self, output_dir, fmt='jsonl', transform=None, max_workers=None, progress=None):
+        """
+        Tüm raporları paralel olarak dışa aktar
+
+        Args:
+            output_dir (str): Çıktı dizini (checkpoint'ler de burada tutulur)
+            fmt (str): 'jsonl' veya 'parquet'
+            transform (callable): Her rapora uygulanacak dönüşüm (None döndürürse atlanır)
+            max_workers (int): Worker sayısı (varsayılan: segment sayısı)
+            progress (callable): progress(segment, checkpoint) geri çağrısı
+
+        Returns:
+            dict: Toplam item sayısı ve segment checkpoint'leri
+
+        Raises:
+            ValueError: Desteklenmeyen format veya çıktı dizini farklı segment sayısıyla başlatılmışsa
+        """
+        if fmt not in ('jsonl', 'parquet'):
+            raise ValueError(f"Desteklenmeyen format: {fmt}")
+        # Hiçbir segment yazmaya başlamadan önce: karışık bölünmeli checkpoint'lerle devam edilmez
+        self.check_output_dir(output_dir)
+
+        os.makedirs(os.path.join(output_dir, 'checkpoints'), exist_ok=True)
+        workers = max_workers or self.total_segments
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(self._export_segment, segment, output_dir, fmt, transform, progress)
+                for segment in range(self.total_segments)
+            ]
+            checkpoints = [f.result() for f in futures]
+
+        return {
+            'total_items': sum(c['items'] for c in checkpoints),
+            'segments': checkpoints
+        }
+
+
+def recompute_cbam_cost(ets_price):
+    """
+    Backfill dönüşümü: kayıtlı raporların CBAM maliyetini yeni ETS fiyatıyla hesapla
+
+    Args:
+        ets_price (float): Yeni ETS fiyatı (€/tCO2)
+
+    Returns:
+        callable: ReportExporter.export için transform fonksiyonu
+    """
+    from .cbam_calculator import CBAMCalculator
+    calc = CBAMCalculator(ets_price)
+
+    def transform(report):
+        for key in ('cbam_summary', 'summary'):
+            summary = report.get(key)
+            if not summary or 'quantity_tonnes' not in summary:
+                continue
+            result = calc.calculate(
+                summary['quantity_tonnes'],
+                summary.get('direct_ei', 0),
+                summary.get('indirect_ei', 0)
+            )
+            summary['ets_price'] = ets_price
+            summary['cbam_cost'] = result['cbam_cost']
+            summary['cbam_cost_adjusted'] = result['cbam_cost_adjusted']
+        return report
+
+    return transform
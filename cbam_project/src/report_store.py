@@ -0,0 +1,154 @@
+"""
+Report Store Module
+Bounded per-session storage of full analysis results (PDF indirme için)
+"""
+
+import os
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+class ReportStore:
+    """
+    report_id ile anahtarlanan, boyut sınırlı rapor deposu.
+
+    - Bellek katmanı: LRU, hem kayıt sayısı hem toplam byte ile sınırlı.
+      Raporlar pickle'lanmış halde tutulur (DataFrame dahil), böylece
+      boyut hesabı kesindir ve canlı nesneler bellekte kalmaz.
+    - Disk katmanı (opsiyonel): tüm gunicorn worker'larının ortak okuduğu
+      dizin; bellekte bulunamayan rapor buradan yüklenir.
+    """
+
+    def __init__(self, max_items=32, max_bytes=64 * 1024 * 1024,
+                 disk_dir=None, disk_max_bytes=512 * 1024 * 1024):
+        """
+        Initialize store
+
+        Args:
+            max_items (int): Bellekte tutulacak en fazla rapor sayısı
+            max_bytes (int): Bellek katmanı byte sınırı
+            disk_dir (str): Disk katmanı dizini (None ise sadece bellek)
+            disk_max_bytes (int): Disk katmanı byte sınırı (en eskiler silinir)
+        """
+        self.max_items = max_items
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes
+        self._memory = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def _disk_path(self, report_id):
+        # report_id dışarıdan (query string) gelir; hash'lenmiş ad yol enjeksiyonunu
+        # engeller ve farklı id'ler aynı dosyaya düşmez ('../r1' ile 'r1' ayrı)
+        digest = hashlib.sha256(str(report_id).encode('utf-8')).hexdigest()
+        return os.path.join(self.disk_dir, f'{digest}.pkl')
+
+    def _remember(self, report_id, blob):
+        """Bellek katmanına ekle ve sınırları aşan en eski kayıtları çıkar (yeni kayıt hariç)"""
+        with self._lock:
+            old = self._memory.pop(report_id, None)
+            if old is not None:
+                self._memory_bytes -= len(old)
+            self._memory[report_id] = blob
+            self._memory_bytes += len(blob)
+
+            # Yeni eklenen kayıt hiç çıkarılmaz: tek başına sınırı aşsa bile kullanıcı az
+            # önce ürettiği raporu indirebilmeli (disk katmanı yoksa başka kopyası yok)
+            while len(self._memory) > 1 and (len(self._memory) > self.max_items
+                                             or self._memory_bytes > self.max_bytes):
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_bytes -= len(evicted)
+            oversized = self._memory_bytes > self.max_bytes
+
+        if oversized:
+            print(f"⚠️ Rapor {report_id} ({len(blob) / 1024:.0f} KB) bellek sınırını "
+                  f"({self.max_bytes / 1024:.0f} KB) tek başına aşıyor; yine de tutuluyor")
+
+    def _prune_disk(self):
+        """Disk katmanı sınırı aşıldıysa en eski dosyaları sil"""
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith('.pkl'):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def put(self, report_id, data, owner=None):
+        """
+        Raporu kaydet
+
+        Args:
+            report_id (str): Rapor kimliği
+            data (dict): Rapor verisi (pickle'lanabilir olmalı)
+            owner (str): Raporun sahibi olan oturum kimliği
+        """
+        blob = pickle.dumps({'owner': owner, 'data': data}, protocol=pickle.HIGHEST_PROTOCOL)
+        self._remember(report_id, blob)
+
+        if self.disk_dir:
+            path = self._disk_path(report_id)
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+            self._prune_disk()
+
+    def get(self, report_id, owner=None):
+        """
+        Raporu getir
+
+        Args:
+            report_id (str): Rapor kimliği
+            owner (str): İsteği yapan oturum; rapor başka oturuma aitse None döner
+
+        Returns:
+            dict or None: Rapor verisi
+        """
+        if not report_id:
+            return None
+
+        with self._lock:
+            blob = self._memory.get(report_id)
+            if blob is not None:
+                self._memory.move_to_end(report_id)
+
+        if blob is None and self.disk_dir:
+            try:
+                with open(self._disk_path(report_id), 'rb') as f:
+                    blob = f.read()
+            except FileNotFoundError:
+                return None
+            self._remember(report_id, blob)
+
+        if blob is None:
+            return None
+
+        entry = pickle.loads(blob)
+        if entry['owner'] is not None and entry['owner'] != owner:
+            return None
+        return entry['data']
+
+    def stats(self):
+        """Bellek katmanı doluluk bilgisi"""
+        with self._lock:
+            return {'items': len(self._memory), 'bytes': self._memory_bytes}
@@ -0,0 +1,288 @@
+"""
+Scope 2 Time Series Module
+15 dakikalık / saatlik sayaç verisinden saatlik şebeke faktörüyle Scope 2
+(location-based ve market-based), parça parça akış halinde toplama
+"""
+
+import os
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from .customs_import import _normalize_header, _sniff_csv
+from .emission_factors import default_registry
+
+
+# Başlık eşleştirme: normalize edilmiş sütun adı -> alan
+METER_COLUMN_ALIASES = {
+    'timestamp': ('timestamp', 'time', 'datetime', 'date_time', 'tarih', 'zaman', 'tarih_saat', 'interval_start'),
+    'meter_id': ('meter', 'meter_id', 'sayac', 'sayaç', 'sayac_id', 'sayaç_id', 'channel'),
+    'kwh': ('kwh', 'consumption_kwh', 'energy_kwh', 'tuketim_kwh', 'tüketim_kwh', 'value_kwh'),
+    'mwh': ('mwh', 'consumption_mwh', 'energy_mwh', 'tuketim_mwh', 'tüketim_mwh'),
+}
+
+GRID_COLUMN_ALIASES = {
+    'timestamp': METER_COLUMN_ALIASES['timestamp'],
+    'factor': ('factor', 'grid_factor', 'carbon_intensity', 'kgco2_kwh', 'tco2_mwh', 'emisyon_faktoru',
+               'emisyon_faktörü', 'gco2_kwh'),
+}
+
+# Satır sayısı; bellek kullanımı dosya boyutundan bağımsız olarak bununla sınırlı kalır
+CHUNK_ROWS = 500_000
+
+_NS_PER_HOUR = 3_600_000_000_000
+
+
+def _resolve(header, aliases, required):
+    normalized = [_normalize_header(h) for h in header]
+    columns = {}
+    for field, names in aliases.items():
+        for name, original in zip(normalized, header):
+            if name in names:
+                columns[field] = original
+                break
+    missing = [field for field in required if field not in columns]
+    if missing:
+        raise ValueError(f"Sütun bulunamadı: {missing}. Mevcut sütunlar: {list(header)}")
+    return columns
+
+
+def _read_options(path):
+    """Kodlama, ayırıcı ve ondalık işaretini tahmin et (';' + '1,5' -> ondalık virgül)"""
+    encoding, delimiter = _sniff_csv(path)
+    with open(path, 'rb') as f:
+        sample = f.read(16 * 1024).decode(encoding, errors='ignore')
+    decimal = ',' if delimiter != ',' and re.search(r'\d,\d', sample) else '.'
+    return {'encoding': encoding, 'sep': delimiter, 'decimal': decimal}
+
+
+def hour_index(timestamps):
+    """
+    Zaman damgalarını 1970'ten bu yana (UTC) saat sayısına çevir (saat başına yuvarlar)
+
+    Ofsetli değerler (yaz/kış saati geçişinde +01:00 / +02:00 karışık) UTC'ye
+    çevrilir; ofsetsiz değerler UTC kabul edilir.
+
+    Args:
+        timestamps: datetime64 dizisi/Series veya ayrıştırılabilir metinler
+
+    Returns:
+        ndarray: int64 saat indeksleri
+    """
+    values = parse_timestamps(timestamps, errors='raise')
+    ns = np.asarray(values, dtype='datetime64[ns]').astype(np.int64)
+    return np.floor_divide(ns, _NS_PER_HOUR)
+
+
+def parse_timestamps(values, errors='coerce'):
+    """
+    Zaman damgalarını ofsetsiz UTC datetime64'e çevir
+
+    Args:
+        values: Metin/datetime Series, Index veya dizi
+        errors (str): pd.to_datetime hata modu
+
+    Returns:
+        Series veya DatetimeIndex: UTC, tz bilgisi kaldırılmış
+    """
+    parsed = pd.to_datetime(values, errors=errors, utc=True)
+    if isinstance(parsed, pd.Series):
+        return parsed.dt.tz_localize(None)
+    return parsed.tz_localize(None)
+
+
+class GridFactorSeries:
+    """
+    Saatlik şebeke emisyon faktörü serisi (tCO2/MWh = kgCO2/kWh)
+
+    Eşleştirme vektöreldir: her sayaç saati için serideki son saat
+    (as-of) np.searchsorted ile bulunur. Serinin başlangıcından önceki ve
+    bitişinden sonraki saatler eşleşmez ve yedek faktörü alır.
+    """
+
+    def __init__(self, timestamps, factors):
+        """
+        Args:
+            timestamps (array-like): Saat başı zaman damgaları
+            factors (array-like): tCO2/MWh değerleri
+        """
+        hours = hour_index(timestamps)
+        factors = np.asarray(factors, dtype=float)
+        order = np.argsort(hours, kind='stable')
+        self.hours = hours[order]
+        self.factors = factors[order]
+        if not len(self.hours):
+            raise ValueError("Şebeke faktörü serisi boş")
+
+    @classmethod
+    def from_csv(cls, path):
+        """
+        CSV'den seri oku; 'gco2_kwh' sütunu g -> kg olarak 1000'e bölünür
+
+        Args:
+            path (str): timestamp + faktör sütunlu CSV
+        """
+        options = _read_options(path)
+        header = pd.read_csv(path, nrows=0, **options).columns.tolist()
+        columns = _resolve(header, GRID_COLUMN_ALIASES, ('timestamp', 'factor'))
+        df = pd.read_csv(path, usecols=list(columns.values()), **options)
+        factors = pd.to_numeric(df[columns['factor']], errors='coerce').to_numpy(dtype=float)
+        if _normalize_header(columns['factor']) == 'gco2_kwh':
+            factors = factors / 1000
+        valid = ~np.isnan(factors)
+        return cls(df[columns['timestamp']][valid], factors[valid])
+
+    @property
+    def mean(self):
+        """Serinin düz ortalaması (yıllık tek faktör karşılaştırması için)"""
+        return float(self.factors.mean())
+
+    def lookup(self, hours):
+        """
+        Saat indeksleri için faktörler
+
+        Args:
+            hours (ndarray): hour_index() çıktısı
+
+        Returns:
+            tuple: (faktörler, eşleşme maskesi)
+        """
+        position = np.searchsorted(self.hours, hours, side='right') - 1
+        # Serinin başından önceki ve son saatinden sonraki saatler eşleşmez
+        matched = (position >= 0) & (hours <= self.hours[-1])
+        return self.factors[np.maximum(position, 0)], matched
+
+
+class Scope2Accumulator:
+    """Parça sonuçlarını sabit boyutlu toplamlarda biriktirir (sayaç ve yıl-ay başına)"""
+
+    def __init__(self):
+        self.meters = {}
+        self.periods = {}
+        self.rows = 0
+        self.unmatched_rows = 0
+        self.meter_totals = np.zeros((0, 3))
+        self.period_totals = np.zeros((0, 3))
+
+    @staticmethod
+    def _codes(keys, index, totals):
+        """Anahtarları satır indekslerine çevir; yeni anahtarlar için toplam tablosunu büyüt"""
+        codes, uniques = pd.factorize(keys, sort=False)
+        mapping = np.array([index.setdefault(k, len(index)) for k in uniques.tolist()], dtype=np.intp)
+        if len(index) > len(totals):
+            grown = np.zeros((len(index), 3))
+            grown[:len(totals)] = totals
+            totals = grown
+        return mapping[codes], totals
+
+    def add(self, meter_ids, periods, mwh, location, market, unmatched):
+        """
+        Args:
+            meter_ids (ndarray): Satır başına sayaç kimliği
+            periods (ndarray): Satır başına yıl x 12 + (ay - 1)
+        """
+        meters, self.meter_totals = self._codes(np.asarray(meter_ids).astype(str), self.meters,
+                                                self.meter_totals)
+        periods, self.period_totals = self._codes(periods, self.periods, self.period_totals)
+        for column, values in enumerate((mwh, location, market)):
+            self.meter_totals[:, column] += np.bincount(meters, weights=values,
+                                                        minlength=len(self.meter_totals))
+            self.period_totals[:, column] += np.bincount(periods, weights=values,
+                                                         minlength=len(self.period_totals))
+        self.rows += len(mwh)
+        self.unmatched_rows += int(unmatched)
+
+
+def calculate_scope2_timeseries(meter_paths, grid, green_meters=(), residual_mix_factor=None,
+                                fallback_factor=None, chunk_rows=CHUNK_ROWS):
+    """
+    Sayaç CSV'lerini parça parça oku, saatlik faktörle eşleştir ve topla
+
+    Location-based: her aralığın tüketimi x o saatin şebeke faktörü.
+    Market-based: yeşil sertifikalı (PPA/I-REC) sayaçlar 0; diğerleri
+    residual_mix_factor verilmişse onunla, yoksa saatlik şebeke faktörüyle.
+
+    Args:
+        meter_paths (list): Sayaç CSV yolları (timestamp + kWh/MWh, opsiyonel sayaç sütunu;
+            sayaç sütunu yoksa dosya adı sayaç kimliğidir)
+        grid (GridFactorSeries): Saatlik şebeke faktörü serisi
+        green_meters (iterable): Market-based'de sıfır kabul edilen sayaç kimlikleri
+        residual_mix_factor (float): Sertifikasız tüketim için residual mix, tCO2/MWh
+        fallback_factor (float): Serinin kapsamadığı saatler için faktör (None ise kayıttaki şebeke faktörü)
+        chunk_rows (int): Parça başına satır
+
+    Returns:
+        dict: consumption_mwh, location_based_tco2, market_based_tco2, flat_factor_tco2,
+            weighted_factor, monthly, meters, rows, unmatched_rows, seconds
+    """
+    if isinstance(meter_paths, (str, os.PathLike)):
+        meter_paths = [meter_paths]
+    if fallback_factor is None:
+        fallback_factor = default_registry().get('grid_electricity')
+    green = {str(m) for m in green_meters}
+
+    start = time.perf_counter()
+    acc = Scope2Accumulator()
+
+    for path in meter_paths:
+        options = _read_options(path)
+        header = pd.read_csv(path, nrows=0, **options).columns.tolist()
+        columns = _resolve(header, METER_COLUMN_ALIASES, ('timestamp',))
+        if 'kwh' not in columns and 'mwh' not in columns:
+            raise ValueError(f"{os.path.basename(path)}: kWh veya MWh sütunu bulunamadı")
+        value_column = columns.get('mwh', columns.get('kwh'))
+        to_mwh = 1.0 if 'mwh' in columns else 0.001
+        default_meter = os.path.splitext(os.path.basename(path))[0]
+
+        reader = pd.read_csv(path, usecols=list(columns.values()), chunksize=chunk_rows,
+                             dtype={columns['meter_id']: str} if 'meter_id' in columns else None,
+                             **options)
+        for chunk in reader:
+            timestamps = parse_timestamps(chunk[columns['timestamp']])
+            mwh = pd.to_numeric(chunk[value_column], errors='coerce').to_numpy(dtype=float) * to_mwh
+            valid = timestamps.notna().to_numpy() & ~np.isnan(mwh)
+            timestamps, mwh = timestamps[valid], mwh[valid]
+            if 'meter_id' in columns:
+                meter_ids = chunk[columns['meter_id']].to_numpy()[valid]
+            else:
+                meter_ids = np.full(len(mwh), default_meter, dtype=object)
+
+            factors, matched = grid.lookup(hour_index(timestamps))
+            factors = np.where(matched, factors, fallback_factor)
+            location = mwh * factors
+
+            market_factors = factors if residual_mix_factor is None else residual_mix_factor
+            market = mwh * market_factors
+            if green:
+                market = np.where(pd.Series(meter_ids).astype(str).isin(green).to_numpy(), 0.0, market)
+
+            periods = timestamps.dt.year.to_numpy() * 12 + timestamps.dt.month.to_numpy() - 1
+            acc.add(meter_ids, periods, mwh, location, market, (~matched).sum())
+
+    totals = acc.period_totals.sum(axis=0)
+    total_mwh = float(totals[0])
+    location_total = float(totals[1])
+    return {
+        'consumption_mwh': total_mwh,
+        'location_based_tco2': location_total,
+        'market_based_tco2': float(totals[2]),
+        # Yıllık tek faktörle (serinin düz ortalaması) yapılan hesap: fark saatlik profilin etkisi
+        'flat_factor_tco2': total_mwh * grid.mean,
+        'weighted_factor': location_total / total_mwh if total_mwh > 0 else 0,
+        # Yıl-ay başına (UTC); çok yıllı dosyalarda aynı ay farklı satırlardır
+        'monthly': [
+            {'year': period // 12, 'month': period % 12 + 1, 'mwh': float(row[0]),
+             'location_tco2': float(row[1]), 'market_tco2': float(row[2])}
+            for period, row in sorted(zip(acc.periods, acc.period_totals.tolist()))
+        ],
+        'meters': {
+            meter: {'mwh': float(totals[0]), 'location_tco2': float(totals[1]),
+                    'market_tco2': float(totals[2]), 'green': meter in green}
+            for meter, totals in zip(acc.meters, acc.meter_totals)
+        },
+        'rows': acc.rows,
+        'unmatched_rows': acc.unmatched_rows,
+        'seconds': round(time.perf_counter() - start, 3)
+    }
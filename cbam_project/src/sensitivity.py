@@ -0,0 +1,418 @@
+"""
+Sensitivity Module
+CBAM maliyet maruziyeti için parametre taraması (broadcast NumPy ızgarası),
+duyarlılık sıralaması, tornado grafiği ve what-if için doğrusal katsayılar
+"""
+
+import io
+
+import numpy as np
+
+from .emission_analyzer import EmissionAnalyzer, SCOPE1_ACTIVITIES
+
+
+# Oran parametrelerinin bağlı olduğu aktiviteler (birinci derece yaklaşım):
+# - clinker_ratio: kalsinasyon (kireçtaşı) klinker oranıyla orantılı
+# - scrap_rate: cevher indirgeme karbonu (kok, redüktan) hurda dışı (virgin) payla orantılı
+RATIO_LINKS = {
+    'clinker_ratio': ('limestone_ton',),
+    'scrap_rate': ('coking_coal_ton', 'reductants_ton'),
+}
+
+# cbam_cost/cbam_cost_adjusted/embedded_tco2/intensity: CBAMCalculator (CN varsayılan yoğunluğu);
+# facility_*: tesisin (Scope 1 + Scope 2) / üretim yoğunluğu ile
+OUTPUTS = ('cbam_cost', 'cbam_cost_adjusted', 'embedded_tco2', 'intensity',
+           'facility_cbam_cost', 'facility_embedded_tco2', 'facility_intensity', 'scope1', 'scope2')
+
+# Izgara boyutu sınırı (nokta sayısı); bellek = nokta x çıktı x 8 bayt
+MAX_GRID_POINTS = 20_000_000
+
+
+def _flatten_scope1(scope1_data):
+    """EmissionAnalyzer scope1_data (fuel/mobile/process/thermal_systems) -> aktivite sütunları"""
+    flat = {}
+    for group in ('fuel', 'mobile', 'process', 'thermal_systems'):
+        flat.update((scope1_data or {}).get(group, {}))
+    return flat
+
+
+class SensitivityModel:
+    """
+    CBAMCalculator + EmissionAnalyzer hesabının vektörel hali
+
+    cbam_cost, cbam_cost_adjusted, embedded_tco2 ve intensity CBAMCalculator'ın
+    (/calculate ve tam analizin) CN varsayılan yoğunluğuyla verdiği değerlerdir.
+    Tesis verisi (scope1_data/scope2_data) verilirse scope1/scope2 ve tesisin
+    gerçek yoğunluğuyla facility_* çıktıları da hesaplanır. Tüm parametreler
+    skaler veya birbiriyle broadcast edilebilir dizi olabilir.
+
+    Parametreler:
+        ets_price, quantity, foreign_carbon_price, direct_ei, indirect_ei,
+        output_ton, electricity_mwh, grid_factor, renewable_share (%),
+        clinker_ratio (%), scrap_rate (%),
+        activity.<sütun> (ör. activity.natural_gas_nm3),
+        reduction.<sütun> (% azaltım, ör. reduction.natural_gas_nm3),
+        factor.<faktör> (ör. factor.natural_gas, tCO2/birim)
+    """
+
+    def __init__(self, ets_price, quantity, cn_code=None, scope1_data=None, scope2_data=None,
+                 foreign_carbon_price=0.0, clinker_ratio=95.0, scrap_rate=0.0):
+        """
+        Args:
+            ets_price (float): EU ETS fiyatı (€/tCO2)
+            quantity (float): AB'ye ihraç edilen miktar (ton)
+            cn_code (str): CN varsayılan yoğunluğu için CN kodu (tesis verisi yoksa zorunlu;
+                verilmezse CN çıktıları 0 olur)
+            scope1_data (dict): EmissionAnalyzer.calculate_scope1 girdisi
+            scope2_data (dict): EmissionAnalyzer.calculate_scope2 girdisi
+            foreign_carbon_price (float): Menşe ülkede ödenen karbon fiyatı (€/tCO2)
+            clinker_ratio (float): Mevcut klinker oranı (%)
+            scrap_rate (float): Mevcut hurda oranı (%)
+        """
+        self.facility = bool(scope1_data or scope2_data)
+        base = {
+            'ets_price': float(ets_price),
+            'quantity': float(quantity),
+            'foreign_carbon_price': float(foreign_carbon_price),
+            'clinker_ratio': float(clinker_ratio),
+            'scrap_rate': float(scrap_rate),
+            'direct_ei': 0.0,
+            'indirect_ei': 0.0,
+        }
+
+        if cn_code is not None:
+            from .cbam_calculator import CBAMCalculator
+            data = CBAMCalculator(ets_price).get_data_by_cn(cn_code)
+            if data is None:
+                raise ValueError(f"CN kodu bulunamadı: {cn_code}")
+            base['direct_ei'] = data['direct_ei']
+            base['indirect_ei'] = data['indirect_ei']
+        elif not self.facility:
+            raise ValueError("CN kodu veya tesis emisyon verisi gerekli")
+
+        activity = _flatten_scope1(scope1_data)
+        self.activities = [column for column, _, _ in SCOPE1_ACTIVITIES]
+        self.factor_names = sorted({factor for _, factor, _ in SCOPE1_ACTIVITIES})
+        for column in self.activities:
+            base[f'activity.{column}'] = float(activity.get(column, 0) or 0)
+            base[f'reduction.{column}'] = 0.0
+        for name in self.factor_names:
+            base[f'factor.{name}'] = EmissionAnalyzer.EMISSION_FACTORS[name]
+
+        electricity = (scope2_data or {}).get('electricity', {})
+        green = str(electricity.get('source_type', 'grid')).lower() in ('irec', 'ppa', 'solar')
+        base['electricity_mwh'] = float(electricity.get('electricity_consumption_mwh', 0) or 0)
+        base['grid_factor'] = float(electricity.get('grid_emission_factor_kgco2_kwh', 0) or 0)
+        base['renewable_share'] = 100.0 if green else float(electricity.get('renewable_share_percent', 0) or 0)
+        base['output_ton'] = float((scope1_data or {}).get('steel_output_ton', 0) or quantity or 1)
+
+        self.base = base
+
+    @property
+    def parameters(self):
+        return tuple(self.base)
+
+    def evaluate(self, **params):
+        """
+        Modeli (broadcast) değerlendir
+
+        Args:
+            **params: Taban değerlerin üzerine yazılacak parametreler (skaler veya dizi).
+                'reduction.x' gibi noktalı adlar için evaluate(**{'reduction.x': ...})
+
+        Returns:
+            dict: OUTPUTS anahtarlarıyla broadcast şeklinde diziler (tesis verisi yoksa
+                facility_*, scope1 ve scope2 sıfırdır)
+        """
+        unknown = set(params) - set(self.base)
+        if unknown:
+            raise KeyError(f"Bilinmeyen parametre: {sorted(unknown)}")
+        p = {**self.base, **params}
+        base = self.base
+
+        if self.facility:
+            # Oran parametreleri bağlı aktiviteleri tabana göre ölçekler
+            scale = {}
+            clinker = np.asarray(p['clinker_ratio'], dtype=float)
+            scale_clinker = clinker / base['clinker_ratio'] if base['clinker_ratio'] > 0 else 1.0
+            virgin_base = 100.0 - base['scrap_rate']
+            scale_scrap = (100.0 - np.asarray(p['scrap_rate'], dtype=float)) / virgin_base if virgin_base > 0 else 1.0
+            for column in RATIO_LINKS['clinker_ratio']:
+                scale[column] = scale_clinker
+            for column in RATIO_LINKS['scrap_rate']:
+                scale[column] = scale_scrap
+
+            scope1 = 0.0
+            for column, factor, _ in SCOPE1_ACTIVITIES:
+                amount = p[f'activity.{column}']
+                if np.ndim(amount) == 0 and amount == 0:
+                    continue
+                term = amount * (1 - np.asarray(p[f'reduction.{column}'], dtype=float) / 100) * p[f'factor.{factor}']
+                if column in scale:
+                    term = term * scale[column]
+                scope1 = scope1 + term
+            scope2 = p['electricity_mwh'] * (1 - np.asarray(p['renewable_share'], dtype=float) / 100) * p['grid_factor']
+
+            output = np.asarray(p['output_ton'], dtype=float)
+            facility_intensity = np.divide(scope1 + scope2, output,
+                                           out=np.zeros(np.broadcast(scope1, scope2, output).shape),
+                                           where=output > 0)
+        else:
+            scope1 = np.zeros(())
+            scope2 = np.zeros(())
+            facility_intensity = np.zeros(())
+
+        ets_price = np.asarray(p['ets_price'], dtype=float)
+        # CBAMCalculator.calculate ile aynı: maliyet yabancı fiyat düşülmeden, düzeltilmiş maliyet düşülerek
+        intensity = np.asarray(p['direct_ei'], dtype=float) + p['indirect_ei']
+        embedded = p['quantity'] * intensity
+        cost = embedded * ets_price
+        adjusted = cost - embedded * p['foreign_carbon_price']
+
+        facility_embedded = p['quantity'] * facility_intensity
+        facility_cost = facility_embedded * (ets_price - p['foreign_carbon_price'])
+
+        outputs = {
+            'cbam_cost': cost,
+            'cbam_cost_adjusted': adjusted,
+            'embedded_tco2': embedded,
+            'intensity': intensity,
+            'facility_cbam_cost': facility_cost,
+            'facility_embedded_tco2': facility_embedded,
+            'facility_intensity': facility_intensity,
+            'scope1': scope1,
+            'scope2': scope2
+        }
+        shape = np.broadcast(*outputs.values()).shape
+        return {name: np.broadcast_to(value, shape) for name, value in outputs.items()}
+
+    def sweep(self, ranges):
+        """
+        Tam ızgara taraması: her parametre kendi ekseninde
+
+        Args:
+            ranges (dict): Parametre -> değer dizisi (ör. {'ets_price': np.linspace(60, 140, 81)})
+
+        Returns:
+            SweepResult: Eksenler ve ızgara şeklinde çıktılar
+        """
+        names = list(ranges)
+        values = [np.asarray(ranges[name], dtype=float).ravel() for name in names]
+        points = int(np.prod([len(v) for v in values])) if values else 1
+        if points > MAX_GRID_POINTS:
+            raise ValueError(f"Izgara çok büyük: {points:,} nokta (sınır {MAX_GRID_POINTS:,})")
+
+        # Eksen i için (1, ..., n_i, ..., 1) şekli: açık ızgara, kopya yok
+        params = {}
+        for axis, (name, v) in enumerate(zip(names, values)):
+            shape = [1] * len(names)
+            shape[axis] = len(v)
+            params[name] = v.reshape(shape)
+        return SweepResult(self, names, values, self.evaluate(**params))
+
+    def tornado(self, ranges, output='cbam_cost'):
+        """
+        Tek seferde bir parametre: düşük/yüksek uçta çıktı değişimi
+
+        Args:
+            ranges (dict): Parametre -> (düşük, yüksek) veya değer dizisi (min/max kullanılır)
+            output (str): OUTPUTS'tan biri
+
+        Returns:
+            list: Salınıma göre azalan [{parameter, low, high, low_value, high_value, swing}]
+        """
+        base_value = float(np.asarray(self.evaluate()[output]))
+        names = list(ranges)
+        lows = np.array([np.min(ranges[name]) for name in names], dtype=float)
+        highs = np.array([np.max(ranges[name]) for name in names], dtype=float)
+
+        rows = []
+        for name, low, high in zip(names, lows, highs):
+            values = self.evaluate(**{name: np.array([low, high])})[output]
+            low_value, high_value = float(values[0]), float(values[1])
+            rows.append({
+                'parameter': name,
+                'low': float(low),
+                'high': float(high),
+                'base_value': base_value,
+                'low_value': low_value,
+                'high_value': high_value,
+                'swing': abs(high_value - low_value)
+            })
+        return sorted(rows, key=lambda row: row['swing'], reverse=True)
+
+    def linear_inputs(self):
+        """Modelin doğrusal olduğu girdiler: tesis verisinde aktiviteler + elektrik, yoksa miktar"""
+        if self.facility:
+            return [f'activity.{column}' for column in self.activities] + ['electricity_mwh']
+        return ['quantity']
+
+    def linearize(self, inputs=None, outputs=OUTPUTS):
+        """
+        Diğer parametreler tabanda sabitken çıktıların katsayı vektörü ve sabit terimi
+
+        Tek broadcast çağrısı: sıfır noktası (sabit terim), birim vektörler
+        (katsayılar) ve bir kontrol noktası. Kontrol noktası doğrusal tahminle
+        uyuşmazsa (ör. birbirini çarpan iki girdi) hata verilir.
+
+        Args:
+            inputs (list or dict): Parametre adları veya etiket -> parametre (None ise linear_inputs())
+            outputs (tuple): OUTPUTS alt kümesi
+
+        Returns:
+            LinearModel
+
+        Raises:
+            ValueError: Çıktılar seçilen girdilerde doğrusal değilse
+        """
+        if inputs is None:
+            inputs = self.linear_inputs()
+        if not isinstance(inputs, dict):
+            inputs = {name: name for name in inputs}
+        labels, names = list(inputs), list(inputs.values())
+        unknown = set(names) - set(self.base)
+        if unknown:
+            raise KeyError(f"Bilinmeyen parametre: {sorted(unknown)}")
+
+        k = len(names)
+        base = np.array([self.base[name] for name in names])
+        check = np.where(base != 0, base, 1.0) * 1.5
+        points = np.vstack([np.zeros(k), np.eye(k), check])
+        values = self.evaluate(**{name: points[:, j] for j, name in enumerate(names)})
+
+        y = np.vstack([np.broadcast_to(values[output], (k + 2,)) for output in outputs])
+        intercepts = y[:, 0].copy()
+        coefficients = y[:, 1:k + 1] - intercepts[:, None]
+        predicted = intercepts + coefficients @ check
+        if not np.allclose(predicted, y[:, -1], rtol=1e-9, atol=1e-9):
+            raise ValueError(f"Çıktılar seçilen girdilerde doğrusal değil: {labels}")
+        return LinearModel(labels, base, outputs, coefficients, intercepts)
+
+
+class LinearModel:
+    """
+    y = sabit + katsayılar @ x; istemci tarafı (slider) yeniden hesaplama için
+
+    Attributes:
+        inputs (list): Girdi etiketleri
+        base (ndarray): Analiz edilen girdi değerleri
+        outputs (tuple): Çıktı adları
+        coefficients (ndarray): (len(outputs), len(inputs))
+        intercepts (ndarray): (len(outputs),)
+    """
+
+    def __init__(self, inputs, base, outputs, coefficients, intercepts):
+        self.inputs = list(inputs)
+        self.base = base
+        self.outputs = tuple(outputs)
+        self.coefficients = coefficients
+        self.intercepts = intercepts
+        self._index = {label: i for i, label in enumerate(self.inputs)}
+
+    def evaluate(self, values=None):
+        """
+        Args:
+            values (dict): Etiket -> yeni değer (verilmeyenler tabanda kalır)
+
+        Returns:
+            dict: Çıktı adı -> değer
+
+        Raises:
+            KeyError: Bilinmeyen girdi
+            ValueError: Sonlu olmayan değer
+        """
+        x = self.base.copy()
+        for label, value in (values or {}).items():
+            if label not in self._index:
+                raise KeyError(f"Bilinmeyen girdi: {label}")
+            value = float(value)
+            if not np.isfinite(value):
+                raise ValueError(f"'{label}' sonlu olmalı")
+            x[self._index[label]] = value
+        return dict(zip(self.outputs, (self.intercepts + self.coefficients @ x).tolist()))
+
+    def to_dict(self):
+        """JSON gövdesi: girdiler, taban değerler, çıktı başına katsayılar ve sabit terim"""
+        return {
+            'inputs': self.inputs,
+            'base': dict(zip(self.inputs, self.base.tolist())),
+            'outputs': {
+                output: {'coefficients': dict(zip(self.inputs, row.tolist())), 'intercept': float(intercept)}
+                for output, row, intercept in zip(self.outputs, self.coefficients, self.intercepts)
+            },
+            'values': self.evaluate()
+        }
+
+
+class SweepResult:
+    """Tarama sonucu: eksen adları, eksen değerleri ve ızgara şeklinde çıktılar"""
+
+    def __init__(self, model, names, values, outputs):
+        self.model = model
+        self.names = names
+        self.values = values
+        self.outputs = outputs
+
+    @property
+    def size(self):
+        return int(np.prod([len(v) for v in self.values]))
+
+    def main_effects(self, output='cbam_cost'):
+        """
+        Izgara üzerinden birinci derece (ana etki) duyarlılık indeksleri
+
+        Her eksen için: Var(E[Y | x_i]) / Var(Y); diğer eksenler üzerinde ortalama alınır.
+
+        Returns:
+            list: İndekse göre azalan [(parametre, indeks)]
+        """
+        y = self.outputs[output]
+        total = float(y.var())
+        effects = []
+        for axis, name in enumerate(self.names):
+            others = tuple(a for a in range(y.ndim) if a != axis)
+            conditional = y.mean(axis=others) if others else y
+            effects.append((name, float(conditional.var()) / total if total > 0 else 0.0))
+        return sorted(effects, key=lambda item: item[1], reverse=True)
+
+    def percentiles(self, output='cbam_cost', q=(5, 50, 95)):
+        """Izgaradaki çıktı dağılımının yüzdelikleri"""
+        return dict(zip(q, np.percentile(self.outputs[output], q).tolist()))
+
+
+def tornado_chart(rows, title='CBAM Maliyeti Duyarlılığı', dpi=150):
+    """
+    Tornado grafiği (PNG)
+
+    Args:
+        rows (list): SensitivityModel.tornado çıktısı
+        title (str): Grafik başlığı
+        dpi (int): Çözünürlük
+
+    Returns:
+        bytes: PNG verisi
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    rows = list(reversed(rows))  # en büyük salınım en üstte
+    base = rows[0]['base_value'] if rows else 0
+    labels = [f"{r['parameter']} ({r['low']:g} – {r['high']:g})" for r in rows]
+    positions = np.arange(len(rows))
+
+    fig, ax = plt.subplots(figsize=(8, 0.45 * len(rows) + 1.5), dpi=dpi)
+    ax.barh(positions, [r['low_value'] - base for r in rows], left=base, color='#0B1121', label='Düşük')
+    ax.barh(positions, [r['high_value'] - base for r in rows], left=base, color='#C9FD02', label='Yüksek')
+    ax.axvline(base, color='#666666', linewidth=1)
+    ax.set_yticks(positions)
+    ax.set_yticklabels(labels, fontsize=8)
+    ax.set_xlabel('€')
+    ax.set_title(title)
+    ax.legend(loc='lower right', fontsize=8)
+    fig.tight_layout()
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png')
+    plt.close(fig)
+    return buf.getvalue()
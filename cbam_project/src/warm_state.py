@@ -0,0 +1,322 @@
+"""
+Warm State Module
+Snapshot/restore of expensive process state for fast cold starts
+"""
+
+import os
+import time
+import pickle
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+# Snapshot içeriğinin yapısı değiştiğinde artırılır (eski snapshot yok sayılır)
+SNAPSHOT_VERSION = 2
+
+
+class _CachedResponse:
+    """generate_content yanıtının önbellekten dönen karşılığı (sadece .text)"""
+
+    def __init__(self, text):
+        self.text = text
+
+
+class _CachingModels:
+    def __init__(self, models, state):
+        self._models = models
+        self._state = state
+
+    def generate_content(self, model, contents, **kwargs):
+        if kwargs or not isinstance(contents, str):
+            return self._models.generate_content(model=model, contents=contents, **kwargs)
+        text = self._state.llm_text(
+            model, contents,
+            lambda: self._models.generate_content(model=model, contents=contents).text
+        )
+        return _CachedResponse(text)
+
+
+class CachingClient:
+    """
+    Gemini client sarmalayıcısı: aynı (model, prompt) için LLM çağrısı
+    tekrarlanmaz, sonuç WarmState'ten döner. Predictor/forecaster/rapor
+    sınıfları client.models.generate_content ile değişmeden çalışır.
+    """
+
+    def __init__(self, client, state):
+        self._client = client
+        self.models = _CachingModels(client.models, state)
+
+    def __getattr__(self, name):
+        return getattr(self._client, name)
+
+
+class WarmState:
+    """
+    İlk /full-analysis isteğinin ödediği maliyetleri process içinde tutar
+    ve diske snapshot olarak yazar:
+
+    - ETS geçmişi: CSV (yol, mtime, boyut) ile anahtarlanmış ayrıştırılmış DataFrame
+    - Güncel tahmin: (CSV imzası, model) başına tahmin tablosu + istatistikler (TTL'li)
+    - CN indeksi: /cn-codes sayfasının kod listesi
+    - LLM sonuçları: (model, prompt) hash'i ile LRU önbellek (tahminle aynı TTL)
+
+    Nesne oluşturmak thread başlatmaz ve diske dokunmaz; snapshot yazımı ilk
+    değişiklikte başlayan tek bir yazıcı thread'i üzerinden toplu yapılır.
+    """
+
+    def __init__(self, snapshot_path=None, llm_cache_size=128, forecast_ttl_seconds=24 * 3600,
+                 save_delay_seconds=5.0):
+        """
+        Initialize state
+
+        Args:
+            snapshot_path (str): Snapshot dosyası (None ise diske yazılmaz)
+            llm_cache_size (int): Tutulacak en fazla LLM yanıtı
+            forecast_ttl_seconds (float): Tahminin ve LLM yanıtlarının yeniden kullanılabileceği süre
+            save_delay_seconds (float): Değişiklikten sonra snapshot yazımı için bekleme;
+                bu sürede gelen değişiklikler tek yazıma toplanır
+        """
+        self.snapshot_path = snapshot_path
+        self.llm_cache_size = llm_cache_size
+        self.forecast_ttl_seconds = forecast_ttl_seconds
+        self.save_delay_seconds = save_delay_seconds
+
+        self._history = {}
+        self._forecasts = {}
+        self._cn_index = None
+        self._llm = OrderedDict()
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+        self._dirty = threading.Event()
+        self._writer = None
+
+        self._ready = threading.Event()
+        self._status = {'ready': False, 'restored': False, 'steps': {}}
+
+    # --- Önbellekler ---
+
+    @staticmethod
+    def _csv_signature(csv_path):
+        stat = os.stat(csv_path)
+        return (os.path.abspath(csv_path), stat.st_mtime, stat.st_size)
+
+    def ets_history(self, csv_path, loader):
+        """
+        Ayrıştırılmış ETS geçmişi (CSV değişmediyse önbellekten)
+
+        Args:
+            csv_path (str): ETS fiyat CSV yolu
+            loader (callable): loader(csv_path) -> DataFrame (ör. ETSPricePredictor.load_data)
+        """
+        key = self._csv_signature(csv_path)
+        with self._lock:
+            df = self._history.get(key)
+        if df is None:
+            df = loader(csv_path)
+            with self._lock:
+                # Eski CSV sürümleri tutulmaz
+                self._history = {k: v for k, v in self._history.items() if k[0] != key[0]}
+                self._history[key] = df
+        return df
+
+    def forecast(self, csv_path, model, compute):
+        """
+        Güncel ETS tahmini; TTL dolana veya CSV değişene kadar yeniden hesaplanmaz
+
+        Args:
+            csv_path (str): ETS fiyat CSV yolu
+            model (str): LLM modeli
+            compute (callable): compute() -> (forecast_df, stats)
+
+        Returns:
+            tuple: (forecast_df, stats)
+        """
+        key = (self._csv_signature(csv_path), model)
+        with self._lock:
+            entry = self._forecasts.get(key)
+        if entry and self._fresh(entry['created']):
+            return entry['forecast'], entry['stats']
+
+        forecast_df, stats = compute()
+        if forecast_df is not None and len(forecast_df):
+            with self._lock:
+                self._forecasts = {k: v for k, v in self._forecasts.items() if k[0][0] != key[0][0]}
+                self._forecasts[key] = {'forecast': forecast_df, 'stats': stats, 'created': time.time()}
+            self.save_async()
+        return forecast_df, stats
+
+    def _fresh(self, created):
+        return time.time() - created < self.forecast_ttl_seconds
+
+    def llm_text(self, model, prompt, compute):
+        """(model, prompt) için LLM yanıt metni; yoksa veya TTL dolduysa compute() çağrılır"""
+        key = hashlib.sha256(f'{model}\0{prompt}'.encode('utf-8')).hexdigest()
+        with self._lock:
+            entry = self._llm.get(key)
+            if entry is not None:
+                if self._fresh(entry[1]):
+                    self._llm.move_to_end(key)
+                    return entry[0]
+                del self._llm[key]
+
+        text = compute()
+        if text:
+            with self._lock:
+                self._llm[key] = (text, time.time())
+                while len(self._llm) > self.llm_cache_size:
+                    self._llm.popitem(last=False)
+            self.save_async()
+        return text
+
+    def wrap_client(self, client):
+        """Gemini client'ı LLM önbelleği ile sarmala"""
+        if client is None or isinstance(client, CachingClient):
+            return client
+        return CachingClient(client, self)
+
+    def cn_index(self):
+        """
+        CN kod indeksi
+
+        Returns:
+            dict: {'codes': /cn-codes sayfasının kod listesi}
+        """
+        if self._cn_index is None:
+            from .cn_code_database import CN_CODE_DATABASE
+            codes = [{
+                'code': code,
+                'description': data['description'],
+                'category': data['category'],
+                'total_ei': data['total']
+            } for code, data in CN_CODE_DATABASE.items()]
+            self._cn_index = {'codes': codes}
+        return self._cn_index
+
+    # --- Snapshot ---
+
+    def save(self):
+        """Durumu snapshot dosyasına atomik olarak yaz"""
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            payload = {
+                'version': SNAPSHOT_VERSION,
+                'history': dict(self._history),
+                'forecasts': dict(self._forecasts),
+                'cn_index': self._cn_index,
+                'llm': list(self._llm.items())
+            }
+        with self._save_lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.snapshot_path)), exist_ok=True)
+            tmp_path = f'{self.snapshot_path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(payload, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.snapshot_path)
+
+    def save_async(self):
+        """
+        İsteği bekletmeden snapshot'ı kirli işaretle
+
+        Tek yazıcı thread'i save_delay_seconds bekleyip bu sürede biriken tüm
+        değişiklikleri tek bir save() ile yazar; çağrı başına thread açılmaz.
+        """
+        if not self.snapshot_path:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, daemon=True,
+                                                name='warm-state-writer')
+                self._writer.start()
+        self._dirty.set()
+
+    def _write_loop(self):
+        while True:
+            self._dirty.wait()
+            time.sleep(self.save_delay_seconds)
+            # Temizleme yazımdan önce: yazım sırasında gelen değişiklik bir tur daha tetikler
+            self._dirty.clear()
+            self._safe_save()
+
+    def _safe_save(self):
+        try:
+            self.save()
+        except Exception as e:
+            print(f"⚠️ Warm state kaydedilemedi: {e}")
+
+    def restore(self):
+        """
+        Snapshot'ı yükle
+
+        Returns:
+            bool: Snapshot bulunup yüklendiyse True
+        """
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                payload = pickle.load(f)
+        except Exception as e:
+            print(f"⚠️ Warm state okunamadı: {e}")
+            return False
+        if payload.get('version') != SNAPSHOT_VERSION:
+            return False
+
+        with self._lock:
+            self._history.update(payload.get('history', {}))
+            self._forecasts.update(payload.get('forecasts', {}))
+            self._cn_index = self._cn_index or payload.get('cn_index')
+            for key, (text, created) in payload.get('llm', []):
+                if self._fresh(created):
+                    self._llm.setdefault(key, (text, created))
+        return True
+
+    # --- Isınma ---
+
+    def warmup(self, steps):
+        """
+        Snapshot'ı yükle ve ısınma adımlarını sırayla çalıştır
+
+        Args:
+            steps (list): (isim, callable) çiftleri; hata veren adım diğerlerini durdurmaz
+        """
+        start = time.perf_counter()
+        self._status['restored'] = self.restore()
+        self._status['steps']['restore'] = round(time.perf_counter() - start, 3)
+
+        for name, step in steps:
+            step_start = time.perf_counter()
+            try:
+                step()
+                self._status['steps'][name] = round(time.perf_counter() - step_start, 3)
+            except Exception as e:
+                self._status['steps'][name] = f'hata: {e}'
+                print(f"⚠️ Isınma adımı başarısız ({name}): {e}")
+
+        self._status['seconds'] = round(time.perf_counter() - start, 3)
+        self._status['ready'] = True
+        self._ready.set()
+
+        # Isınmada üretilenler (ör. yeni CSV'nin ayrıştırılması) bir sonraki açılışa kalsın
+        self._safe_save()
+
+    def start_warmup(self, steps):
+        """Isınmayı arka plan thread'inde başlat (ilk istek beklemez)"""
+        thread = threading.Thread(target=self.warmup, args=(steps,), daemon=True, name='warm-state')
+        thread.start()
+        return thread
+
+    def wait_ready(self, timeout=None):
+        return self._ready.wait(timeout)
+
+    def status(self):
+        """Hazır olma durumu ve önbellek dolulukları"""
+        with self._lock:
+            sizes = {
+                'ets_history': len(self._history),
+                'forecasts': len(self._forecasts),
+                'llm_results': len(self._llm),
+                'cn_codes': len(self._cn_index['codes']) if self._cn_index else 0
+            }
+        return {**self._status, 'steps': dict(self._status['steps']), 'cache': sizes}
@@ -0,0 +1,75 @@
+"""
+MAC eğrisi ve bütçe kısıtlı önlem seçimi testleri
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import itertools
+
+import numpy as np
+import pytest
+
+from src.abatement_optimizer import AbatementOptimizer, capital_recovery_factor
+from src.emission_analyzer import EmissionAnalyzer
+
+
+def random_measures(n, seed=5):
+    rng = np.random.default_rng(seed)
+    return [{'id': f'm{i}', 'name': f'Önlem {i}',
+             'investment_eur': float(rng.uniform(1e4, 2e5)),
+             'abatement_tco2': float(rng.uniform(50, 2000)),
+             'annual_savings_eur': float(rng.uniform(0, 2e4)),
+             'group': f'g{i // 3}' if i % 2 else None} for i in range(n)]
+
+
+def brute_force(optimizer, budget):
+    best = 0.0
+    n = len(optimizer.measures)
+    for k in range(n + 1):
+        for combo in itertools.combinations(range(n), k):
+            groups = [optimizer.measures[i]['group'] for i in combo if optimizer.measures[i]['group']]
+            if len(groups) != len(set(groups)) or optimizer.investment[list(combo)].sum() > budget:
+                continue
+            best = max(best, optimizer.net_benefit[list(combo)].sum())
+    return best
+
+
+def test_optimize_matches_brute_force():
+    """DP sonucu kaba kuvvet aramasıyla aynı; bütçe ve grup kısıtı korunur"""
+    optimizer = AbatementOptimizer(random_measures(12), ets_price=85)
+    budget = 350_000
+    result = optimizer.optimize(budget, resolution=50_000)
+
+    assert result['annual_net_benefit_eur'] == pytest.approx(brute_force(optimizer, budget))
+    assert result['investment_eur'] <= budget
+    groups = [m['group'] for m in optimizer.measures if m['id'] in result['selected'] and m['group']]
+    assert len(groups) == len(set(groups))
+
+
+def test_mac_curve_sorted():
+    """MAC eğrisi ucuzdan pahalıya sıralı, kümülatif azaltım artan"""
+    curve = AbatementOptimizer(random_measures(30), ets_price=85).mac_curve()
+    assert np.all(np.diff(curve['mac_eur_per_tco2']) >= 0)
+    assert curve['cumulative_tco2'][-1] == pytest.approx(curve['abatement_tco2'].sum())
+
+
+def test_capital_recovery_factor():
+    """Sıfır faizde yatırım ömre eşit bölünür"""
+    assert capital_recovery_factor(0.0, 10) == pytest.approx(0.1)
+    assert capital_recovery_factor(0.08, 10) == pytest.approx(0.149029, rel=1e-4)
+
+
+def test_analyzer_combined_respects_budget():
+    """Bütçe verilince kombine senaryo yalnız bütçeye sığan önlemleri içerir"""
+    scope1 = {'fuel': {'natural_gas_nm3': 5_000_000}}
+    scope2 = {'electricity': {'electricity_consumption_mwh': 20_000, 'grid_emission_factor_kgco2_kwh': 0.44,
+                              'source_type': 'grid'}}
+    analyzer = EmissionAnalyzer()
+    unlimited = analyzer.get_optimization_scenarios(scope1, scope2, 85)
+    assert set(unlimited['combined']['included_scenarios']) == {'natural_gas_reduction', 'green_energy_transition'}
+
+    limited = analyzer.get_optimization_scenarios(scope1, scope2, 85, investment_budget=120_000)
+    assert limited['combined']['included_scenarios'] == ['green_energy_transition']
+    assert limited['combined']['total_investment_needed_eur'] <= 120_000
@@ -0,0 +1,162 @@
+"""
+Toplu hesaplama (calculate_batch + /api/v1/calculate) testleri
+"""
+
+import sys
+import os
+import json
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+os.environ.setdefault('WARMUP_ON_BOOT', '0')
+
+import pytest
+
+from src.cbam_calculator import CBAMCalculator
+
+
+LINES = [
+    {'cn_code': '7201', 'quantity': 1000},
+    {'cn_code': '9999', 'quantity': 5},
+    {'cn_code': ' 2523 10 00 ', 'quantity': 10, 'foreign_carbon_price': 5},
+]
+
+
+@pytest.fixture
+def client():
+    from web.app import app
+    return app.test_client()
+
+
+def test_batch_matches_scalar():
+    """Vektörel sonuçlar satır satır calculate ile aynıdır"""
+    calc = CBAMCalculator(85.0)
+    result = calc.calculate_batch(['7201', '9999', '2523 10 00'], [1000, 5, 10], [0, 0, 5])
+    assert result['found'].tolist() == [True, False, True]
+
+    expected = calc.calculate(10, 0.83, 0.04, foreign_carbon_price=5)
+    assert result['cbam_cost'][2] == pytest.approx(expected['cbam_cost'])
+    assert result['cbam_cost_adjusted'][2] == pytest.approx(expected['cbam_cost_adjusted'])
+    assert result['total_emission'][1] == 0
+
+
+def test_api_json(client):
+    """JSON yanıtı satır sonuçlarını ve özeti içerir"""
+    response = client.post('/api/v1/calculate', json={'ets_price': 80, 'lines': LINES})
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data['summary']['calculated'] == 2
+    assert data['results'][0]['cbam_cost'] == pytest.approx(2070 * 80)
+    assert 'error' in data['results'][1]
+
+
+def test_api_ndjson(client):
+    """NDJSON yanıtında her satır ayrı JSON, son satır özet"""
+    response = client.post('/api/v1/calculate?format=ndjson', json={'ets_price': 80, 'lines': LINES})
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert response.mimetype == 'application/x-ndjson'
+    assert [r.get('line') for r in rows[:-1]] == [0, 1, 2]
+    assert rows[-1]['summary']['lines'] == 3
+
+
+def test_api_validation(client):
+    """Eksik veya sayısal olmayan alanlar 400 döner"""
+    assert client.post('/api/v1/calculate', json={'lines': LINES}).status_code == 400
+    assert client.post('/api/v1/calculate', json={'ets_price': 80, 'lines': []}).status_code == 400
+    bad = [{'cn_code': '7201', 'quantity': 'çok'}]
+    assert client.post('/api/v1/calculate', json={'ets_price': 80, 'lines': bad}).status_code == 400
+
+
+def test_what_if_coefficients(client):
+    """What-if katsayıları analiz noktasını ve değiştirilen girdiyi doğru vermeli"""
+    form = {'ets_price': 85, 'quantity': 1000, 'cn_code': '7201',
+            'natural_gas_nm3': 850000, 'electricity_consumption_mwh': 4200}
+    data = client.post('/api/v1/what-if', json={**form, 'values': {'natural_gas_nm3': 400000}}).get_json()
+    assert data['mode'] == 'facility'
+
+    assert data['outputs']['cbam_cost']['coefficients']['natural_gas_nm3'] == 0
+    cost = data['outputs']['facility_cbam_cost']
+    base = cost['intercept'] + sum(c * data['base'][name] for name, c in cost['coefficients'].items())
+    assert cost['coefficients']['natural_gas_nm3'] == pytest.approx(1000 / 5000 * 0.000494 * 85)
+    assert data['values']['facility_cbam_cost'] == pytest.approx(base - 450000 * cost['coefficients']['natural_gas_nm3'])
+
+    default = client.post('/api/v1/what-if', data={'ets_price': 80, 'quantity': 1000, 'cn_code': '7201'}).get_json()
+    assert default['outputs']['cbam_cost']['coefficients']['quantity'] == pytest.approx(2.07 * 80)
+    assert client.post('/api/v1/what-if', json={'ets_price': 'x', 'quantity': 1, 'cn_code': '7201'}).status_code == 400
+
+
+def test_what_if_base_matches_calculate_and_analyzer(client):
+    """Tesis modunda taban noktası /calculate (CBAMCalculator) ve EmissionAnalyzer ile aynı"""
+    from src.emission_analyzer import EmissionAnalyzer
+    from src.form_schema import load_form_schema
+
+    form = {'ets_price': 80, 'quantity': 100, 'cn_code': '2601 12 00', 'natural_gas_nm3': 100000,
+            'electricity_consumption_mwh': 500, 'grid_emission_factor_kgco2_kwh': 0.44,
+            'steel_output_ton': 1000}
+    data = client.post('/api/v1/what-if', json={**form, 'values': {}}).get_json()
+    assert data['mode'] == 'facility'
+
+    summary = CBAMCalculator(80).get_summary('2601 12 00', 100)
+    assert data['values']['cbam_cost'] == pytest.approx(summary['cbam_cost']) == pytest.approx(2880)
+    assert data['values']['embedded_tco2'] == pytest.approx(summary['total_emission'])
+    html = client.post('/calculate', data=form).get_data(as_text=True)
+    assert f"€{summary['cbam_cost']:,.2f}" in html
+
+    decoded = load_form_schema().decode_form(form)
+    analyzer = EmissionAnalyzer()
+    scope1 = analyzer.calculate_scope1(decoded.section('scope1'))['total_scope1']
+    scope2 = analyzer.calculate_scope2(decoded.section('scope2'))['total_scope2']
+    assert data['values']['scope1'] == pytest.approx(scope1)
+    assert data['values']['scope2'] == pytest.approx(scope2)
+    assert data['values']['facility_cbam_cost'] == pytest.approx(100 * (scope1 + scope2) / 1000 * 80)
+
+
+def test_api_rejects_invalid_quantities(client):
+    """Negatif/NaN miktar 400; sonlu olmayan sonuç satır hatası, yanıt geçerli JSON"""
+    negative = client.post('/api/v1/calculate', json={'ets_price': 80, 'lines': [{'cn_code': '7201', 'quantity': -5}]})
+    assert negative.status_code == 400
+    assert 'lines[0]' in negative.get_json()['error']
+    nan = client.post('/api/v1/calculate', data='{"ets_price": 80, "lines": [{"cn_code": "7201", "quantity": NaN}]}',
+                      content_type='application/json')
+    assert nan.status_code == 400
+
+    huge = [{'cn_code': '7201', 'quantity': 1e307}, {'cn_code': '7201', 'quantity': 1e308},
+            {'cn_code': '7201', 'quantity': 10}]
+    response = client.post('/api/v1/calculate', json={'ets_price': 80, 'lines': huge})
+    assert response.status_code == 200
+    data = json.loads(response.get_data(as_text=True), parse_constant=lambda token: pytest.fail(token))
+    assert 'error' in data['results'][0] and 'error' in data['results'][1]
+    assert data['summary']['overflow'] == 2
+    assert data['summary']['cbam_cost'] == pytest.approx(10 * 2.07 * 80)
+
+
+def test_what_if_rejects_invalid_values(client):
+    """inf/nan/aşırı büyük/negatif/bilinmeyen değerler 400; geçerli metin değer kabul edilir"""
+    form = {'ets_price': 80, 'quantity': 1000, 'cn_code': '7201'}
+    for raw in ('inf', 'nan', '1e400', -5, 'abc'):
+        response = client.post('/api/v1/what-if', json={**form, 'values': {'quantity': raw}})
+        assert response.status_code == 400, raw
+        assert 'quantity' in response.get_json()['fields']
+    assert client.post('/api/v1/what-if', json={**form, 'values': {'bogus': 1}}).status_code == 400
+
+    response = client.post('/api/v1/what-if', json={**form, 'values': {'quantity': '250'}})
+    assert response.get_json()['values']['cbam_cost'] == pytest.approx(250 * 2.07 * 80)
+
+
+def test_download_pdf_not_modified_skips_cache_and_render(client, monkeypatch):
+    """If-None-Match içerik hash'iyle eşleşirse önbelleğe bakılmadan ve PDF üretilmeden 304"""
+    import web.app as web_app
+    from src.pdf_cache import report_content_hash
+
+    report = {'cbam_summary': {'cbam_cost': 10.0}, 'ets_forecast': [], 'report_text': 'rapor',
+              'company_info': {'company_name': 'ACME'}}
+    web_app.report_store.put('etag-test', report)
+    key = report_content_hash(report['cbam_summary'], report['ets_forecast'], report['report_text'],
+                              render_options=web_app.PDF_RENDER_OPTIONS)
+
+    def fail(*args, **kwargs):
+        raise AssertionError('önbelleğe/üreticiye gidilmemeli')
+
+    monkeypatch.setattr(web_app.pdf_cache, 'get', fail)
+    monkeypatch.setattr('src.pdf_generator.get_pdf_generator', fail)
+    response = client.get('/download-pdf?id=etag-test', headers={'If-None-Match': f'"{key}"'})
+    assert response.status_code == 304
+    assert response.headers['ETag'] == f'"{key}"'
@@ -0,0 +1,70 @@
+"""
+Sertifika alım zamanlaması (vektörel DP) testleri
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import itertools
+import time
+
+import numpy as np
+import pytest
+
+from src.certificate_purchase import CertificatePurchaseOptimizer, obligations_from_calculator
+from src.cost_at_risk import simulate_price_paths
+
+
+OBLIGATIONS = np.full(8, 1000.0)
+
+
+def test_price_trend_drives_timing():
+    """Yükselen fiyatta hepsi başta, düşen fiyatta tam zamanında alınmalı"""
+    optimizer = CertificatePurchaseOptimizer(OBLIGATIONS, discount_rate=0)
+    rising = optimizer.optimize(np.linspace(80, 120, 8))
+    assert rising['schedule'][0] == pytest.approx(8000)
+    assert rising['savings_vs_just_in_time'] > 0
+
+    falling = optimizer.optimize(np.linspace(120, 80, 8))
+    np.testing.assert_allclose(falling['schedule'], falling['just_in_time']['schedule'])
+
+
+def test_constraints_respected():
+    """Kümülatif alım alt/üst bantta, çeyreklik alım sınırın altında kalmalı"""
+    optimizer = CertificatePurchaseOptimizer(OBLIGATIONS, discount_rate=0, max_holding=3000, max_purchase=2500)
+    result = optimizer.optimize(np.linspace(80, 120, 8))
+    assert (result['cumulative'] >= optimizer.lower - 1e-6).all()
+    assert (result['holdings'] <= 3000 + 1e-6).all()
+    assert result['schedule'].max() <= 2500 + 1e-6
+    assert result['cumulative'][-1] == pytest.approx(OBLIGATIONS.sum())
+
+
+def test_matches_brute_force():
+    """Küçük ızgarada tüm uygun planların en ucuzuyla aynı maliyet"""
+    optimizer = CertificatePurchaseOptimizer(OBLIGATIONS[:6], discount_rate=0.1, holding_cost=2,
+                                             start_quarter=2, resolution=6)
+    prices = np.array([[95.0, 80.0, 110.0, 90.0, 105.0, 100.0]])
+    lo, hi = optimizer._lo, optimizer._hi
+
+    best = np.inf
+    for cells in itertools.combinations_with_replacement(range(7), 6):
+        cells = np.array(cells)
+        if (cells >= lo).all() and (cells <= hi).all():
+            schedule = np.diff(cells * optimizer.step, prepend=0.0)
+            best = min(best, optimizer.costs(schedule, prices)[0])
+
+    assert optimizer.optimize(prices)['expected_cost'] == pytest.approx(best)
+
+
+def test_many_paths_under_a_second():
+    """24 çeyrek x 2000 yol; tam öngörü <= açık döngü <= tam zamanında"""
+    obligations = obligations_from_calculator(['7201', '7601'], np.full((2, 24), 500.0))
+    prices = simulate_price_paths(np.linspace(80, 140, 24), paths=2000, seed=4)
+    start = time.perf_counter()
+    result = CertificatePurchaseOptimizer(obligations).optimize(prices)
+    assert time.perf_counter() - start < 2
+
+    assert result['perfect_foresight']['schedules'].shape == (2000, 24)
+    assert result['perfect_foresight']['expected_cost'] <= result['expected_cost']
+    assert result['expected_cost'] <= result['just_in_time']['expected_cost'] * (1 + 1e-3)
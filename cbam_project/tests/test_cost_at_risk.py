@@ -0,0 +1,67 @@
+"""
+Portföy maliyet riski (VaR/CVaR, aşılma olasılığı) testleri
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.cost_at_risk import PortfolioCostAtRisk, simulate_price_paths
+
+
+CN_CODES = ['7201', '2523 10 00', '7601', '9999']
+QUANTITIES = [1000, 250, 40, 10]
+FOREIGN = [0, 12.5, 0, 0]
+
+
+def brute_force(prices, model):
+    """(yol x ürün x çeyrek) tensörüyle doğrudan hesap"""
+    emissions = model.emissions(prices.shape[1])
+    net = np.maximum(prices[:, None, :] - np.asarray(FOREIGN, dtype=float)[None, :, None], 0)
+    return (net * emissions[None]).sum(axis=1)
+
+
+def test_chunked_costs_match_brute_force():
+    """Parça parça hesap, tam tensör hesabıyla aynı dağılımı vermeli"""
+    prices = simulate_price_paths(np.linspace(80, 120, 8), paths=2000, seed=1)
+    model = PortfolioCostAtRisk(CN_CODES, QUANTITIES, FOREIGN)
+    result = model.evaluate(prices, chunk_elements=500)
+    costs = brute_force(prices, model)
+
+    assert result['not_found'] == 1
+    np.testing.assert_allclose(result['quarterly']['mean'], costs.mean(axis=0))
+    np.testing.assert_allclose(result['cumulative']['var'], np.quantile(costs.cumsum(axis=1), 0.95, axis=0))
+    total = costs.sum(axis=1)
+    assert result['total']['cvar'] == pytest.approx(total[total >= np.quantile(total, 0.95)].mean())
+
+
+def test_contributions_sum_to_cvar_and_mean():
+    """Ürün katkıları toplamı CVaR'a ve beklenen maliyete eşit olmalı"""
+    prices = simulate_price_paths(np.full(12, 90.0), paths=5000, seed=3)
+    result = PortfolioCostAtRisk(CN_CODES, QUANTITIES, FOREIGN).evaluate(prices, confidence=0.9)
+    contributions = result['contributions']
+    assert contributions['cvar'].sum() == pytest.approx(result['total']['cvar'])
+    assert contributions['expected'].sum() == pytest.approx(result['total']['mean'])
+    assert contributions['cvar'][3] == 0
+
+
+def test_exceedance_and_quarter_labels():
+    """Aşılma olasılıkları eşikle azalmalı; DataFrame sütunları çeyrek etiketi olmalı"""
+    prices = pd.DataFrame([[80.0, 90.0], [100.0, 110.0], [120.0, 130.0]], columns=['Q1 2026', 'Q2 2026'])
+    result = PortfolioCostAtRisk(['7201'], [1000]).evaluate(prices, thresholds=[0, 2.07e5 * 2, 1e9])
+
+    assert result['quarters'] == ['Q1 2026', 'Q2 2026']
+    assert result['exceedance']['total'].tolist() == pytest.approx([1.0, 2 / 3, 0.0])
+    assert result['exceedance']['quarterly'].shape == (2, 3)
+
+
+def test_simulated_paths_centered_on_forecast():
+    """Senaryo ortalaması tahmin eğrisine yakın olmalı"""
+    forecast = np.linspace(70, 140, 20)
+    prices = simulate_price_paths(forecast, paths=50_000, volatility=0.3, seed=7)
+    assert prices.shape == (50_000, 20)
+    np.testing.assert_allclose(prices.mean(axis=0), forecast, rtol=0.02)
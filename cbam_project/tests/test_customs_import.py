@@ -0,0 +1,101 @@
+"""
+Gümrük dosyası yükleme testleri
+"""
+
+import sys
+import os
+import csv
+import gzip
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+from src.customs_import import CustomsImportManager, parse_number, resolve_columns
+from src.cn_code_database import match_cn_code
+
+
+def test_parse_number_formats():
+    """AB ve ABD sayı biçimleri"""
+    assert parse_number('1.234,5') == 1234.5
+    assert parse_number('1,234.5') == 1234.5
+    assert parse_number('12,5') == 12.5
+    assert parse_number('') == 0.0
+
+
+def test_cn_prefix_matching():
+    """8-10 haneli gümrük kodları en uzun veritabanı önekine eşlenir"""
+    assert match_cn_code('72021120') == '7202 1'
+    assert match_cn_code('7201.10.11') == '7201'
+    assert match_cn_code('99999999') is None
+
+
+def test_resolve_columns_aliases():
+    """Türkçe başlıklar tanınır"""
+    columns = resolve_columns(['Beyanname', 'GTİP', 'Menşe', 'Net Mass (kg)'])
+    assert columns == {'cn_code': 1, 'quantity_kg': 3, 'country': 2}
+
+
+def test_job_end_to_end(tmp_path):
+    """Dosya parça parça işlenir, özet ve satır çıktıları üretilir"""
+    source = tmp_path / 'customs.csv'
+    with open(source, 'w', newline='', encoding='utf-8') as f:
+        f.write('GTIP;Origin;Net Mass (kg)\n')
+        for _ in range(7):
+            f.write('72011011;TR;1000\n')
+        f.write('99999999;CN;500\n')
+        f.write('7201;TR;abc\n')
+
+    manager = CustomsImportManager(str(tmp_path / 'jobs'))
+    job_id, path = manager.create_job('customs.csv', owner='sid-1')
+    os.replace(source, path)
+    manager.start(job_id, path, ets_price=100.0, chunk_size=3).result()
+
+    status = manager.status(job_id, owner='sid-1')
+    assert status['state'] == 'done'
+    assert (status['calculated'], status['unmatched'], status['invalid']) == (7, 1, 1)
+    assert abs(status['totals']['cbam_cost'] - 7 * 2.07 * 100) < 1e-6
+    assert manager.status(job_id, owner='baska') is None
+
+    with open(manager.result_path(job_id, 'summary', owner='sid-1'), encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    assert rows[0]['cn_code'] == '7201' and rows[0]['lines'] == '7'
+
+    with gzip.open(manager.result_path(job_id, 'lines', owner='sid-1'), 'rt', encoding='utf-8') as f:
+        assert len(f.read().splitlines()) == 1 + 9
+
+
+def test_job_rejects_non_finite_and_negative_rows(tmp_path):
+    """nan/inf/negatif miktar ve fiyat geçersiz sayılır; toplamlar ve status.json sonlu kalır"""
+    import json
+
+    manager = CustomsImportManager(str(tmp_path / 'jobs'))
+    job_id, path = manager.create_job('customs.csv')
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        f.write('cn_code,quantity,foreign_carbon_price\n')
+        f.write('7201,10,\n7201,nan,\n7201,-50,\n7201,inf,\n7201,5,-1\n7201,5,1e9\n7201,1e308,\n')
+    manager.start(job_id, path, ets_price=100.0).result()
+
+    with open(os.path.join(manager._job_dir(job_id), 'status.json'), encoding='utf-8') as f:
+        status = json.loads(f.read(), parse_constant=lambda c: pytest.fail(f'JSON içinde {c}'))
+    assert status['state'] == 'done'
+    assert (status['calculated'], status['invalid']) == (1, 6)
+    assert abs(status['totals']['cbam_cost'] - 10 * 2.07 * 100) < 1e-6
+    assert len(status['errors']) == 6
+
+    with open(manager.result_path(job_id, 'summary'), encoding='utf-8-sig') as f:
+        text = f.read()
+    assert 'nan' not in text and 'inf' not in text
+
+
+def test_job_dirs_are_hashed_and_distinct(tmp_path):
+    """Dışarıdan gelen job_id yol olarak kullanılmaz; temizlenince çakışan id'ler ayrı kalır"""
+    work_dir = str(tmp_path / 'jobs')
+    manager = CustomsImportManager(work_dir)
+
+    dirs = {manager._job_dir(job_id) for job_id in ('j1', '../j1', 'j/1', 'j.1')}
+    assert len(dirs) == 4
+    assert all(os.path.dirname(path) == work_dir for path in dirs)
+
+    job_id, _ = manager.create_job('beyan.csv', owner='a')
+    assert manager.status(job_id, owner='a')['job_id'] == job_id
+    assert manager.status('../' + job_id, owner='a') is None
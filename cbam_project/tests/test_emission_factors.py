@@ -0,0 +1,88 @@
+"""
+Sürümlenmiş emisyon faktörü kaydı testleri
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.emission_analyzer import EmissionAnalyzer, BATCH_COLUMNS
+from src.emission_factors import FactorRegistry, FACTOR_VERSIONS, GLOBAL, UnknownCountryWarning
+
+
+REGISTRY = FactorRegistry(FACTOR_VERSIONS + [
+    ('natural_gas', 2025, GLOBAL, 0.0005, 'tCO2/Nm3', 'Test 2025'),
+    ('grid_electricity', 2025, 'TR', 0.40, 'tCO2/MWh', 'Test 2025'),
+], last_year=2027)
+
+
+def test_versions_carry_forward_and_fall_back():
+    """Sürüm bir sonraki yıla kadar geçerli; ülke değeri yoksa GLOBAL"""
+    assert REGISTRY.get('natural_gas', 2024) == 0.000494
+    assert REGISTRY.get('natural_gas', 2026) == 0.0005
+    assert REGISTRY.get('grid_electricity', 2024, 'TR') == 0.44
+    assert REGISTRY.get('grid_electricity', 2027, 'TR') == 0.40
+    with pytest.warns(UnknownCountryWarning, match='DE'):
+        assert REGISTRY.get('grid_electricity', 2027, 'DE') == REGISTRY.get('grid_electricity', 2027)
+    assert REGISTRY.source('grid_electricity', 2026, 'TR') == 'Test 2025'
+
+    with pytest.raises(KeyError):
+        REGISTRY.get('natural_gas', 2020)
+    with pytest.raises(KeyError):
+        REGISTRY.get('unobtainium')
+
+
+def test_resolve_matches_scalar_lookups():
+    """Toplu çözümleme tek tek get() ile aynı"""
+    names = np.array([['natural_gas', 'grid_electricity']])
+    years = np.array([[2023], [2025], [2030]])
+    countries = np.array([['TR'], ['TR'], ['XX']])
+    with pytest.warns(UnknownCountryWarning, match='XX'):
+        values = REGISTRY.resolve(names, years, countries)
+        expected = [[REGISTRY.get(f, int(y), c) for f in names[0]] for y, c in zip(years[:, 0], countries[:, 0])]
+    assert values.shape == (3, 2)
+    assert np.allclose(values, expected)
+
+
+def test_resolve_rejects_invalid_years_and_normalizes_countries():
+    """NaN/kesirli yıl reddedilir; küçük harf kod eşleşir, eksik kod sessizce GLOBAL"""
+    for years in ([2024, np.nan], [2024.5], [np.inf]):
+        with pytest.raises(ValueError):
+            REGISTRY.resolve('grid_electricity', years, 'TR')
+    with pytest.raises(ValueError):
+        REGISTRY.get('grid_electricity', float('nan'), 'TR')
+    assert REGISTRY.resolve('grid_electricity', np.array([2025.0, 2030.0]), 'TR').tolist() == [0.40, 0.40]
+
+    import warnings
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        values = REGISTRY.resolve('grid_electricity', 2024, np.array(['tr', ' cn ', None, np.nan], dtype=object))
+        assert REGISTRY.get('grid_electricity', 2024, 'tr') == 0.44
+    assert values.tolist() == [0.44, 0.58, 0.44, 0.44]
+
+
+def test_analyzer_uses_registry():
+    """alloy_elements sabit çarpan yerine kayıttan gelir; satır yılı/ülkesi faktör seçer"""
+    assert EmissionAnalyzer.EMISSION_FACTORS['alloy_elements'] == 8.0
+
+    df = pd.DataFrame({'natural_gas_nm3': [1e6, 1e6], 'electricity_consumption_mwh': [1000, 1000],
+                       'country': ['TR', 'CN'], 'year': [2023, 2024]})
+    result = EmissionAnalyzer.calculate_batch(df)
+    assert result['fuel'].tolist() == pytest.approx([494.0, 494.0])
+    assert result['scope2'].tolist() == pytest.approx([440.0, 580.0])
+
+
+def test_analyzer_scalar_year_and_country():
+    """Skaler yıl/ülke tüm satırlara uygulanır (satır başına dizi ile aynı sonuç)"""
+    df = pd.DataFrame({'natural_gas_nm3': [1e6, 2e6], 'electricity_consumption_mwh': [1000, 500]})
+    scalar = EmissionAnalyzer.calculate_batch(df, years=2024, countries='CN')
+    per_row = EmissionAnalyzer.calculate_batch(df, years=[2024, 2024], countries=['CN', 'CN'])
+    assert scalar['total'].tolist() == pytest.approx(per_row['total'].tolist())
+    assert scalar['scope2'].tolist() == pytest.approx([580.0, 290.0])
+
+    array = df.reindex(columns=BATCH_COLUMNS, fill_value=0).to_numpy(dtype=float)
+    assert EmissionAnalyzer.calculate_batch(array, years=2023)['fuel'].tolist() == pytest.approx([494.0, 988.0])
@@ -0,0 +1,60 @@
+"""
+Config'den derlenen emisyon planı testleri
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+import pytest
+
+from src.emission_analyzer import EmissionAnalyzer
+from src.emission_factors import default_registry
+from src.emission_plan import get_plan, compile_plans
+from src.form_schema import load_form_schema
+
+
+def decode(sector, route, **values):
+    return load_form_schema().decode_sector(sector, route, values).values
+
+
+def test_every_sector_route_compiles():
+    """Config'deki her (sektör, rota) için plan derlenir"""
+    plans = compile_plans()
+    config = load_form_schema().config
+    expected = {(s, r) for s, data in config['sectors'].items() for r in data['routes']}
+    assert set(plans) == expected
+
+
+def test_steel_plan_matches_factors():
+    """Tek tesis sonucu faktörlerle elle hesaplanan değere eşit"""
+    values = decode('iron_steel', 'eaf', production_quantity=1000, electrode_consumption=2.0,
+                    reductants=10.0, fluxes=0.0, natural_gas=100000, electricity_consumption=5000)
+    result = get_plan('iron_steel', 'eaf').evaluate(values)
+
+    factors = EmissionAnalyzer.EMISSION_FACTORS
+    process = 1000 * (0.002 * factors['electrode'] + 0.010 * factors['coke_injection'])
+    assert result['by_category']['process'] == pytest.approx(process)
+    assert result['by_category']['fuel'] == pytest.approx(100000 * factors['natural_gas'])
+    assert result['scope2'] == pytest.approx(5000 * default_registry().get('grid_electricity'))
+    assert result['intensity'] == pytest.approx(result['total'] / 1000)
+
+
+def test_route_and_green_power():
+    """Rotaya ait olmayan girdi ve yeşil elektrik emisyon üretmez"""
+    values = decode('iron_steel', 'bof', production_quantity=1000, electrode_consumption=2.0,
+                    electricity_consumption=5000, energy_source_type='green_ppa')
+    result = get_plan('iron_steel', 'bof').evaluate(values)
+    assert 'electrode_consumption' not in result['by_input']
+    assert result['scope2'] == 0
+
+
+def test_many_facilities_single_matmul():
+    """Çok tesisli matris çarpımı satır satır hesapla aynı"""
+    plan = get_plan('cement', 'integrated')
+    rows = [decode('cement', 'integrated', production_quantity=q, clinker_ratio=r)
+            for q, r in [(1000, 80), (5000, 60), (0, 95)]]
+    many = plan.evaluate_many(np.vstack([plan.vector(v) for v in rows]))
+    assert many['total'] == pytest.approx([plan.evaluate(v)['total'] for v in rows])
+    assert many['total'][0] == pytest.approx(1000 * 0.8 * 0.525)
@@ -0,0 +1,63 @@
+"""
+Derlenmiş form şeması testleri
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pytest
+
+from src.form_schema import load_form_schema, FormValidationError
+
+
+BASE = {'ets_price': '85', 'quantity': '1000', 'cn_code': '7201'}
+
+
+def test_web_form_types_and_defaults():
+    """Form tek geçişte tiplenir; boş alanlar varsayılanı alır"""
+    form = load_form_schema().decode_form({**BASE, 'electricity_price': '', 'scrap_rate': '30'})
+    assert form['ets_price'] == 85.0 and form['quantity'] == 1000.0
+    assert form['company']['financials']['electricity_price'] == 90.0
+    assert form['company']['scrap_rate'] == 30.0
+    assert 'plant_id' not in form['company']
+
+
+def test_sections_follow_trigger_fields():
+    """Bölüm yalnız tetikleyici alanı gönderildiyse döner"""
+    schema = load_form_schema()
+    form = schema.decode_form({**BASE, 'steel_output_ton': '10000'})
+    assert form.section('scope1') is None
+    assert form.section('scope2') is None
+
+    form = schema.decode_form({**BASE, 'diesel_liter': '1200', 'electricity_consumption_mwh': '500'})
+    assert form.section('scope1')['mobile']['diesel_liter'] == 1200.0
+    assert form.section('scope1')['steel_output_ton'] == 5000.0
+    electricity = form.section('scope2')['electricity']
+    assert electricity['grid_emission_factor_kgco2_kwh'] == 0.44
+    assert electricity['source_type'] == 'grid'
+
+
+def test_invalid_fields_collected():
+    """Tüm hatalar tek istisnada toplanır"""
+    with pytest.raises(FormValidationError) as info:
+        load_form_schema().decode_form({'ets_price': 'abc', 'quantity': '-5',
+                                        'grid_emission_factor': 'nan', 'sector': 'textile'})
+    assert set(info.value.errors) == {'ets_price', 'quantity', 'cn_code',
+                                      'grid_emission_factor', 'sector'}
+
+
+def test_sector_inputs_convert_units_and_routes():
+    """kg/ton girdileri t/t'ye çevrilir, rotaya ait olmayan alanlar atlanır"""
+    schema = load_form_schema()
+    record = schema.decode_sector('iron_steel', 'eaf', {'electrode_consumption': 2.0, 'scrap_ratio': 80})
+    assert record.values['electrode_consumption'] == pytest.approx(0.002)
+    assert record.units['electrode_consumption'] == 't/t'
+    assert record.values['scrap_ratio'] == 80
+    assert record.values['electricity_price'] == 90.0
+
+    record = schema.decode_sector('iron_steel', 'bof', {'electrode_consumption': 2.0})
+    assert 'electrode_consumption' not in record.values
+
+    with pytest.raises(FormValidationError):
+        schema.decode_sector('iron_steel', 'eaf', {'electrode_consumption': 9.0})
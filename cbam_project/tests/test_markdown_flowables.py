@@ -0,0 +1,42 @@
+"""
+Markdown -> PDF flowable derleyici testleri
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.markdown_flowables import compile_markdown
+
+
+REPORT = """### 1. EXECUTIVE SUMMARY
+Toplam risk **€1,234,567** ve *kritik* dönem. A < B
+
+**3. EMİSYON ANALİZİ**
+- Doğalgaz payı **%45**
+1. Serinin trendi yukarı yönlü.
+| Kaynak | Emisyon |
+|---|---|
+| Doğalgaz | 247.00 |
+
+### 3. EMİSYON ANALİZİ (Tekrar)
+"""
+
+
+def test_blocks():
+    """Başlık, madde, tablo ve satır içi biçimler doğru derlenir"""
+    blocks = compile_markdown(REPORT)
+    kinds = [b[0] for b in blocks]
+    assert kinds == ['heading', 'paragraph', 'heading', 'charts', 'bullet',
+                     'paragraph', 'table', 'heading']
+    assert blocks[1][1] == 'Toplam risk <b>€1,234,567</b> ve <i>kritik</i> dönem. A &lt; B'
+    assert blocks[6][1] == (('Kaynak', 'Emisyon'), ('Doğalgaz', '247.00'))
+    assert blocks[6][2] is True
+
+
+def test_charts_once_and_cached():
+    """Grafik yeri bir kez işaretlenir; aynı metin önbellekten döner"""
+    blocks = compile_markdown(REPORT)
+    assert sum(1 for b in blocks if b[0] == 'charts') == 1
+    assert compile_markdown(REPORT) is blocks
+    assert compile_markdown('') == ()
@@ -0,0 +1,46 @@
+"""
+Önceden render edilmiş sayfa önbelleği testleri
+"""
+
+import sys
+import os
+import gzip
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.page_cache import PageCache, data_version
+
+
+def test_renders_once_per_version():
+    """Aynı veri sürümünde render bir kez çağrılır, sürüm değişince yenilenir"""
+    cache = PageCache()
+    calls = []
+
+    def render():
+        calls.append(1)
+        return '<html>' + 'x' * 2000 + '</html>'
+
+    v1 = data_version({'7201': {'total': 2.07}})
+    page = cache.get('index', v1, render)
+    assert cache.get('index', v1, render) is page
+    assert len(calls) == 1
+
+    v2 = data_version({'7201': {'total': 2.10}})
+    assert v1 != v2
+    cache.get('index', v2, render)
+    assert len(calls) == 2
+
+
+def test_gzip_variant_has_own_etag():
+    """gzip gövdesi aynı HTML'e açılır ve farklı ETag taşır"""
+    page = PageCache().get('index', 'v1', lambda: '<p>CBAM</p>' * 200)
+    body, etag = page.variant('gzip')
+    plain, plain_etag = page.variant(None)
+    assert gzip.decompress(body) == plain
+    assert etag != plain_etag and etag.startswith(plain_etag)
+
+
+def test_small_pages_not_compressed():
+    """Küçük sayfalar sıkıştırılmaz"""
+    page = PageCache().get('tiny', 'v1', lambda: '<p>ok</p>')
+    assert page.encodings == {}
+    assert page.variant('gzip')[0] == b'<p>ok</p>'
@@ -0,0 +1,71 @@
+"""
+Toplu PDF üretimi (render_batch) testleri
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import zipfile
+
+from src.pdf_batch import is_renderable, render_batch, report_filename
+
+
+def full_report(report_id, company='ACME'):
+    return {
+        'report_id': report_id,
+        'type': 'full_analysis',
+        'cbam_summary': {'cbam_cost': 1000.0, 'quantity_tonnes': 10, 'total_emission': 20.7,
+                         'product': 'Pig iron', 'company_name': company},
+        'ets_forecast': [{'Quarter': 'Q1 2026', 'ETS_Price': 80.0}],
+        'report_text': '### Özet\nMetin.',
+    }
+
+
+REPORTS = [
+    full_report('full0001'),
+    {'report_id': 'simple01', 'type': 'simple_calculation', 'summary': {'cbam_cost': 1.0}},
+    {**full_report('broken01'), 'ets_forecast': 42},
+    full_report('full0002', company='Beta'),
+]
+
+
+def test_only_full_analysis_items_render():
+    """Hızlı hesaplama ve cbam_summary'siz kayıtlar atlanır"""
+    assert is_renderable(REPORTS[0])
+    assert not is_renderable(REPORTS[1])
+    assert not is_renderable({'type': 'full_analysis'})
+    assert is_renderable({'cbam_summary': {'cbam_cost': 1}})
+
+
+def test_failed_report_does_not_abort_zip(tmp_path):
+    """Hatalı rapor kaydedilir, diğerleri ZIP'e yazılır"""
+    output = str(tmp_path / 'pack.zip')
+    result = render_batch(REPORTS, output, workers=2)
+
+    assert result['skipped'] == 1
+    assert [name for name, _ in result['failed']] == ['CBAM_Raporu_ACME_broken01.pdf']
+    with zipfile.ZipFile(output) as archive:
+        names = sorted(archive.namelist())
+        assert names == sorted(result['written'])
+        assert names == ['CBAM_Raporu_ACME_full0001.pdf', 'CBAM_Raporu_Beta_full0002.pdf']
+        assert archive.read(names[0]).startswith(b'%PDF')
+
+
+def test_directory_output(tmp_path):
+    """Dizin çıktısında her PDF ayrı dosya"""
+    output = tmp_path / 'pdfs'
+    result = render_batch([REPORTS[0], REPORTS[3]], str(output), workers=1)
+    assert sorted(os.listdir(output)) == sorted(result['written'])
+    assert (output / 'CBAM_Raporu_Beta_full0002.pdf').read_bytes().startswith(b'%PDF')
+    assert result['failed'] == []
+
+
+def test_filenames_do_not_collide_on_shared_prefix(tmp_path):
+    """İlk 8 karakteri aynı iki rapor kimliği ayrı dosyalara yazılır"""
+    reports = [full_report('2026abcd-0001'), full_report('2026abcd-0002')]
+    assert report_filename(reports[0]) != report_filename(reports[1])
+
+    result = render_batch(reports, str(tmp_path / 'pdfs'), workers=1)
+    assert len(result['written']) == 2
+    assert len(os.listdir(tmp_path / 'pdfs')) == 2
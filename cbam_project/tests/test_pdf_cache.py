@@ -0,0 +1,50 @@
+"""
+PDF önbellek testleri
+"""
+
+import sys
+import os
+import time
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pandas as pd
+
+from src.pdf_cache import PDFCache, report_content_hash
+
+
+def test_hash_depends_on_content():
+    """Aynı içerik aynı hash'i, farklı metin farklı hash'i verir"""
+    df = pd.DataFrame({'Quarter': ['Q1 2025'], 'ETS_Price': [80.0]})
+    h1 = report_content_hash({'cbam_cost': 10.0}, df, 'rapor')
+    h2 = report_content_hash({'cbam_cost': 10.0}, df.copy(), 'rapor')
+    h3 = report_content_hash({'cbam_cost': 10.0}, df, 'rapor v2')
+    assert h1 == h2
+    assert h1 != h3
+
+
+def test_size_based_eviction(tmp_path):
+    """Boyut sınırı aşılınca en eski kullanılan PDF silinir"""
+    cache = PDFCache(str(tmp_path), max_bytes=2500)
+    cache.put('a', b'x' * 1000)
+    cache.put('b', b'y' * 1000)
+    os.utime(cache.path_for('a'), (time.time() - 100, time.time() - 100))
+    os.utime(cache.path_for('b'), (time.time() - 50, time.time() - 50))
+    cache.get('a').close()
+    cache.put('c', b'z' * 1000)
+
+    assert cache.get('b') is None
+    with cache.get('a') as f:
+        assert f.read() == b'x' * 1000
+    with cache.get('c') as f:
+        assert f.read() == b'z' * 1000
+
+
+def test_eviction_race_is_a_miss_or_readable(tmp_path):
+    """Silinen dosya ıska sayılır; açılmış dosya silinse de okunabilir"""
+    cache = PDFCache(str(tmp_path), max_bytes=10_000)
+    cache.put('a', b'x' * 1000)
+    f = cache.get('a')
+    os.remove(cache.path_for('a'))
+    with f:
+        assert f.read() == b'x' * 1000
+    assert cache.get('a') is None
@@ -0,0 +1,72 @@
+"""
+PDF üretici boyut/bütçe testleri
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pandas as pd
+
+from src.pdf_generator import CBAMPDFGenerator, MIN_IMAGE_DPI, logo_pdf_bytes
+
+
+SUMMARY = {'cbam_cost': 12345.0, 'quantity_tonnes': 100, 'total_emission': 207.0,
+           'product': 'Pig iron', 'company_name': 'ACME'}
+FORECAST = pd.DataFrame({'Quarter': [f'Q{q} 2026' for q in range(1, 5)],
+                         'ETS_Price': [80.0, 82.5, 85.0, 84.0]})
+ANALYSIS = {'scope1': {'total_scope1': 120.0}, 'scope2': {'total_scope2': 45.0}}
+TEXT = "### 3. EMİSYON ANALİZİ\nDetay **metin**.\n"
+
+
+def test_stats_report():
+    """Üretilen her belge için boyut, süre ve sayfa bilgisi döner"""
+    generator = CBAMPDFGenerator()
+    buffer, stats = generator.generate_report_with_stats(SUMMARY, FORECAST, TEXT, ANALYSIS)
+    data = buffer.getvalue()
+    assert data.startswith(b'%PDF')
+    assert stats['bytes'] == len(data)
+    assert stats['pages'] >= 2
+    assert stats['within_budget']
+    assert len(stats['attempts']) == 1
+
+
+def test_budget_downscales_images():
+    """Bütçe aşılınca JPEG'e geçilir ve DPI düşürülür"""
+    generator = CBAMPDFGenerator(chart_backend='matplotlib', image_dpi=150, max_bytes=1024)
+    _, stats = generator.generate_report_with_stats(SUMMARY, FORECAST, TEXT, ANALYSIS)
+    assert not stats['within_budget']
+    assert stats['image_format'] == 'jpeg'
+    assert stats['image_dpi'] == MIN_IMAGE_DPI
+    assert stats['attempts'][0]['bytes'] > stats['attempts'][-1]['bytes']
+
+
+def test_vector_budget_estimates_logo_instead_of_rerendering():
+    """Vektör modda ara ayarlar üretilmez; logo farkıyla tahmin edilen ayar bir kez üretilir"""
+    full, _ = CBAMPDFGenerator().generate_report_with_stats(SUMMARY, FORECAST, TEXT, ANALYSIS)
+    size = len(full.getvalue())
+
+    _, stats = CBAMPDFGenerator(max_bytes=1024).generate_report_with_stats(SUMMARY, FORECAST, TEXT, ANALYSIS)
+    assert len(stats['attempts']) == 2
+    assert (stats['image_format'], stats['image_dpi']) == ('jpeg', MIN_IMAGE_DPI)
+
+    budget = size - (logo_pdf_bytes(150, 'flate') - logo_pdf_bytes(150, 'jpeg')) + 100
+    _, stats = CBAMPDFGenerator(max_bytes=budget).generate_report_with_stats(SUMMARY, FORECAST, TEXT, ANALYSIS)
+    assert len(stats['attempts']) == 2
+    assert (stats['image_format'], stats['image_dpi']) == ('jpeg', 150)
+    assert stats['within_budget']
+
+
+def test_spooled_output_rolls_to_disk():
+    """Spool sınırını aşan çıktı geçici dosyaya yazılır, içerik aynıdır"""
+    generator = CBAMPDFGenerator()
+    in_memory = generator.generate_report(SUMMARY, FORECAST, TEXT * 20, ANALYSIS).getvalue()
+    spooled, stats = generator.generate_report_spooled(SUMMARY, FORECAST, TEXT * 20, ANALYSIS,
+                                                       spool_max_bytes=4096)
+    try:
+        assert spooled._rolled
+        assert stats['bytes'] > 4096
+        assert spooled.read().startswith(b'%PDF')
+        assert abs(stats['bytes'] - len(in_memory)) < 200  # sadece zaman damgası/ID farkı
+    finally:
+        spooled.close()
@@ -0,0 +1,62 @@
+"""
+Rapor sıkıştırma testleri
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from decimal import Decimal
+
+from src.report_codec import (
+    encode_report_item, LazyReport, build_projection, compress_attribute, decompress_attribute
+)
+
+
+def test_roundtrip():
+    """Sıkıştırılan alan aynen geri açılmalı"""
+    value = [{'Quarter': 'Q1 2025', 'Forecasted Value': 81.5}] * 50
+    assert decompress_attribute(compress_attribute(value)) == value
+
+
+def test_encode_and_lazy_read():
+    """Büyük alanlar sıkıştırılır, küçük alanlar olduğu gibi kalır"""
+    item = {
+        'report_id': 'abc',
+        'report_text': 'ÇELİK RAPORU ' * 500,
+        'ets_forecast': [{'Quarter': 'Q1', 'Forecasted Value': Decimal('80.5')}],
+        'cbam_summary': {'cbam_cost': 1000.0}
+    }
+    encoded = encode_report_item(item)
+    assert isinstance(encoded['report_text'], bytes)
+    assert len(encoded['report_text']) < len(item['report_text'])
+    assert encoded['compressed_attributes'] == ['report_text']
+    assert encoded['ets_forecast'] is item['ets_forecast']
+
+    report = LazyReport(encoded)
+    assert report.get('report_text') == item['report_text']
+    assert report['cbam_summary']['cbam_cost'] == 1000.0
+    assert report.materialize()['report_text'] == item['report_text']
+
+
+def test_lazy_report_views_are_decoded():
+    """items/values/dict()/json.dumps sıkıştırılmış byte yerine açılmış değeri görür"""
+    import json
+
+    item = {'report_id': 'abc', 'report_text': 'ÇELİK RAPORU ' * 500}
+    encoded = encode_report_item(item)
+
+    assert dict(LazyReport(encoded))['report_text'] == item['report_text']
+    assert {**LazyReport(encoded)}['report_text'] == item['report_text']
+    assert dict(LazyReport(encoded).items())['report_text'] == item['report_text']
+    assert item['report_text'] in LazyReport(encoded).values()
+    assert LazyReport(encoded).copy()['report_text'] == item['report_text']
+    assert LazyReport(encoded).pop('report_text') == item['report_text']
+    assert json.loads(json.dumps(LazyReport(encoded), ensure_ascii=False))['report_text'] == item['report_text']
+
+
+def test_projection_uses_placeholders():
+    """Rezerve kelimeler (type) placeholder ile geçmeli"""
+    params = build_projection(['report_id', 'type'])
+    assert params['ProjectionExpression'] == '#a0, #a1'
+    assert params['ExpressionAttributeNames']['#a1'] == 'type'
@@ -0,0 +1,109 @@
+"""
+Paralel rapor export testleri
+"""
+
+import sys
+import os
+import json
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from decimal import Decimal
+
+import pytest
+
+from src.report_codec import encode_report_item
+from src.report_exporter import ReportExporter, recompute_cbam_cost
+
+
+class FakeTable:
+    """Segment/sayfa destekli sahte DynamoDB tablosu"""
+
+    def __init__(self, items, fail_after=None):
+        self.items = items
+        self.fail_after = fail_after
+        self.calls = 0
+
+    def scan(self, Segment, TotalSegments, Limit, ExclusiveStartKey=None):
+        self.calls += 1
+        if self.fail_after is not None and self.calls > self.fail_after:
+            raise RuntimeError("bağlantı koptu")
+        own = [i for n, i in enumerate(self.items) if n % TotalSegments == Segment]
+        start = int(ExclusiveStartKey['report_id'].split('-')[1]) + 1 if ExclusiveStartKey else -1
+        own = [i for i in own if int(i['report_id'].split('-')[1]) >= start]
+        page = own[:Limit]
+        response = {'Items': page}
+        if len(own) > Limit:
+            response['LastEvaluatedKey'] = {'report_id': page[-1]['report_id']}
+        return response
+
+
+def make_items(n):
+    return [encode_report_item({
+        'report_id': f'r-{i:04d}',
+        'report_text': 'x' * 2000,
+        'cbam_summary': {'quantity_tonnes': Decimal('10'), 'direct_ei': Decimal('1.5'),
+                         'indirect_ei': Decimal('0.5'), 'cbam_cost': Decimal('1')}
+    }) for i in range(n)]
+
+
+def read_ids(output_dir):
+    ids = []
+    for name in sorted(os.listdir(output_dir)):
+        if name.endswith('.jsonl'):
+            with open(os.path.join(output_dir, name), encoding='utf-8') as f:
+                ids += [json.loads(line)['report_id'] for line in f]
+    return ids
+
+
+def test_parallel_export_with_backfill(tmp_path):
+    """Tüm segmentler export edilir, rapor alanları açılır ve maliyet yeniden hesaplanır"""
+    items = make_items(25)
+    exporter = ReportExporter(lambda: FakeTable(items), total_segments=3, page_size=4)
+    result = exporter.export(str(tmp_path), transform=recompute_cbam_cost(100.0))
+
+    assert result['total_items'] == 25
+    assert sorted(read_ids(str(tmp_path))) == [i['report_id'] for i in items]
+
+    with open(tmp_path / 'part-000.jsonl', encoding='utf-8') as f:
+        first = json.loads(f.readline())
+    assert first['report_text'] == 'x' * 2000
+    assert first['cbam_summary']['cbam_cost'] == 10 * 2.0 * 100.0
+
+
+def test_resume_from_checkpoint(tmp_path):
+    """Yarıda kalan export tekrar çalıştırıldığında çift kayıt olmadan tamamlanır"""
+    items = make_items(30)
+    broken = ReportExporter(lambda: FakeTable(items, fail_after=2), total_segments=2, page_size=5)
+    try:
+        broken.export(str(tmp_path))
+    except RuntimeError:
+        pass
+
+    exporter = ReportExporter(lambda: FakeTable(items), total_segments=2, page_size=5)
+    result = exporter.export(str(tmp_path))
+
+    ids = read_ids(str(tmp_path))
+    assert len(ids) == len(set(ids)) == 30
+    assert all(c['done'] for c in result['segments'])
+
+
+def test_resume_refuses_different_segment_count(tmp_path):
+    """Farklı segment sayısıyla devam reddedilir; hiçbir dosya değişmez"""
+    items = make_items(30)
+    broken = ReportExporter(lambda: FakeTable(items, fail_after=2), total_segments=2, page_size=5)
+    try:
+        broken.export(str(tmp_path))
+    except RuntimeError:
+        pass
+    with open(tmp_path / 'checkpoints' / 'segment-000.json', encoding='utf-8') as f:
+        assert json.load(f)['total_segments'] == 2
+    before = read_ids(str(tmp_path))
+
+    with pytest.raises(ValueError, match='segment'):
+        ReportExporter(lambda: FakeTable(items), total_segments=3, page_size=5).export(str(tmp_path))
+    with pytest.raises(ValueError):
+        ReportExporter(lambda: FakeTable(items), total_segments=3).load_checkpoint(str(tmp_path), 0)
+    assert read_ids(str(tmp_path)) == before
+
+    result = ReportExporter(lambda: FakeTable(items), total_segments=2, page_size=5).export(str(tmp_path))
+    assert result['total_items'] == 30
@@ -0,0 +1,73 @@
+"""
+Rapor deposu testleri
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from src.report_store import ReportStore
+
+
+def test_lru_limits():
+    """Kayıt sayısı ve byte sınırı aşılınca en eski rapor çıkarılır"""
+    store = ReportStore(max_items=2)
+    store.put('a', {'report_text': 'A'})
+    store.put('b', {'report_text': 'B'})
+    store.get('a')
+    store.put('c', {'report_text': 'C'})
+    assert store.get('b') is None
+    assert store.get('a') == {'report_text': 'A'}
+
+    small = ReportStore(max_bytes=5000)
+    small.put('big1', {'report_text': 'x' * 3000})
+    small.put('big2', {'report_text': 'y' * 3000})
+    assert small.get('big1') is None
+    assert small.stats()['bytes'] <= 5000
+
+
+def test_report_larger_than_budget_is_kept():
+    """Tek başına max_bytes'ı aşan yeni rapor çıkarılmaz; sonraki eklemede çıkarılır"""
+    store = ReportStore(max_bytes=1000)
+    store.put('small', {'report_text': 'a'})
+    store.put('huge', {'report_text': 'x' * 5000}, owner='s')
+    assert store.get('huge', owner='s') == {'report_text': 'x' * 5000}
+    assert store.get('small') is None
+    assert store.stats()['items'] == 1
+
+    store.put('next', {'report_text': 'b'})
+    assert store.get('huge', owner='s') is None
+    assert store.get('next') == {'report_text': 'b'}
+
+
+def test_owner_isolation():
+    """Başka oturuma ait rapor döndürülmez"""
+    store = ReportStore()
+    store.put('r1', {'report_text': 'gizli'}, owner='session-1')
+    assert store.get('r1', owner='session-2') is None
+    assert store.get('r1', owner='session-1') == {'report_text': 'gizli'}
+
+
+def test_disk_tier_shared_between_workers(tmp_path):
+    """Bir worker'ın yazdığı rapor diğer worker tarafından diskten okunur"""
+    worker1 = ReportStore(disk_dir=str(tmp_path))
+    worker2 = ReportStore(disk_dir=str(tmp_path))
+    worker1.put('r1', {'report_text': 'rapor'}, owner='s')
+    assert worker2.get('r1', owner='s') == {'report_text': 'rapor'}
+    assert worker2.get('../r1', owner='s') is None
+    assert worker2.get('yok', owner='s') is None
+
+
+def test_disk_ids_do_not_collide(tmp_path):
+    """Karakterleri farklı id'ler aynı dosyayı paylaşmaz; dosya dizin dışına çıkmaz"""
+    store = ReportStore(disk_dir=str(tmp_path))
+    store.put('a-b', {'report_text': 'A'}, owner='s')
+    store.put('ab', {'report_text': 'B'}, owner='s')
+    store.put('../r1', {'report_text': 'C'}, owner='s')
+
+    reader = ReportStore(disk_dir=str(tmp_path))
+    assert reader.get('a-b', owner='s') == {'report_text': 'A'}
+    assert reader.get('ab', owner='s') == {'report_text': 'B'}
+    assert reader.get('../r1', owner='s') == {'report_text': 'C'}
+    assert reader.get('r1', owner='s') is None
+    assert len(os.listdir(tmp_path)) == 3
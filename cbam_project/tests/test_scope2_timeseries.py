@@ -0,0 +1,92 @@
+"""
+Saatlik Scope 2 (sayaç verisi x saatlik şebeke faktörü) testleri
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.emission_analyzer import EmissionAnalyzer
+from src.scope2_timeseries import GridFactorSeries, calculate_scope2_timeseries
+
+
+def write_grid(path):
+    hours = pd.date_range('2025-01-01', periods=48, freq='h')
+    factors = np.where(hours.hour < 12, 0.2, 0.6)
+    pd.DataFrame({'timestamp': hours, 'kgco2_kwh': factors}).to_csv(path, index=False)
+    return path
+
+
+def write_meters(path):
+    ts = pd.date_range('2025-01-01', periods=4 * 48, freq='15min')
+    df = pd.concat([pd.DataFrame({'timestamp': ts, 'meter_id': meter, 'kwh': 250.0})
+                    for meter in ('A', 'B')])
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_hourly_alignment_and_market_based(tmp_path):
+    """Her aralık kendi saatinin faktörünü alır; yeşil sayaç market-based'de sıfır"""
+    grid = GridFactorSeries.from_csv(write_grid(tmp_path / 'grid.csv'))
+    write_meters(tmp_path / 'meters.csv')
+
+    result = calculate_scope2_timeseries([str(tmp_path / 'meters.csv')], grid,
+                                         green_meters=['B'], chunk_rows=50)
+    # Sayaç başına 48 saat x 1 MWh; yarısı 0.2, yarısı 0.6
+    assert result['rows'] == 2 * 4 * 48
+    assert result['consumption_mwh'] == pytest.approx(96.0)
+    assert result['location_based_tco2'] == pytest.approx(96 * 0.4)
+    assert result['market_based_tco2'] == pytest.approx(48 * 0.4)
+    assert result['meters']['B']['market_tco2'] == 0
+    assert result['unmatched_rows'] == 0
+
+
+def test_eu_format_and_fallback_factor(tmp_path):
+    """';' + ondalık virgül okunur; serinin öncesindeki saatler yedek faktörü alır"""
+    grid = GridFactorSeries(pd.date_range('2025-01-01 01:00', periods=23, freq='h'), [0.5] * 23)
+    path = tmp_path / 'sayac.csv'
+    path.write_text('Tarih;Tüketim kWh\n2025-01-01 00:30:00;1000,0\n2025-01-01 05:00:00;2000,0\n',
+                    encoding='utf-8')
+
+    result = calculate_scope2_timeseries([str(path)], grid, fallback_factor=0.1)
+    assert result['unmatched_rows'] == 1
+    assert result['location_based_tco2'] == pytest.approx(1.0 * 0.1 + 2.0 * 0.5)
+    assert list(result['meters']) == ['sayac']
+
+
+def test_analyzer_timeseries_mode(tmp_path):
+    """EmissionAnalyzer saatlik modda calculate_scope2 ile aynı anahtarları doldurur"""
+    write_grid(tmp_path / 'grid.csv')
+    write_meters(tmp_path / 'meters.csv')
+
+    analyzer = EmissionAnalyzer()
+    scope2 = analyzer.calculate_scope2_timeseries([str(tmp_path / 'meters.csv')], str(tmp_path / 'grid.csv'),
+                                                  residual_mix_factor=0.5)
+    assert scope2['total_scope2'] == pytest.approx(96 * 0.5)
+    assert scope2['grid_emission_factor'] == pytest.approx(0.4)
+    assert analyzer.get_summary()['total_emissions'] == pytest.approx(scope2['total_scope2'])
+
+
+def test_dst_offsets_years_and_series_end(tmp_path):
+    """Yaz saati geçişindeki karışık ofsetler UTC'ye çevrilir; aylar yıl bazında ayrılır;
+    serinin sonundan sonraki saatler eşleşmez"""
+    hours = pd.date_range('2023-01-01', '2024-03-31 23:00', freq='h')
+    grid = GridFactorSeries(hours, np.full(len(hours), 0.5))
+    path = tmp_path / 'export.csv'
+    path.write_text('timestamp,kwh\n'
+                    '2023-01-15T10:00:00+01:00,1000\n'
+                    '2023-03-26T01:45:00+01:00,1000\n'
+                    '2023-03-26T03:00:00+02:00,1000\n'
+                    '2024-01-15T10:00:00+01:00,1000\n'
+                    '2024-06-01T10:00:00+02:00,1000\n', encoding='utf-8')
+
+    result = calculate_scope2_timeseries([str(path)], grid, fallback_factor=0.1)
+    assert result['rows'] == 5
+    assert result['unmatched_rows'] == 1
+    assert result['location_based_tco2'] == pytest.approx(4 * 0.5 + 0.1)
+    periods = [(m['year'], m['month'], m['mwh']) for m in result['monthly']]
+    assert periods == [(2023, 1, 1.0), (2023, 3, 2.0), (2024, 1, 1.0), (2024, 6, 1.0)]
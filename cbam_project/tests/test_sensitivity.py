@@ -0,0 +1,104 @@
+"""
+Parametre taraması ve tornado duyarlılık testleri
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import time
+
+import numpy as np
+import pytest
+
+from src.cbam_calculator import CBAMCalculator
+from src.emission_analyzer import EmissionAnalyzer
+from src.sensitivity import SensitivityModel, tornado_chart
+
+
+SCOPE1 = {
+    'fuel': {'coking_coal_ton': 1200, 'natural_gas_nm3': 850000},
+    'process': {'limestone_ton': 300, 'reductants_ton': 200},
+    'steel_output_ton': 5000
+}
+SCOPE2 = {'electricity': {'electricity_consumption_mwh': 4200, 'grid_emission_factor_kgco2_kwh': 0.62}}
+
+
+def test_base_point_matches_calculators():
+    """Taban noktası CBAMCalculator ve EmissionAnalyzer ile aynı sonucu vermeli"""
+    model = SensitivityModel(85, 1000, cn_code='7201')
+    assert float(model.evaluate()['cbam_cost']) == pytest.approx(
+        CBAMCalculator(85).get_summary('7201', 1000)['cbam_cost'])
+
+    analyzer = EmissionAnalyzer()
+    facility = SensitivityModel(85, 1000, cn_code='7201', scope1_data=SCOPE1, scope2_data=SCOPE2)
+    result = facility.evaluate()
+    scope1 = analyzer.calculate_scope1(SCOPE1)['total_scope1']
+    scope2 = analyzer.calculate_scope2(SCOPE2)['total_scope2']
+    assert float(result['scope1']) == pytest.approx(scope1)
+    assert float(result['scope2']) == pytest.approx(scope2)
+    # Tesis verisi olsa da cbam_cost CBAMCalculator ile aynı; tesis yoğunluğu ayrı çıktı
+    assert float(result['cbam_cost']) == pytest.approx(CBAMCalculator(85).get_summary('7201', 1000)['cbam_cost'])
+    assert float(result['facility_cbam_cost']) == pytest.approx(1000 * (scope1 + scope2) / 5000 * 85)
+
+
+def test_sweep_million_points():
+    """10^6 noktalı ızgara tek broadcast ile hesaplanmalı"""
+    model = SensitivityModel(85, 1000, scope1_data=SCOPE1, scope2_data=SCOPE2, scrap_rate=30)
+    ranges = {
+        'ets_price': np.linspace(60, 140, 40),
+        'quantity': np.linspace(500, 1500, 25),
+        'scrap_rate': np.linspace(0, 90, 10),
+        'reduction.natural_gas_nm3': np.linspace(0, 50, 10),
+        'grid_factor': np.linspace(0.3, 0.7, 10),
+    }
+    start = time.perf_counter()
+    sweep = model.sweep(ranges)
+    effects = sweep.main_effects('facility_cbam_cost')
+    elapsed = time.perf_counter() - start
+
+    assert sweep.size == 1_000_000
+    assert sweep.outputs['facility_cbam_cost'].shape == (40, 25, 10, 10, 10)
+    assert elapsed < 5
+    # Tek nokta kontrolü
+    point = sweep.outputs['facility_cbam_cost'][3, 7, 2, 4, 5]
+    expected = model.evaluate(**{name: values[i] for (name, values), i in
+                                 zip(ranges.items(), (3, 7, 2, 4, 5))})['facility_cbam_cost']
+    assert point == pytest.approx(float(expected))
+    # Çarpımsal model: etkileşimler nedeniyle ana etkilerin toplamı <= 1
+    assert 0.5 < sum(share for _, share in effects) <= 1.0
+    assert effects[-1][0] == 'reduction.natural_gas_nm3'
+
+
+def test_tornado_ordering_and_chart():
+    """Tornado salınıma göre azalan sırada olmalı ve PNG üretilmeli"""
+    model = SensitivityModel(85, 1000, scope1_data=SCOPE1, scope2_data=SCOPE2, scrap_rate=30)
+    rows = model.tornado({
+        'ets_price': (60, 140),
+        'reduction.natural_gas_nm3': (0, 50),
+        'grid_factor': (0.3, 0.7),
+    }, output='facility_cbam_cost')
+    swings = [row['swing'] for row in rows]
+    assert swings == sorted(swings, reverse=True)
+    assert rows[0]['parameter'] == 'ets_price'
+    assert tornado_chart(rows)[:8] == b'\x89PNG\r\n\x1a\n'
+
+
+def test_unknown_parameter_rejected():
+    """Tanımsız parametre KeyError vermeli"""
+    model = SensitivityModel(85, 1000, cn_code='7201')
+    with pytest.raises(KeyError):
+        model.sweep({'bogus': [1, 2]})
+
+
+def test_linearize_reproduces_model():
+    """Katsayı + sabit terim modeli birebir üretmeli; çarpımsal girdi reddedilmeli"""
+    model = SensitivityModel(85, 1000, scope1_data=SCOPE1, scope2_data=SCOPE2, scrap_rate=30)
+    linear = model.linearize()
+    changed = {'activity.natural_gas_nm3': 400000, 'electricity_mwh': 1000}
+    expected = model.evaluate(**changed)
+    for output, value in linear.evaluate(changed).items():
+        assert value == pytest.approx(float(expected[output]))
+
+    with pytest.raises(ValueError):
+        model.linearize(['quantity', 'activity.natural_gas_nm3'])
@@ -0,0 +1,26 @@
+"""
+Web uygulaması soğuk başlangıç testleri
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+from cli.profile_imports import profile_imports
+
+# Render free-tier için import bütçesi (yavaş CI makinelerinde env ile artırılabilir)
+# Arka plan ısınması kapalı ölçülür; o işler ilk isteği bekletmez
+STARTUP_BUDGET_SECONDS = float(os.getenv('STARTUP_BUDGET_SECONDS', 1.5))
+
+
+def test_web_app_import_within_budget():
+    """web.app import süresi bütçeyi aşmaz"""
+    profile = profile_imports('web.app', env={'WARMUP_ON_BOOT': '0'})
+    assert profile['total_seconds'] < STARTUP_BUDGET_SECONDS, \
+        f"web.app importu {profile['total_seconds']:.2f} sn sürdü"
+
+
+def test_web_app_defers_heavy_packages():
+    """pandas, matplotlib, reportlab ve genai ilk kullanıma kadar yüklenmez"""
+    profile = profile_imports('web.app', env={'WARMUP_ON_BOOT': '0'})
+    assert profile['heavy'] == []
@@ -0,0 +1,113 @@
+"""
+Warm state snapshot testleri
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
+
+import pandas as pd
+
+from src.warm_state import WarmState
+
+
+class FakeModels:
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, model, contents):
+        self.calls += 1
+        return type('Response', (), {'text': f'{model}:{contents}'})()
+
+
+class FakeClient:
+    def __init__(self):
+        self.models = FakeModels()
+
+
+def test_llm_results_cached_per_prompt(tmp_path):
+    """Aynı model+prompt için LLM bir kez çağrılır"""
+    state = WarmState(str(tmp_path / 'warm.pkl'))
+    client = FakeClient()
+    wrapped = state.wrap_client(client)
+    assert wrapped.models.generate_content(model='m', contents='p').text == 'm:p'
+    assert wrapped.models.generate_content(model='m', contents='p').text == 'm:p'
+    wrapped.models.generate_content(model='m', contents='q')
+    assert client.models.calls == 2
+
+
+def test_snapshot_restore(tmp_path):
+    """Kaydedilen geçmiş, tahmin ve LLM sonuçları yeni process'te geri yüklenir"""
+    csv_path = tmp_path / 'ets.csv'
+    csv_path.write_text('Date,Price\n2025-01-01,80\n')
+    snapshot = str(tmp_path / 'warm.pkl')
+
+    state = WarmState(snapshot)
+    history = state.ets_history(str(csv_path), lambda p: pd.read_csv(p))
+    forecast = pd.DataFrame({'Quarter': ['Q1 2026'], 'Forecasted Value': [85.0]})
+    state.forecast(str(csv_path), 'm', lambda: (forecast, {'last_price': 80.0}))
+    state.llm_text('m', 'prompt', lambda: 'yanıt')
+    state.cn_index()
+    state.save()
+
+    restored = WarmState(snapshot)
+    restored.warmup([])
+    assert restored.status()['ready'] and restored.status()['restored']
+
+    def fail(*args):
+        raise AssertionError('önbellekten gelmeliydi')
+
+    assert restored.ets_history(str(csv_path), fail).equals(history)
+    assert restored.forecast(str(csv_path), 'm', fail)[0].equals(forecast)
+    assert restored.llm_text('m', 'prompt', fail) == 'yanıt'
+    assert restored.status()['cache']['cn_codes'] > 0
+
+
+def test_csv_change_invalidates_history(tmp_path):
+    """CSV değişince geçmiş yeniden ayrıştırılır"""
+    csv_path = tmp_path / 'ets.csv'
+    csv_path.write_text('Date,Price\n2025-01-01,80\n')
+    state = WarmState()
+    state.ets_history(str(csv_path), lambda p: pd.read_csv(p))
+
+    csv_path.write_text('Date,Price\n2025-01-01,80\n2025-04-01,82\n')
+    os.utime(csv_path, (0, 0))
+    assert len(state.ets_history(str(csv_path), lambda p: pd.read_csv(p))) == 2
+
+
+def test_llm_results_expire_with_forecast_ttl(tmp_path):
+    """LLM yanıtları tahminle aynı TTL sonunda yeniden üretilir"""
+    state = WarmState(forecast_ttl_seconds=60)
+    calls = []
+    compute = lambda: calls.append(1) or f'yanıt {len(calls)}'
+    assert state.llm_text('m', 'p', compute) == 'yanıt 1'
+    assert state.llm_text('m', 'p', compute) == 'yanıt 1'
+
+    key = next(iter(state._llm))
+    text, created = state._llm[key]
+    state._llm[key] = (text, created - 61)
+    assert state.llm_text('m', 'p', compute) == 'yanıt 2'
+
+
+def test_snapshot_writes_debounced_single_writer(tmp_path):
+    """Art arda değişiklikler tek yazıcı thread'inde tek snapshot'a toplanır"""
+    import threading
+    import time
+
+    state = WarmState(str(tmp_path / 'warm.pkl'), save_delay_seconds=0.2)
+    assert not os.path.exists(tmp_path / 'warm.pkl')
+    saves = []
+    original = state.save
+    state.save = lambda: saves.append(1) or original()
+
+    threads_before = threading.active_count()
+    for i in range(20):
+        state.llm_text('m', f'p{i}', lambda: 'yanıt')
+    assert threading.active_count() - threads_before <= 1
+
+    deadline = time.time() + 5
+    while not saves and time.time() < deadline:
+        time.sleep(0.05)
+    time.sleep(0.3)
+    assert saves == [1]
+    assert WarmState(str(tmp_path / 'warm.pkl')).restore()
@@ -3,7 +3,7 @@ CBAM Web Application
 Flask-based web interface
 """
 
-from flask import Flask, render_template, request, jsonify, send_file, session
+from flask import Flask, render_template, request, jsonify, send_file, session, Response
 import os
 import sys
 from dotenv import load_dotenv
@@ -11,6 +11,7 @@ from datetime import datetime
 import json
 from decimal import Decimal
 import uuid
+import threading
 
 # Ana proje yolunu ekle
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -22,23 +23,79 @@ print(f"🚀 Başlatılıyor... Proje Dizini: {BASE_DIR}")
 # Environment variables
 load_dotenv()
 
+# Isınmış durum: ETS geçmişi, güncel tahmin, CN indeksi ve LLM sonuçları (snapshot ile kalıcı)
+from src.warm_state import WarmState
+warm_state = WarmState(
+    snapshot_path=os.getenv('WARM_STATE_PATH', os.path.join(BASE_DIR, 'reports', 'warm_state.pkl')) or None,
+    forecast_ttl_seconds=float(os.getenv('FORECAST_TTL_HOURS', 24)) * 3600
+)
+
 # Gemini configuration (Lazy loaded to prevent startup timeout)
+_gemini_client = None
+
 def get_gemini_client():
+    """Process başına tek client; LLM çağrıları warm_state önbelleğinden geçer"""
+    global _gemini_client
+    if _gemini_client is not None:
+        return _gemini_client
     try:
         from google import genai
         api_key = os.getenv('GOOGLE_API_KEY')
         if not api_key:
             return None
-        return genai.Client(api_key=api_key)
+        _gemini_client = warm_state.wrap_client(genai.Client(api_key=api_key))
+        return _gemini_client
     except:
         return None
 
+def find_ets_csv():
+    """ETS fiyat CSV'sini projede veya Render secrets klasöründe ara"""
+    csv_path = os.getenv('ETS_CSV_PATH', 'icap-graph-price-data-2014-01-01-2025-11-21.csv')
+    
+    # Alternatif path denemeleri (Render Secret Files yolu dahil)
+    search_paths = [
+        csv_path,
+        os.path.join('/etc/secrets', os.path.basename(csv_path)),
+        os.path.join(BASE_DIR, 'data', os.path.basename(csv_path)),
+        os.path.join(BASE_DIR, os.path.basename(csv_path))
+    ]
+    for p in search_paths:
+        if os.path.exists(p):
+            return p
+    return None
+
 app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', 'cbam-secret-key-2026')
 DEFAULT_MODEL = os.getenv('DEFAULT_MODEL', 'gemini-2.0-flash')
 
-# Global storage for last report data
-app.last_report_data = None
+# Tam rapor verisi (PDF için) - oturum bazlı, boyut sınırlı depo
+# REPORT_STORE_DIR tüm gunicorn worker'larının paylaştığı disk katmanıdır (boş = sadece bellek)
+from src.report_store import ReportStore
+report_store = ReportStore(
+    max_items=int(os.getenv('REPORT_STORE_MAX_ITEMS', 32)),
+    max_bytes=int(os.getenv('REPORT_STORE_MAX_MB', 64)) * 1024 * 1024,
+    disk_dir=os.getenv('REPORT_STORE_DIR', os.path.join(BASE_DIR, 'reports', 'store')) or None
+)
+
+# Üretilmiş PDF'ler için disk önbelleği (içerik hash'i ile anahtarlanır)
+from src.pdf_cache import PDFCache
+pdf_cache = PDFCache(
+    os.getenv('PDF_CACHE_DIR', os.path.join(BASE_DIR, 'reports', 'pdf_cache')),
+    max_bytes=int(os.getenv('PDF_CACHE_MAX_MB', 256)) * 1024 * 1024
+)
+
+# PDF boyut ayarları: raster görsel DPI'ı, kodlama (flate/jpeg) ve dosya başına bütçe
+PDF_RENDER_OPTIONS = {
+    'image_dpi': int(os.getenv('PDF_IMAGE_DPI', 150)),
+    'image_format': os.getenv('PDF_IMAGE_FORMAT', 'flate'),
+    'max_bytes': int(float(os.getenv('PDF_MAX_KB', 0)) * 1024) or None
+}
+
+def get_session_id():
+    """Tarayıcı oturumu için kalıcı kimlik (rapor sahipliği için)"""
+    if 'sid' not in session:
+        session['sid'] = str(uuid.uuid4())
+    return session['sid']
 
 # AWS DynamoDB Configuration
 def get_db_table():
@@ -78,8 +135,12 @@ def save_report_to_aws(data):
             
         data['created_at'] = datetime.now().isoformat()
         
+        # Büyük alanları sıkıştır (report_text, ets_forecast, senaryolar)
+        from src.report_codec import encode_report_item
+        db_data = encode_report_item(data, codec=os.getenv('REPORT_COMPRESSION', 'zlib'))
+        
         # Decimal dönüşümü
-        db_data = convert_to_decimal(data)
+        db_data = convert_to_decimal(db_data)
         
         table.put_item(Item=db_data)
         print(f"✅ Veri AWS'ye kaydedildi: {data['report_id']}")
@@ -98,18 +159,28 @@ def convert_decimal_to_float(obj):
         return float(obj)
     return obj
 
-def get_reports_from_aws(limit=50):
-    """AWS DynamoDB'den geçmiş raporları çek"""
+def get_reports_from_aws(limit=50, attributes=None):
+    """
+    AWS DynamoDB'den geçmiş raporları çek
+    
+    attributes verilirse sadece bu alanlar çekilir (ProjectionExpression).
+    Sıkıştırılmış alanlar ilk erişimde açılır (LazyReport).
+    """
     table = get_db_table()
     if not table:
         return []
     
     try:
-        response = table.scan(Limit=limit)
+        from src.report_codec import LazyReport, build_projection
+        scan_kwargs = {'Limit': limit}
+        if attributes:
+            scan_kwargs.update(build_projection(attributes))
+        
+        response = table.scan(**scan_kwargs)
         items = response.get('Items', [])
         # Tarihe göre sırala (en yeni en üstte)
         items.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-        return convert_decimal_to_float(items)
+        return [LazyReport(item) for item in convert_decimal_to_float(items)]
     except Exception as e:
         print(f"❌ AWS Veri Çekme Hatası: {e}")
         return []
@@ -118,7 +189,9 @@ def get_reports_from_aws(limit=50):
 @app.route('/dashboard')
 def dashboard():
     """Kurumsal Dashboard - Geçmiş Analizler ve Trendler"""
-    reports = get_reports_from_aws()
+    # Ağır alanlar (rapor metni, tahminler) dashboard'da kullanılmıyor
+    from src.report_codec import DASHBOARD_ATTRIBUTES
+    reports = get_reports_from_aws(attributes=DASHBOARD_ATTRIBUTES)
     
     # Trend verisi hazırlama (Zaman serisi)
     trend_data = []
@@ -133,11 +206,50 @@ def dashboard():
     return render_template('dashboard.html', reports=reports, trend_data=trend_data)
 
 
+# Katalog sayfaları (/ ve /cn-codes) veri sürümü başına bir kez render edilip sıkıştırılır
+from src.page_cache import PageCache
+page_cache = PageCache()
+PAGE_MAX_AGE = int(os.getenv('PAGE_MAX_AGE', 300))
+_catalog_version = None
+
+def catalog_version(template_name):
+    """CN veritabanı + şablon dosyası sürümü (şablon düzenlenince sayfa yenilenir)"""
+    global _catalog_version
+    if _catalog_version is None:
+        from src.page_cache import data_version
+        from src.cn_code_database import CN_CODE_DATABASE
+        _catalog_version = data_version(CN_CODE_DATABASE)
+    template_path = os.path.join(app.root_path, app.template_folder, template_name)
+    return f"{_catalog_version}-{os.path.getmtime(template_path):.0f}"
+
+def prerendered_response(template_name, render):
+    """Önceden render edilmiş sayfayı ETag, Cache-Control ve br/gzip ile sun"""
+    page = page_cache.get(
+        (template_name, request.script_root),
+        catalog_version(template_name),
+        render
+    )
+    encoding = next((enc for enc in ('br', 'gzip')
+                     if enc in page.encodings and request.accept_encodings[enc]), None)
+    body, etag = page.variant(encoding)
+    
+    response = app.response_class(body, mimetype='text/html')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = f'public, max-age={PAGE_MAX_AGE}'
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    # If-None-Match eşleşirse gövdesiz 304
+    return response.make_conditional(request)
+
+
 @app.route('/')
 def index():
     """Ana sayfa - Form"""
-    from src.cn_code_database import CN_CODE_DATABASE
-    return render_template('index.html', cn_codes=CN_CODE_DATABASE)
+    def render():
+        from src.cn_code_database import CN_CODE_DATABASE
+        return render_template('index.html', cn_codes=CN_CODE_DATABASE)
+    return prerendered_response('index.html', render)
 
 
 @app.route('/calculate', methods=['POST'])
@@ -151,63 +263,27 @@ def calculate():
         if action == 'full-analysis':
             return full_analysis()
         
-        # Normal hesaplama
-        ets_price = float(request.form['ets_price'])
-        quantity = float(request.form['quantity'])
-        cn_code = request.form['cn_code']
+        # Normal hesaplama: form tek geçişte doğrulanıp tiplenir (cbam_form_config.json)
+        from src.form_schema import load_form_schema
+        form = load_form_schema().decode_form(request.form)
+        ets_price = form['ets_price']
+        quantity = form['quantity']
+        cn_code = form['cn_code']
         
         # Opsiyonel detaylı emisyon verileri
         detailed_data = {}
         
         # Tesis Bilgileri
-        if request.form.get('plant_id'):
-            detailed_data['reporting'] = {
-                'plant_id': request.form.get('plant_id', ''),
-                'country_code': request.form.get('country_code', ''),
-                'reporting_year': request.form.get('reporting_year', ''),
-                'production_route': request.form.get('production_route', ''),
-                'electricity_source': request.form.get('electricity_source', '')
-            }
-        
-        # Scope 1 - Doğrudan Emisyonlar
-        scope1_data = {}
-        if request.form.get('coking_coal_ton') or request.form.get('natural_gas_nm3'):
-            scope1_data['fuel'] = {
-                'coking_coal_ton': float(request.form.get('coking_coal_ton', 0) or 0),
-                'natural_gas_nm3': float(request.form.get('natural_gas_nm3', 0) or 0),
-                'fuel_oil_ton': float(request.form.get('fuel_oil_ton', 0) or 0)
-            }
-            scope1_data['process'] = {
-                'limestone_ton': float(request.form.get('limestone_ton', 0) or 0)
-            }
-            scope1_data['thermal_systems'] = {
-                'reheating_fuel_nm3': float(request.form.get('reheating_fuel_nm3', 0) or 0)
-            }
-            scope1_data['steel_output_ton'] = float(request.form.get('steel_output_ton', 0) or 0)
-            detailed_data['scope1'] = scope1_data
-        
-        # Scope 2 - Dolaylı Emisyonlar
-        if request.form.get('electricity_consumption_mwh'):
-            detailed_data['scope2'] = {
-                'electricity': {
-                    'electricity_consumption_mwh': float(request.form.get('electricity_consumption_mwh', 0) or 0),
-                    'grid_emission_factor_kgco2_kwh': float(request.form.get('grid_emission_factor', 0) or 0),
-                    'renewable_share_percent': float(request.form.get('renewable_share_percent', 0) or 0)
-                }
-            }
+        if 'plant_id' in form.present:
+            detailed_data['reporting'] = form['company']
         
-        # Veri Kalitesi
-        if request.form.get('natural_gas_quality') or request.form.get('electricity_quality'):
-            detailed_data['data_quality'] = {}
-            if request.form.get('natural_gas_quality'):
-                detailed_data['data_quality']['natural_gas_nm3'] = {
-                    'quality': request.form.get('natural_gas_quality', '')
-                }
-            if request.form.get('electricity_quality'):
-                detailed_data['data_quality']['electricity_consumption_mwh'] = {
-                    'quality': request.form.get('electricity_quality', '')
-                }
+        # Scope 1 - Doğrudan Emisyonlar / Scope 2 - Dolaylı Emisyonlar / Veri Kalitesi
+        for section in ('scope1', 'scope2', 'data_quality'):
+            section_data = form.section(section)
+            if section_data:
+                detailed_data[section] = section_data
         
+        from src.cbam_calculator import CBAMCalculator
         calc = CBAMCalculator(ets_price)
         summary = calc.get_summary(cn_code, quantity)
         
@@ -232,19 +308,282 @@ def calculate():
         return render_template('error.html', error=str(e))
 
 
+# JSON batch API: ERP entegrasyonu için toplu hesaplama
+API_MAX_LINES = int(os.getenv('API_MAX_LINES', 50000))
+NDJSON_CHUNK_LINES = 1000
+
+def _api_error(message, status=400):
+    return jsonify({'error': message}), status
+
+def _batch_rows(lines, quantities, result):
+    """
+    Vektörel sonuçları satır başına JSON metnine çevir
+    
+    Sonucu sonlu olmayan satırlar (ör. taşma) hata satırı olarak döner;
+    allow_nan=False geçersiz JSON (Infinity/NaN) üretilmesini engeller.
+    """
+    columns = (result['total_ei'].tolist(), result['total_emission'].tolist(),
+               result['cbam_cost'].tolist(), result['cbam_cost_adjusted'].tolist())
+    rows = zip(lines, quantities, result['found'].tolist(), result['finite'].tolist(), *columns)
+    for i, (line, quantity, found, finite, total_ei, emission, cost, adjusted) in enumerate(rows):
+        row = {'line': i, 'cn_code': line.get('cn_code')}
+        if not found:
+            row['error'] = "CN kodu bulunamadı"
+        elif not finite:
+            row['error'] = "Sonuç sayısal aralığı aşıyor"
+        else:
+            row.update({'quantity': quantity, 'total_ei': total_ei, 'total_emission': emission,
+                        'certificates': emission, 'cbam_cost': cost, 'cbam_cost_adjusted': adjusted})
+        yield json.dumps(row, ensure_ascii=False, separators=(',', ':'), allow_nan=False, default=str)
+
+
+def _parse_lines(lines):
+    """
+    Satır miktarlarını web formu alan tanımlarıyla doğrula (sonlu, >= 0)
+    
+    Returns:
+        tuple: (miktarlar, yabancı karbon fiyatları, hata mesajı veya None)
+    """
+    from src.form_schema import load_form_schema
+    specs = load_form_schema().web_form.by_id
+    columns = {'quantity': [], 'foreign_carbon_price': []}
+    for i, line in enumerate(lines):
+        for field_id, values in columns.items():
+            raw = line.get(field_id)
+            if raw is None or raw == '':
+                values.append(0.0)
+                continue
+            value, error = specs[field_id].parse(raw)
+            if error:
+                return None, None, f"lines[{i}]: {error}"
+            values.append(value)
+    return columns['quantity'], columns['foreign_carbon_price'], None
+
+
+@app.route('/api/v1/calculate', methods=['POST'])
+def api_calculate():
+    """
+    Toplu CBAM hesaplama (JSON)
+    
+    Gövde: {"ets_price": 85.0, "lines": [{"cn_code": "7201", "quantity": 1000,
+            "foreign_carbon_price": 0}, ...]}
+    Yanıt: kompakt JSON; ?format=ndjson veya Accept: application/x-ndjson ile
+    satır satır akıtılan NDJSON (son satır özet)
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        return _api_error("Geçersiz JSON gövdesi")
+    
+    lines = payload.get('lines')
+    if not isinstance(lines, list) or not lines:
+        return _api_error("'lines' boş olmayan bir liste olmalı")
+    if len(lines) > API_MAX_LINES:
+        return _api_error(f"En fazla {API_MAX_LINES} satır gönderilebilir", 413)
+    if not all(isinstance(line, dict) for line in lines):
+        return _api_error("Her satır bir nesne olmalı")
+    
+    if 'ets_price' not in payload:
+        return _api_error("'ets_price' zorunlu")
+    from src.form_schema import load_form_schema
+    ets_price, error = load_form_schema().web_form.by_id['ets_price'].parse(payload['ets_price'])
+    if error:
+        return _api_error(error)
+    quantities, foreign, error = _parse_lines(lines)
+    if error:
+        return _api_error(error)
+    
+    import numpy as np
+    from src.cbam_calculator import CBAMCalculator
+    calc = CBAMCalculator(ets_price)
+    with np.errstate(over='ignore', invalid='ignore'):
+        result = calc.calculate_batch([line.get('cn_code', '') for line in lines], quantities,
+                                      foreign if any(foreign) else None)
+        found = result['found']
+        result['finite'] = np.isfinite(result['total_emission']) & np.isfinite(result['cbam_cost']) \
+            & np.isfinite(result['cbam_cost_adjusted'])
+        ok = found & result['finite']
+        summary = {
+            'lines': len(lines),
+            'calculated': int(ok.sum()),
+            'not_found': int((~found).sum()),
+            'overflow': int((found & ~result['finite']).sum()),
+            'ets_price': ets_price,
+            'total_emission': float(result['total_emission'][ok].sum()),
+            'cbam_cost': float(result['cbam_cost'][ok].sum()),
+            'cbam_cost_adjusted': float(result['cbam_cost_adjusted'][ok].sum())
+        }
+    
+    try:
+        summary_json = json.dumps(summary, separators=(',', ':'), allow_nan=False)
+    except ValueError:
+        return _api_error("Toplamlar sayısal aralığı aşıyor; satırları bölerek gönderin")
+    
+    wants_ndjson = request.args.get('format') == 'ndjson' or \
+        request.accept_mimetypes.best == 'application/x-ndjson'
+    
+    if wants_ndjson:
+        def generate():
+            chunk = []
+            for row in _batch_rows(lines, quantities, result):
+                chunk.append(row)
+                if len(chunk) >= NDJSON_CHUNK_LINES:
+                    yield '\n'.join(chunk) + '\n'
+                    chunk = []
+            chunk.append(f'{{"summary":{summary_json}}}')
+            yield '\n'.join(chunk) + '\n'
+        return Response(generate(), mimetype='application/x-ndjson')
+    
+    body = f'{{"summary":{summary_json},"results":[{",".join(_batch_rows(lines, quantities, result))}]}}'
+    return Response(body, mimetype='application/json')
+
+
+@app.route('/api/v1/what-if', methods=['POST'])
+def api_what_if():
+    """
+    Doğrusal what-if modeli: çıktı başına katsayı vektörü ve sabit terim
+
+    Gövde: /calculate ile aynı form alanları (form veya JSON). Tesis verisi
+    (Scope 1/2) varsa girdiler aktivite alanları + elektrik tüketimi, yoksa
+    miktardır; diğer alanlar analiz edilen değerlerde sabittir. Slider'lar
+    toplamı istemcide y = intercept + Σ katsayı x girdi ile hesaplayabilir.
+    JSON gövdesinde opsiyonel "values" ({alan: değer}) verilirse o noktadaki
+    çıktılar da döner.
+
+    cbam_cost /calculate ve tam analizdeki CN varsayılanı maliyetin aynısıdır;
+    tesis yoğunluğuyla hesaplanan maliyet facility_cbam_cost çıktısıdır.
+    """
+    from src.form_schema import FormValidationError, load_form_schema
+    from src.sensitivity import SensitivityModel
+
+    payload = request.get_json(silent=True) if request.is_json else request.form
+    if not payload:
+        return _api_error("Form alanları veya JSON gövdesi gerekli")
+
+    try:
+        form = load_form_schema().decode_form(payload)
+        scope1_data = form.section('scope1')
+        scope2_data = form.section('scope2')
+        model = SensitivityModel(
+            form['ets_price'], form['quantity'],
+            cn_code=form['cn_code'],
+            scope1_data=scope1_data, scope2_data=scope2_data,
+            scrap_rate=form.values['scrap_rate'], clinker_ratio=form.values['clinker_ratio']
+        )
+    except FormValidationError as e:
+        return jsonify({'error': 'Geçersiz form alanları', 'fields': e.errors}), 400
+    except ValueError as e:
+        return _api_error(str(e))
+
+    # Girdi etiketleri form alan id'leridir
+    if model.facility:
+        inputs = {column: f'activity.{column}' for column in model.activities}
+        inputs['electricity_consumption_mwh'] = 'electricity_mwh'
+    else:
+        inputs = {'quantity': 'quantity'}
+    linear = model.linearize(inputs)
+    body = linear.to_dict()
+
+    values = payload.get('values') if isinstance(payload, dict) else None
+    if values is not None:
+        if not isinstance(values, dict):
+            return _api_error("'values' bir nesne olmalı")
+        # Her değer, decode_form'daki alan tanımıyla doğrulanır (sonlu, min/max, birim)
+        specs = load_form_schema().web_form.by_id
+        overrides, errors = {}, {}
+        for label, raw in values.items():
+            if label not in linear.inputs:
+                errors[label] = f"Bilinmeyen girdi: {label}"
+                continue
+            value, error = specs[label].parse(raw)
+            if error:
+                errors[label] = error
+            else:
+                overrides[label] = value
+        if errors:
+            return jsonify({'error': "Geçersiz 'values'", 'fields': errors}), 400
+        body['values'] = linear.evaluate(overrides)
+
+    body['mode'] = 'facility' if model.facility else 'cn_default'
+    try:
+        return Response(json.dumps(body, ensure_ascii=False, allow_nan=False), mimetype='application/json')
+    except ValueError:
+        return _api_error("Sonuç sayısal aralığı aşıyor")
+
+
+# Gümrük beyannamesi (CSV/XLSX) toplu yükleme - arka planda parça parça hesaplanır
+UPLOAD_MAX_MB = int(os.getenv('UPLOAD_MAX_MB', 512))
+app.config['MAX_CONTENT_LENGTH'] = UPLOAD_MAX_MB * 1024 * 1024
+_customs_imports = None
+
+def get_customs_imports():
+    """İş yöneticisi ilk yüklemede oluşturulur (açılışta numpy yüklenmesin)"""
+    global _customs_imports
+    if _customs_imports is None:
+        from src.customs_import import CustomsImportManager
+        _customs_imports = CustomsImportManager(
+            os.getenv('CUSTOMS_IMPORT_DIR', os.path.join(BASE_DIR, 'reports', 'customs_imports')),
+            max_workers=int(os.getenv('CUSTOMS_IMPORT_WORKERS', 2))
+        )
+    return _customs_imports
+
+
+@app.route('/upload-customs', methods=['POST'])
+def upload_customs():
+    """Gümrük dosyası yükle; iş kimliği ve durum adresi döner (202)"""
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return _api_error("'file' alanında CSV veya XLSX dosyası gönderin")
+    if not upload.filename.lower().endswith(('.csv', '.txt', '.xlsx', '.xlsm')):
+        return _api_error("Desteklenen formatlar: CSV, XLSX")
+    try:
+        ets_price = float(request.form.get('ets_price') or 85.0)
+    except ValueError:
+        return _api_error("ets_price sayısal olmalı")
+    
+    manager = get_customs_imports()
+    job_id, source_path = manager.create_job(upload.filename, owner=get_session_id())
+    # Werkzeug büyük yüklemeleri zaten geçici dosyada tutar; save() parça parça kopyalar
+    upload.save(source_path)
+    manager.start(job_id, source_path, ets_price)
+    
+    return jsonify({
+        'job_id': job_id,
+        'status_url': f'/upload-customs/{job_id}',
+        'downloads': {kind: f'/upload-customs/{job_id}/download?kind={kind}' for kind in ('summary', 'lines')}
+    }), 202
+
+
+@app.route('/upload-customs/<job_id>')
+def upload_customs_status(job_id):
+    """Yükleme işinin ilerlemesi"""
+    status = get_customs_imports().status(job_id, owner=session.get('sid'))
+    if status is None:
+        return _api_error("İş bulunamadı", 404)
+    response = jsonify(status)
+    response.headers['Cache-Control'] = 'no-store'
+    return response
+
+
+@app.route('/upload-customs/<job_id>/download')
+def upload_customs_download(job_id):
+    """Tamamlanan işin özet (CSV) veya satır bazlı (CSV.gz) sonuçları"""
+    from src.customs_import import RESULT_FILES
+    kind = request.args.get('kind', 'summary')
+    path = get_customs_imports().result_path(job_id, kind, owner=session.get('sid'))
+    if path is None:
+        return _api_error("Sonuç hazır değil veya bulunamadı", 404)
+    filename, mimetype = RESULT_FILES[kind]
+    return send_file(path, mimetype=mimetype, as_attachment=True,
+                     download_name=f"CBAM_gumruk_{job_id[:8]}_{filename}")
+
+
 @app.route('/cn-codes')
 def cn_codes():
     """CN kodları listesi"""
-    from src.cn_code_database import CN_CODE_DATABASE
-    codes = []
-    for code, data in CN_CODE_DATABASE.items():
-        codes.append({
-            'code': code,
-            'description': data['description'],
-            'category': data['category'],
-            'total_ei': data['total']
-        })
-    return render_template('cn_codes.html', codes=codes)
+    return prerendered_response(
+        'cn_codes.html',
+        lambda: render_template('cn_codes.html', codes=warm_state.cn_index()['codes'])
+    )
 
 
 @app.route('/full-analysis', methods=['POST'])
@@ -256,33 +595,19 @@ def full_analysis():
             return render_template('error.html', 
                                  error="Gemini API yapılandırılmamış. .env dosyasına GOOGLE_API_KEY ekleyin.")
         
-        ets_price = float(request.form['ets_price'])
-        quantity = float(request.form['quantity'])
-        cn_code = request.form['cn_code']
+        from src.form_schema import load_form_schema
+        form = load_form_schema().decode_form(request.form)
+        ets_price = form['ets_price']
+        quantity = form['quantity']
+        cn_code = form['cn_code']
         
         # CSV path - projede veya Render secrets klasöründe
-        csv_path = os.getenv('ETS_CSV_PATH', 'icap-graph-price-data-2014-01-01-2025-11-21.csv')
-        
-        # Alternatif path denemeleri (Render Secret Files yolu dahil)
-        search_paths = [
-            csv_path,
-            os.path.join('/etc/secrets', os.path.basename(csv_path)),
-            os.path.join(os.path.dirname(os.path.dirname(__file__)), 'data', os.path.basename(csv_path)),
-            os.path.join(os.path.dirname(os.path.dirname(__file__)), os.path.basename(csv_path))
-        ]
-        
-        found_path = None
-        for p in search_paths:
-            if os.path.exists(p):
-                found_path = p
-                break
-        
-        if not found_path:
+        csv_path = find_ets_csv()
+        
+        if not csv_path:
             return render_template('error.html', 
                                  error=f"ETS fiyat CSV dosyası bulunamadı. Lütfen Render Secrets alanına dosyayı eklediğinizden emin olun.")
         
-        csv_path = found_path
-        
         # === ADIM 1: CBAM HESAPLAMA ===
         from src.cbam_calculator import CBAMCalculator
         calc = CBAMCalculator(ets_price)
@@ -293,23 +618,10 @@ def full_analysis():
         
         # Company info for reports
         company_info = {
-            'company_name': request.form.get('company_name', 'Firma'),
-            'origin_country': request.form.get('country_code', 'TR'),
-            'reporting_period': request.form.get('reporting_period', '2024'),
+            **form['company'],
             'product_name': cbam_summary['product'],
             'cn_code': cn_code,
-            'quantity': quantity,
-            'sector': request.form.get('sector', 'iron_steel'),
-            'production_route': request.form.get('production_route', 'eaf'),
-            'export_quantity': float(request.form.get('export_quantity', 0) or 0),
-            'financials': {
-                'annual_revenue': float(request.form.get('annual_revenue', 0) or 0),
-                'export_revenue': float(request.form.get('export_revenue', 0) or 0),
-                'profit_margin': float(request.form.get('profit_margin', 0) or 0),
-                'electricity_price': float(request.form.get('electricity_price', 90) or 90)
-            },
-            'scrap_rate': float(request.form.get('scrap_rate', 0) or 0),
-            'clinker_ratio': float(request.form.get('clinker_ratio', 95) or 95)
+            'quantity': quantity
         }
         cbam_summary.update(company_info)
         
@@ -318,45 +630,9 @@ def full_analysis():
         emission_analysis = None
         optimization_scenarios = None
         
-        # Scope 1 & 2 verilerini topla
-        scope1_data = None
-        scope2_data = None
-        
-        if any([request.form.get(f) for f in ['natural_gas_nm3', 'coking_coal_ton', 'diesel_liter', 'purchased_heat_mwh']]):
-            scope1_data = {
-                'fuel': {
-                    'coking_coal_ton': float(request.form.get('coking_coal_ton', 0) or 0),
-                    'natural_gas_nm3': float(request.form.get('natural_gas_nm3', 0) or 0),
-                    'fuel_oil_ton': float(request.form.get('fuel_oil_ton', 0) or 0)
-                },
-                'mobile': {
-                    'diesel_liter': float(request.form.get('diesel_liter', 0) or 0)
-                },
-                'process': {
-                    'limestone_ton': float(request.form.get('limestone_ton', 0) or 0),
-                    'electrode_ton': float(request.form.get('electrode_ton', 0) or 0),
-                    'anode_ton': float(request.form.get('anode_ton', 0) or 0),
-                    'reductants_ton': float(request.form.get('reductants_ton', 0) or 0),
-                    'pfc_emissions_ton': float(request.form.get('pfc_emissions_ton', 0) or 0),
-                    'ammonia_ton': float(request.form.get('ammonia_ton', 0) or 0),
-                    'nitric_acid_ton': float(request.form.get('nitric_acid_ton', 0) or 0),
-                    'alloy_elements_ton': float(request.form.get('alloy_elements_ton', 0) or 0)
-                },
-                'thermal_systems': {
-                    'reheating_fuel_nm3': float(request.form.get('reheating_fuel_nm3', 0) or 0),
-                    'purchased_heat_mwh': float(request.form.get('purchased_heat_mwh', 0) or 0)
-                },
-                'steel_output_ton': float(request.form.get('steel_output_ton', 0) or 5000)
-            }
-        
-        if request.form.get('electricity_consumption_mwh'):
-            scope2_data = {
-                'electricity': {
-                    'electricity_consumption_mwh': float(request.form.get('electricity_consumption_mwh', 0) or 0),
-                    'grid_emission_factor_kgco2_kwh': float(request.form.get('grid_emission_factor', 0.44) or 0.44),
-                    'source_type': request.form.get('electricity_source', 'grid') 
-                }
-            }
+        # Scope 1 & 2 verilerini topla (tetikleyici alanı gönderilmeyen bölüm None)
+        scope1_data = form.section('scope1')
+        scope2_data = form.section('scope2')
         
         # Emisyon analizi yap
         if scope1_data or scope2_data:
@@ -382,7 +658,14 @@ def full_analysis():
         from src.ets_predictor import ETSPricePredictor
         gemini_client = get_gemini_client()
         predictor = ETSPricePredictor(gemini_client)
-        ets_forecast, ets_stats = predictor.predict(csv_path, model=DEFAULT_MODEL)
+        # CSV ayrıştırma ve tahmin, CSV değişmediyse/TTL dolmadıysa önbellekten gelir
+        ets_forecast, ets_stats = warm_state.forecast(
+            csv_path, DEFAULT_MODEL,
+            lambda: predictor.predict(
+                csv_path, model=DEFAULT_MODEL,
+                history=warm_state.ets_history(csv_path, predictor.load_data)
+            )
+        )
         gc.collect() # Belleği tekrar temizle
         
         # === ADIM 3: CBAM MALİYET PROJEKSİYONU ===
@@ -402,15 +685,18 @@ def full_analysis():
             model=DEFAULT_MODEL
         )
         
+        report_id = str(uuid.uuid4())
+        
         # Session'a kaydet (sadece özet bilgiler - cookie limiti için)
         session['last_report'] = {
+            'report_id': report_id,
             'cbam_cost': cbam_summary['cbam_cost'],
             'total_emissions': emission_analysis.get('total_emissions', 0) if emission_analysis else 0,
             'timestamp': datetime.now().isoformat()
         }
         
-        # Tam rapor verisini app context'e kaydet (PDF için)
-        app.last_report_data = {
+        # Tam rapor verisini rapor deposuna kaydet (PDF için)
+        report_store.put(report_id, {
             'cbam_summary': cbam_summary,
             'ets_forecast': report['cbam_df'],
             'report_text': report['report_text'],
@@ -418,7 +704,7 @@ def full_analysis():
             'optimization_scenarios': optimization_scenarios,
             'company_info': company_info,
             'timestamp': datetime.now()
-        }
+        }, owner=get_session_id())
         
         # === RAPORU DOSYAYA KAYDET ===
         try:
@@ -528,6 +814,7 @@ ETS FİYAT TAHMİNLERİ (İlk 8 Çeyrek)
         # === AWS DYNAMODB KAYIT ===
         try:
             full_aws_data = {
+                'report_id': report_id,
                 'type': 'full_analysis',
                 'company_info': company_info,
                 'cbam_summary': cbam_summary,
@@ -543,6 +830,7 @@ ETS FİYAT TAHMİNLERİ (İlk 8 Çeyrek)
 
         # Sonuçları render et
         return render_template('full_results.html',
+                             report_id=report_id,
                              cbam_summary=cbam_summary,
                              ets_forecast=ets_forecast.to_dict('records')[:8],
                              ets_stats=ets_stats,
@@ -562,35 +850,80 @@ ETS FİYAT TAHMİNLERİ (İlk 8 Çeyrek)
 def download_pdf():
     """Download PDF report"""
     try:
-        # App context'ten rapor verisini al
-        if not hasattr(app, 'last_report_data') or app.last_report_data is None:
-            return "Rapor bulunamadı. Lütfen önce analiz çalıştırın.", 404
-        
-        report_data = app.last_report_data
+        # Rapor deposundan bu oturuma ait raporu al (id yoksa son rapor)
+        report_id = request.args.get('id') or session.get('last_report', {}).get('report_id')
+        report_data = report_store.get(report_id, owner=session.get('sid'))
         
-        # PDF oluştur
-        from src.pdf_generator import CBAMPDFGenerator
-        pdf_generator = CBAMPDFGenerator()
-        
-        pdf_buffer = pdf_generator.generate_report(
-            cbam_summary=report_data['cbam_summary'],
-            ets_forecast=report_data['ets_forecast'],
-            report_text=report_data['report_text'],
-            emission_analysis=report_data.get('emission_analysis'),
-            optimization_scenarios=report_data.get('optimization_scenarios')
-        )
+        if report_data is None:
+            return "Rapor bulunamadı. Lütfen önce analiz çalıştırın.", 404
         
         # PDF dosya adı (şirket ismiyle)
         company_name = report_data.get('company_info', {}).get('company_name', 'Firma')
         company_name_clean = company_name.replace(' ', '_').replace('/', '_')
         filename = f"CBAM_Raporu_{company_name_clean}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
         
-        return send_file(
-            pdf_buffer,
+        # İçerik hash'i hem önbellek anahtarı hem ETag (If-None-Match -> 304)
+        from src.pdf_cache import report_content_hash
+        cache_key = report_content_hash(
+            report_data['cbam_summary'],
+            report_data['ets_forecast'],
+            report_data['report_text'],
+            report_data.get('emission_analysis'),
+            report_data.get('optimization_scenarios'),
+            render_options=PDF_RENDER_OPTIONS
+        )
+        
+        # İstemcideki kopya güncel: önbelleğe bakmadan ve PDF üretmeden 304
+        if request.if_none_match.contains_weak(cache_key):
+            not_modified = Response(status=304)
+            not_modified.set_etag(cache_key)
+            not_modified.headers['Cache-Control'] = 'private, no-cache'
+            return not_modified
+        
+        # Açık dosya döner; başka worker'ın önbellek silmesi gönderimi bozmaz
+        pdf_source = pdf_cache.get(cache_key)
+        if pdf_source is None:
+            # PDF oluştur
+            from src.pdf_generator import get_pdf_generator
+            pdf_generator = get_pdf_generator(**PDF_RENDER_OPTIONS)
+            
+            # Çıktı spooled geçici dosyaya yazılır; üretim bittikten sonra büyük raporlar
+            # bellekte tutulmaz (reportlab kayıt anında belgeyi yine de bir kez bellekte kurar)
+            pdf_file, pdf_stats = pdf_generator.generate_report_spooled(
+                cbam_summary=report_data['cbam_summary'],
+                ets_forecast=report_data['ets_forecast'],
+                report_text=report_data['report_text'],
+                emission_analysis=report_data.get('emission_analysis'),
+                optimization_scenarios=report_data.get('optimization_scenarios')
+            )
+            budget_note = "" if pdf_stats['within_budget'] else " ⚠️ bütçe aşıldı"
+            print(f"📄 PDF: {pdf_stats['bytes'] / 1024:.1f} KB, {pdf_stats['pages']} sayfa, "
+                  f"{pdf_stats['seconds']:.2f} sn ({pdf_stats['image_format']}, {pdf_stats['image_dpi']} dpi){budget_note}")
+            try:
+                # Önbelleğe parça parça kopyalanır ve oradan akıtılır
+                pdf_cache.put(cache_key, pdf_file)
+                pdf_source = pdf_cache.get(cache_key)
+            except OSError as cache_error:
+                print(f"⚠️ PDF önbelleğe yazılamadı: {cache_error}")
+            if pdf_source is None:
+                # Yazılamadı veya hemen silindi: send_file spooled dosyayı gönderir ve yanıt bitince kapatır
+                pdf_file.seek(0)
+                pdf_source = pdf_file
+            else:
+                pdf_file.close()
+        
+        # Dosya nesnesi WSGI file wrapper ile parça parça gönderilir
+        response = send_file(
+            pdf_source,
             mimetype='application/pdf',
             as_attachment=True,
-            download_name=filename
+            download_name=filename,
+            etag=cache_key,
+            conditional=True,
+            max_age=0
         )
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
         
     except Exception as e:
         import traceback
@@ -598,7 +931,64 @@ def download_pdf():
         return f"PDF oluşturma hatası: {str(e)}<br><br><pre>{error_detail}</pre>", 500
 
 
+@app.route('/ready')
+def ready():
+    """Hazır olma kontrolü: ısınma tamamlanınca 200, öncesinde 503"""
+    status = warm_state.status()
+    return jsonify(status), (200 if status['ready'] else 503)
+
+
+def _warm_pdf_generator():
+    from src.pdf_generator import get_pdf_generator, get_logo_reader
+    get_pdf_generator(**PDF_RENDER_OPTIONS)
+    get_logo_reader(PDF_RENDER_OPTIONS['image_dpi'], PDF_RENDER_OPTIONS['image_format'])
+
+
+def _warm_ets_history():
+    csv_path = find_ets_csv()
+    if csv_path:
+        from src.ets_predictor import ETSPricePredictor
+        warm_state.ets_history(csv_path, ETSPricePredictor(None).load_data)
+
+
+_warm_state_started = False
+_warm_state_lock = threading.Lock()
+
+
+def init_warm_state():
+    """
+    Snapshot yükleme ve ısınmayı arka planda başlat (process başına bir kez)
+
+    Modül importu thread başlatmaz ve diske yazmaz; uygulama açılışında
+    (python app.py, gunicorn post_worker_init) veya en geç ilk istekte çağrılır.
+    WARMUP_ON_BOOT=0 ise hiçbir şey yapmaz.
+
+    Returns:
+        bool: Isınma bu çağrıda başlatıldıysa True
+    """
+    global _warm_state_started
+    with _warm_state_lock:
+        if _warm_state_started or os.getenv('WARMUP_ON_BOOT', '1') != '1':
+            return False
+        _warm_state_started = True
+    warm_state.start_warmup([
+        ('cn_index', warm_state.cn_index),
+        ('gemini_client', get_gemini_client),
+        ('ets_history', _warm_ets_history),
+        ('pdf_generator', _warm_pdf_generator)
+    ])
+    return True
+
+
+@app.before_request
+def _ensure_warm_state():
+    # Açılışta çağrılmadıysa (ör. doğrudan WSGI importu) ilk istekte başlar; istek beklemez
+    if not _warm_state_started:
+        init_warm_state()
+
+
 if __name__ == "__main__":
+    init_warm_state()
     # Render için port ayarı
     port = int(os.environ.get("PORT", 5001))
     app.run(host='0.0.0.0', port=port)